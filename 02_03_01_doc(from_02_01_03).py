@@ -1,12 +1,35 @@
 import csv
 import itertools
 import doctest
+import functools
+import glob
+import os
+import signal
+import time
+from html import escape
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import Workbook
 from openpyxl.styles import Font, Border, Side
 import matplotlib.pyplot as plt
 import numpy as np
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
+from quantiles import KLLSketch
+from dedup import VacancyDeduplicator, vacancy_key
+import partitions
+import timecodes
+from currency_rates import RateTable
+from heavy_hitters import SpaceSaving
+from report_cache import ReportCache, file_digest
+from titles import TitleNormalizer, normalize_title
+from cities import CityDictionary, RegionTable
+from compressed import open_text, compression
+from histogram import HistogramBins, merge_counts
+from columnar import ColumnarDataset
+from spill import SpillingAggregate
+from progress import Progress, Cancelled
+from prof_matrix import TitleMatcher, ProfCityMatrix
+import svg_charts
 
 
 # dic_money (dict): Глобальная переменная-словарь. 
@@ -63,31 +86,120 @@ class Vacancy:
         self.published_at = dict_vac['published_at']
 
 
+class VacancyFilter:
+    """Класс для представления условий отбора вакансий. Условия проверяются внутри чтения csv - 
+       по строке файла, до создания словаря и экземпляра Vacancy, поэтому отброшенные строки почти ничего не стоят.
+
+    Attributes:
+        years (tuple or None): Диапазон лет публикации (первый, последний) включительно
+        cities (frozenset or None): Допустимые города
+        salary_range (tuple or None): Диапазон средней зарплаты в рублях (от, до) включительно
+        currencies (frozenset or None): Допустимые валюты оклада
+        rates (currency_rates.RateTable or None): Курсы для перевода зарплаты в рубли (None - dic_money)
+    """
+    def __init__(self, years=None, cities=None, salary_range=None, currencies=None, rates=None):
+        """Инициализирует экземпляр VacancyFilter. Условие None - не проверяется
+
+        Args:
+            years (tuple or None): Диапазон лет публикации (первый, последний) включительно
+            cities (list or None): Допустимые города
+            salary_range (tuple or None): Диапазон средней зарплаты в рублях (от, до) включительно
+            currencies (list or None): Допустимые валюты оклада
+            rates (currency_rates.RateTable or None): Курсы для перевода зарплаты в рубли (None - dic_money)
+
+        Returns:
+            Экземпляр класса VacancyFilter
+        """
+        self.years = tuple(years) if years is not None else None
+        self.cities = frozenset(cities) if cities is not None else None
+        self.salary_range = tuple(salary_range) if salary_range is not None else None
+        self.currencies = frozenset(currencies) if currencies is not None else None
+        self.rates = rates
+
+    def compile(self, head):
+        """Строит функцию проверки строки csv-файла с заголовками head
+
+        Args:
+            head (list[str]): Заголовки столбцов файла
+
+        Returns:
+            function: Функция row (list[str]) -> bool
+        """
+        years, cities, salary_range, currencies, rates = \
+            self.years, self.cities, self.salary_range, self.currencies, self.rates
+        i_date, i_area, i_cur = head.index('published_at'), head.index('area_name'), head.index('salary_currency')
+        i_from, i_to = head.index('salary_from'), head.index('salary_to')
+
+        def accept(row):
+            if years is not None and not years[0] <= int(row[i_date][0:4]) <= years[1]:
+                return False
+            if cities is not None and row[i_area] not in cities:
+                return False
+            if currencies is not None and row[i_cur] not in currencies:
+                return False
+            if salary_range is not None:
+                cost = dic_money[row[i_cur]]['cost'] if rates is None else \
+                    rates.cost(timecodes.month_id(row[i_date]), row[i_cur])
+                if not salary_range[0] <= (float(row[i_from]) + float(row[i_to])) / 2 * cost <= salary_range[1]:
+                    return False
+            return True
+        return accept
+
+
 class DataSet:
     """Класс для представления данных о всех вакансиях.
 
     Attributes:
-        file_name (str): Имя файла csv с данными о вакансиях
-        vacancies_objects (list[Vacancy]): Лист экземпляров Vacancy хранящий данные о всех прочитанных из file_name вакансиях
+        file_name (str or list[str]): Имя файла csv с данными о вакансиях, маска файлов (glob), список файлов 
+            или секционированный по годам каталог (см. partitions.py)
+        file_names (list[str]): Список читаемых файлов
+        req_prof (str): Наименование запрашиваемой профессии
+        dedup (str or None): Режим удаления дубликатов
+        years (tuple or None): Диапазон лет публикации (первый, последний) включительно, None - все года
+        rates (currency_rates.RateTable or None): Помесячные курсы валют, None - постоянные курсы из dic_money
+        bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+        parts (frozenset or None): Накапливаемые части статистики для нужных показателей (None - все)
+        vacancies_objects (list[Vacancy] or None): Лист экземпляров Vacancy хранящий данные о всех прочитанных из file_name вакансиях
+            (None при чтении нескольких файлов - вакансии обрабатываются в процессах-обработчиках и не собираются вместе)
         dynamics_objects (__main__.DinamicObjects): Результаты первичной стат. обработки данных о вакансиях 
+        deduplicator (dedup.VacancyDeduplicator or None): Дедупликатор вакансий (None - дубликаты не удаляются)
+        duplicates_count (int): Количество отброшенных дубликатов вакансий
+        file_stats (list[dict]): Для каждого файла - количество прочитанных вакансий, дубликатов и время обработки (сек.)
     """
     @staticmethod    
-    def _сsv_reader(filename):
+    def _сsv_reader(filename, row_filter=None, progress=None):
         """Внутренний метод класса. Читает данные о вакансиях из файла filename
+           (сжатые файлы - gzip, bz2, xz, zstd - распаковываются потоком, см. compressed.py)
         
         Args:
             filename (str): Имя файла с данными о вакансиях
+            row_filter (VacancyFilter or None): Условия отбора вакансий - проверяются сразу при чтении строки
+            progress (progress.Progress or None): Ход обработки - раз в Progress.every строк 
+                (доля выполнения - по прочитанным байтам несжатого файла)
 
         Returns:
-            Список вакансий в виде list[list]. Из списка исключены вакансии, содержащие пустые поля
+            Список вакансий в виде list[list]. Из списка исключены вакансии, содержащие пустые поля 
+            и не прошедшие row_filter
         """
 
         result = []
-        with open(filename, encoding='utf-8-sig', newline='') as f:
+        if progress is not None:
+            progress.start(f'Чтение {filename}')
+            size = os.path.getsize(filename) if compression(filename) is None else 0
+        with open_text(filename) as f:
             reader = csv.reader(f)
-            for cur_row in reader:
+            accept, n = None, 0
+            for n, cur_row in enumerate(reader, 1):
+                if progress is not None and not n % Progress.every:
+                    progress.update(n, f.buffer.tell() / size if size else None)
                 if ('' in cur_row): continue
+                if accept is not None and not accept(cur_row): continue
+                if row_filter is not None and accept is None:
+                    accept = row_filter.compile(cur_row)
                 result.append(cur_row)
+        if progress is not None:
+            progress.done = n
+            progress.finish()
         return result
 
     @staticmethod
@@ -107,39 +219,649 @@ class DataSet:
         return [dict(zip(res_head, row)) for row in res_data]
     
     @staticmethod
-    def _csv_parser(task):
+    def _csv_parser(filename, deduplicator=None, skip=None, row_filter=None, progress=None):
         """Внутренний метод класса. Вызывает чтение и первичную очистку данных. 
            Удаляет 'грязь' из данных (теги, лишние пробелы и другую служебку).
            В данной версии т.к. по условию входные данные чистые эта часть удалена (добавлять из 5.2 Функции в ООП).
+           Если передан deduplicator - повторно встреченные вакансии отбрасываются до создания экземпляров Vacancy
         
         Args:
-            task (__main__.InputConnect): Экземпляр класса InputConnect, содержащий требования к формированию класса DataSet
+            filename (str): Имя файла с данными о вакансиях
+            deduplicator (dedup.VacancyDeduplicator or None): Дедупликатор вакансий
+            skip (frozenset or None): Номера строк-дубликатов, найденных заранее (по ключам нескольких файлов) - 
+                такие вакансии отбрасываются
+            row_filter (VacancyFilter or None): Условия отбора вакансий
+            progress (progress.Progress or None): Ход чтения файла
 
         Returns:
             list_vac (list[__main__.Vacancy]): Лист экземпляров Vacancy с данными о вакансиях
         """
-        res_data = DataSet._сsv_reader(task.task_params['filename']['val'])
+        res_data = DataSet._сsv_reader(filename, row_filter, progress)
         ld = DataSet._csv_filer(res_data)
         list_vac = []
-        for dct in ld:
+        for row, dct in enumerate(ld):
+            if skip is not None and row in skip:
+                continue
+            if deduplicator is not None and not deduplicator.add(DataSet.dedup_key(dct)):
+                continue
             list_vac.append(Vacancy(dct))
         return list_vac
 
-    def __init__(self, task):
+    @staticmethod
+    def dedup_key(dict_vac):
+        """Вычисляет ключ вакансии для поиска дубликатов по (name, area_name, published_at, зарплата)
+
+        Args:
+            dict_vac (dict): Словарь прочитанных данных для текущей вакансии
+
+        Returns:
+            int: Хеш вакансии
+        """
+        return vacancy_key(dict_vac['name'], dict_vac['area_name'], dict_vac['published_at'],
+                           dict_vac['salary_from'], dict_vac['salary_to'], dict_vac['salary_currency'])
+
+    @staticmethod
+    def input_files(file_name, years=None):
+        """Раскрывает запрос пользователя в список файлов с данными о вакансиях
+
+        Args:
+            file_name (str or list[str]): Имя файла, маска файлов (например 'vacancies_*.csv'), список файлов 
+                или секционированный по годам каталог
+            years (tuple or None): Диапазон лет - для секционированного каталога отбираются только секции этих лет
+
+        Returns:
+            list[str]: Список файлов (для маски - в порядке сортировки имен). Если маске не соответствует 
+            ни один файл или список пуст - FileNotFoundError
+        """
+        if partitions.is_partitioned(file_name):
+            return partitions.select_partitions(file_name, years)
+        if isinstance(file_name, (list, tuple)):
+            file_names = list(file_name)
+        elif glob.has_magic(file_name):
+            file_names = sorted(glob.glob(file_name))
+        else:
+            return [file_name]
+        if not file_names:
+            raise FileNotFoundError(f'Нет файлов с данными о вакансиях: {file_name}')
+        return file_names
+
+    @staticmethod
+    def _file_keys(filename, row_filter):
+        """Внутренний метод класса (выполняется в процессе-обработчике). Вычисляет ключи дубликатов всех вакансий файла
+
+        Args:
+            filename (str): Имя файла с данными о вакансиях
+            row_filter (VacancyFilter or None): Условия отбора вакансий
+
+        Returns:
+            list[int]: Ключи вакансий в порядке строк файла
+        """
+        return [DataSet.dedup_key(dct) for dct in DataSet._csv_filer(DataSet._сsv_reader(filename, row_filter))]
+
+    @staticmethod
+    def _file_aggregate(filename, req_prof, dedup, skip, row_filter, rates, bins=None, parts=None, progress=None):
+        """Внутренний метод класса (выполняется в процессе-обработчике). Читает один файл и считает по нему 
+           частичную статистику
+
+        Args:
+            filename (str): Имя файла с данными о вакансиях
+            req_prof (str): Наименование запрашиваемой профессии
+            dedup (str or None): Режим удаления дубликатов, None - не удалять
+            skip (frozenset or None): Номера строк-дубликатов, найденных заранее
+            row_filter (VacancyFilter or None): Условия отбора вакансий
+            rates (currency_rates.RateTable or None): Помесячные курсы валют
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            parts (iterable or None): Накапливаемые части статистики (см. VacancyAggregate.all_parts), None - все
+            progress (progress.Progress or None): Ход обработки (только при обработке в текущем процессе)
+
+        Returns:
+            tuple: (VacancyAggregate, dict - количество строк, дубликатов и время обработки файла)
+        """
+        start = time.perf_counter()
+        deduplicator = VacancyDeduplicator(dedup) if dedup else None
+        aggregate = VacancyAggregate(req_prof, rates, bins, parts)
+        aggregate.add_all(DataSet._csv_parser(filename, deduplicator, skip, row_filter, progress), progress)
+        return aggregate, {'file': filename, 'rows': aggregate.count,
+            'duplicates': deduplicator.duplicates_count if deduplicator else len(skip or ()),
+            'seconds': round(time.perf_counter() - start, 3)}
+
+    @staticmethod
+    def read_files(file_names, req_prof, dedup=None, rates=None, row_filter=None, bins=None, parts=None, progress=None):
+        """Параллельно (по одному заданию на файл) читает файлы file_names, 
+           считает по каждому частичную статистику и сливает результаты.
+           При удалении дубликатов сначала параллельно вычисляются ключи вакансий каждого файла, дубликаты 
+           отбираются в текущем процессе по мере поступления ключей (в порядке файлов): вакансия, встреченная 
+           раньше в этом же или в одном из предыдущих (по списку) файлов, считается дубликатом. 
+           Обработчику файла передаются только номера его строк-дубликатов.
+           Используется и для части файлов на одном из узлов распределенного расчета (см. distributed.py).
+           Пустой список (например, в секционированном каталоге нет секций запрошенных лет) - пустая статистика.
+           При отмене (Ctrl+C, см. progress.py) в Cancelled.partial - статистика по полностью обработанным файлам
+
+        Args:
+            file_names (list[str]): Читаемые файлы
+            req_prof (str): Наименование запрашиваемой профессии
+            dedup (str or None): Режим удаления дубликатов, None - не удалять
+            rates (currency_rates.RateTable or None): Помесячные курсы валют
+            row_filter (VacancyFilter or None): Условия отбора вакансий
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            parts (iterable or None): Накапливаемые части статистики (см. VacancyAggregate.all_parts), None - все
+            progress (progress.Progress or None): Ход обработки (по файлам; процессы-обработчики не прерываются по Ctrl+C)
+
+        Returns:
+            tuple: (VacancyAggregate - статистика по всем файлам, VacancyDeduplicator or None, list[dict] - file_stats)
+        """
+        count = len(file_names)
+        if count == 0:
+            return VacancyAggregate(req_prof, rates, bins, parts), VacancyDeduplicator(dedup) if dedup else None, []
+        if count == 1:
+            deduplicator = VacancyDeduplicator(dedup) if dedup else None
+            aggregate, stats = DataSet._file_aggregate(file_names[0], req_prof, dedup, None, row_filter, rates, bins, parts,
+                                                       progress)
+            if deduplicator is not None:
+                deduplicator.seen_count, deduplicator.duplicates_count = stats['rows'] + stats['duplicates'], stats['duplicates']
+            return aggregate, deduplicator, [stats]
+        workers = min(count, os.cpu_count() or 1)
+        seen = VacancyDeduplicator(dedup) if dedup else None
+        aggregate = VacancyAggregate(req_prof, rates, bins, parts)
+        file_stats = []
+        initargs = (signal.SIGINT, signal.SIG_IGN) if progress is not None else ()
+        with ProcessPoolExecutor(max_workers=workers, initializer=signal.signal if initargs else None, 
+                                 initargs=initargs) as executor:
+            try:
+                skips = [None] * count
+                if seen is not None:
+                    if progress is not None: progress.start('Поиск дубликатов', count, 'файлов')
+                    for i, keys in enumerate(executor.map(DataSet._file_keys, file_names, [row_filter] * count)):
+                        skips[i] = frozenset(row for row, key in enumerate(keys) if not seen.add(key))
+                        if progress is not None: progress.update(i + 1)
+                    if progress is not None: progress.finish()
+                if progress is not None: progress.start('Расчет статистики по файлам', count, 'файлов')
+                for part, stats in executor.map(DataSet._file_aggregate, file_names, [req_prof] * count, [None] * count, 
+                        skips, [row_filter] * count, [rates] * count, [bins] * count, [parts] * count):
+                    aggregate.merge(part)
+                    file_stats.append(stats)
+                    if progress is not None: progress.update(len(file_stats))
+            except Cancelled as e:
+                executor.shutdown(cancel_futures=True)
+                e.partial = aggregate
+                raise
+        if progress is not None: progress.finish()
+        return aggregate, seen, file_stats
+
+    def columnar(self):
+        """Строит столбцовое представление вакансий набора (см. columnar.py) - для публикации в общую память.
+           Зарплаты переводятся в рубли по курсам self.rates (или dic_money), курсы включаются в набор
+
+        Returns:
+            columnar.ColumnarDataset: Набор в обычной памяти (publish - опубликовать, save - сохранить в файл)
+        """
+        fallback = self.rates.fallback if self.rates is not None else {c: dic_money[c]['cost'] for c in dic_money}
+        return ColumnarDataset.from_vacancies(self._vacancies(), fallback, self.rates)
+
+    def _vacancies(self):
+        """Внутренний метод класса. Вакансии набора: прочитанные (один файл) или читаемые заново по одному файлу 
+           (с удалением дубликатов и отбором по годам, как при создании набора)
+
+        Returns:
+            list[Vacancy] or iterator: Вакансии
+        """
+        if self.vacancies_objects is not None:
+            return self.vacancies_objects
+        deduplicator = VacancyDeduplicator(self.dedup) if self.dedup else None
+        row_filter = VacancyFilter(years=self.years) if self.years is not None else None
+        return itertools.chain.from_iterable(DataSet._csv_parser(f, deduplicator, row_filter=row_filter) 
+                                             for f in self.file_names)
+
+    def _salary(self, vac):
+        """Внутренний метод класса. Сумма границ оклада вакансии в рублях (как в VacancyAggregate.add)
+
+        Args:
+            vac (Vacancy): Вакансия
+
+        Returns:
+            float: Зарплата (от + до) в рублях по курсу self.rates на месяц публикации (или dic_money)
+        """
+        currency = vac.salary.salary_currency
+        return ((float(vac.salary.salary_to)+float(vac.salary.salary_from)) *
+                (dic_money[currency]['cost'] if self.rates is None 
+                 else self.rates.cost(timecodes.month_id(vac.published_at), currency)))
+
+    @staticmethod
+    def _columnar_aggregate(source, req_prof, start, stop, bins=None, parts=None):
+        """Внутренний метод класса (выполняется в процессе-обработчике). Подключается к опубликованному 
+           столбцовому набору и считает частичную статистику по вакансиям start..stop
+
+        Args:
+            source (str): Имя блока общей памяти или файла набора
+            req_prof (str): Наименование запрашиваемой профессии
+            start, stop (int): Границы части набора
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            parts (iterable or None): Накапливаемые части статистики (см. VacancyAggregate.all_parts), None - все
+
+        Returns:
+            VacancyAggregate: Частичная статистика
+        """
+        data = ColumnarDataset.attach(source)
+        try:
+            aggregate = VacancyAggregate(req_prof, bins=bins, parts=parts)
+            aggregate.add_columns(data, start, stop)
+        finally:
+            data.close()
+        return aggregate
+
+    @staticmethod
+    def columnar_stats(data, req_prof, workers=None, bins=None, parts=None):
+        """Статистика по столбцовому набору. Опубликованный (publish, save) набор делится на workers частей, 
+           процессы-обработчики подключаются к нему без копирования и pickle, обратно передается только 
+           частичная статистика. Набор в обычной памяти обрабатывается в текущем процессе
+
+        Args:
+            data (columnar.ColumnarDataset): Столбцовый набор
+            req_prof (str): Наименование запрашиваемой профессии
+            workers (int or None): Количество процессов-обработчиков (None - по количеству процессоров)
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            parts (iterable or None): Накапливаемые части статистики (см. VacancyAggregate.all_parts), None - все
+
+        Returns:
+            DynamicObjects: Статистика
+        """
+        aggregate = VacancyAggregate(req_prof, bins=bins, parts=parts)
+        if data.source is None:
+            aggregate.add_columns(data)
+            return DynamicObjects(None, None, aggregate)
+        workers = workers or os.cpu_count() or 1
+        bounds = [len(data) * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(DataSet._columnar_aggregate, [data.source] * workers, [req_prof] * workers, 
+                                      bounds[:-1], bounds[1:], [bins] * workers, [parts] * workers))
+        for part in parts:
+            aggregate.merge(part)
+        return DynamicObjects(None, None, aggregate)
+
+    def group_stats(self, columns, filename, memory_budget=256 << 20, partitions=16):
+        """Средняя зарплата и количество вакансий по группам с большим числом ключей (например, название 
+           вакансии x город) с ограничением памяти: при превышении memory_budget накопленные группы сбрасываются 
+           на диск частями по хешу ключа и в конце сливаются по одной части (см. spill.py). 
+           Результат записывается в csv-файл потоком, группы одной части подряд
+
+        Args:
+            columns (list[str]): Свойства Vacancy, образующие ключ группы (например ['name', 'area_name'])
+            filename (str): Имя csv-файла результата (столбцы columns, 'salary', 'count')
+            memory_budget (int): Бюджет памяти словаря групп, байт
+            partitions (int): Количество частей при сбросе на диск
+
+        Returns:
+            dict: {'groups': количество групп, 'spills': количество сбросов на диск}
+        """
+        groups = 0
+        with SpillingAggregate(memory_budget, partitions) as aggregate:
+            for vac in self._vacancies():
+                aggregate.add(tuple(getattr(vac, c) for c in columns), self._salary(vac))
+            with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(list(columns) + ['salary', 'count'])
+                for key, total, count in aggregate.items():
+                    writer.writerow(list(key) + [int(total / (count * 2)), count])
+                    groups += 1
+            return {'groups': groups, 'spills': aggregate.spills}
+
+    def prof_city_matrix(self, professions):
+        """Средние зарплаты и количества вакансий сразу для многих профессий по всем городам - за один проход 
+           по вакансиям. Название вакансии сопоставляется со всеми профессиями одним автоматом (prof_matrix.py), 
+           вакансия учитывается в ячейках всех подходящих профессий
+
+        Args:
+            professions (list[str]): Названия профессий (как req_prof)
+
+        Returns:
+            prof_matrix.ProfCityMatrix: Разреженная матрица профессия x город
+        """
+        matcher = TitleMatcher(professions)
+        matrix = ProfCityMatrix(professions)
+        for vac in self._vacancies():
+            profs = matcher.match(vac.name)
+            if profs:
+                salary = self._salary(vac)
+                for prof in profs:
+                    matrix.add(prof, vac.area_name, salary)
+        return matrix
+
+    def stats(self, prof=None, cities=None, years=None, salary_range=None, currencies=None):
+        """Статистика по срезу данных. Условия отбора проверяются при чтении строк файлов (отброшенные строки 
+           не превращаются в Vacancy), для секционированного каталога секции вне years не читаются.
+           Результаты запомнены (LRU-кеш): повторный запрос с теми же параметрами не читает данные
+
+        Args:
+            prof (str or None): Наименование профессии для статистики 'выбранной профессии' (None - req_prof)
+            cities (list or None): Только вакансии этих городов
+            years (tuple or None): Только вакансии этих лет (первый, последний) - None - self.years
+            salary_range (tuple or None): Только вакансии со средней зарплатой в рублях в диапазоне (от, до)
+            currencies (list or None): Только вакансии с окладом в этих валютах
+
+        Returns:
+            DynamicObjects: Статистика по срезу
+        """
+        return self._stats_cache(self.req_prof if prof is None else prof,
+            tuple(sorted(cities)) if cities is not None else None,
+            tuple(years) if years is not None else self.years,
+            tuple(salary_range) if salary_range is not None else None,
+            tuple(sorted(currencies)) if currencies is not None else None)
+
+    def _stats(self, prof, cities, years, salary_range, currencies):
+        """Внутренний метод класса. Вычисляет статистику по срезу (вызывается через LRU-кеш из stats)
+
+        Args:
+            prof, cities, years, salary_range, currencies: Нормализованные (хешируемые) параметры stats
+
+        Returns:
+            DynamicObjects: Статистика по срезу
+        """
+        row_filter = VacancyFilter(years, cities, salary_range, currencies, self.rates)
+        aggregate, _, _ = DataSet.read_files(DataSet.input_files(self.file_name, years), prof, self.dedup, self.rates,
+                                             row_filter, self.bins, self.parts)
+        return DynamicObjects(None, None, aggregate)
+
+    def __init__(self, task, dedup=None, years=None, rates=None, cache_size=32, bins=None, statistics=None, progress=None):
         """Инициализирует экземпляр класса DataSet.
+           Несколько файлов (список или маска в task) читаются параллельно, по одному заданию-процессу на файл.
+           Для секционированного каталога читаются только секции лет из years
 
         Args:
             task (__main__.InputConnect): Экземпляр класса InputConnect, содержащий требования к формированию класса DataSet
+            dedup (str or None): Режим удаления дубликатов ('exact', 'bloom', 'auto'), None - не удалять
+            years (tuple or None): Диапазон лет публикации (первый, последний) включительно, None - все года
+            rates (currency_rates.RateTable or None): Помесячные курсы валют для перевода зарплат в рубли по дате 
+                публикации, None - постоянные курсы из dic_money
+            cache_size (int): Количество запоминаемых результатов stats
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            statistics (iterable or None): Нужные показатели DynamicObjects (None - все) - при чтении накапливаются 
+                только нужные им части статистики (например, без скетчей и гистограмм для таблицы зарплат по годам)
+            progress (progress.Progress or None): Ход чтения и расчета статистики. При отмене (Ctrl+C) - Cancelled, 
+                в Cancelled.partial - статистика по уже учтенным вакансиям (None - если отмена при чтении файла)
 
         Returns:
             Экземпляр класса с заполненными свойствами vacancies_objects и dynamics_objects
         """
         self.file_name = task.task_params['filename']['val']
-        self.vacancies_objects = DataSet._csv_parser(task)
-        self.dynamics_objects = DynamicObjects(task, self.vacancies_objects)
+        self.req_prof = task.task_params['req_prof']['val']
+        self.dedup = dedup
+        self.years = tuple(years) if years is not None else None
+        self.rates = rates
+        self.bins = bins
+        self.parts = DynamicObjects.parts_for(statistics)
+        self.file_names = DataSet.input_files(self.file_name, years)
+        self._stats_cache = functools.lru_cache(maxsize=cache_size)(self._stats)
+        row_filter = VacancyFilter(years=years) if years is not None else None
+        if len(self.file_names) == 1:
+            start = time.perf_counter()
+            self.deduplicator = VacancyDeduplicator(dedup) if dedup else None
+            self.vacancies_objects = DataSet._csv_parser(self.file_names[0], self.deduplicator, row_filter=row_filter,
+                                                         progress=progress)
+            self.dynamics_objects = DynamicObjects(task, self.vacancies_objects, rates=rates, bins=bins, parts=self.parts,
+                                                   progress=progress)
+            self.file_stats = [{'file': self.file_names[0], 'rows': len(self.vacancies_objects),
+                'duplicates': self.deduplicator.duplicates_count if self.deduplicator else 0,
+                'seconds': round(time.perf_counter() - start, 3)}]
+        else:
+            self.vacancies_objects = None
+            aggregate, self.deduplicator, self.file_stats = DataSet.read_files(self.file_names, self.req_prof, dedup,
+                                                                                 rates, row_filter, bins, self.parts, progress)
+            self.dynamics_objects = DynamicObjects(task, None, aggregate)
+        self.duplicates_count = self.deduplicator.duplicates_count if self.deduplicator else 0
+
+
+class VacancyAggregate:
+    """Класс для представления частичной (сливаемой) статистики - сумм и количеств по группам вакансий.
+       Заполняется построчно методом add, части, посчитанные по разным файлам или процессам, объединяются методом merge.
+       Итоговые показатели по нему вычисляет DynamicObjects.
+
+    Attributes:
+        req_prof (str): Наименование запрашиваемой профессии
+        rates (currency_rates.RateTable or None): Помесячные курсы валют, None - постоянные курсы из dic_money
+        count (int): Количество учтенных вакансий
+        sal_by_month, vac_by_month (dict): Сумма зарплат (от + до) и количество вакансий по номерам месяцев 
+            (см. timecodes.py) - по ним же считаются кварталы и годы
+        sal_by_month_prof, vac_by_month_prof (dict): То же для выбранной профессии
+        cities (cities.CityDictionary): Номера городов (в порядке первого появления)
+        sal_by_city, vac_by_city (list): Сумма зарплат (от + до) и количество вакансий по номерам городов
+        year_sketches (dict): Квантильные скетчи зарплат по годам
+        city_sketches (list): Квантильные скетчи зарплат по номерам городов
+        name_top, city_top (heavy_hitters.SpaceSaving): Сводки самых частых названий вакансий и городов
+        prof_key (str): Нормализованное название профессии (ищется в нормализованных названиях вакансий)
+        titles (titles.TitleNormalizer): Нормализатор названий вакансий с LRU-кешем (hit_rate - доля попаданий)
+        bins (histogram.HistogramBins): Интервалы гистограмм зарплат
+        year_histograms (dict): Гистограммы зарплат по годам {год: list[int] - количество вакансий в интервалах bins}
+        parts (frozenset): Накапливаемые необязательные части статистики (см. all_parts) - не накопленные 
+            суммы, скетчи, гистограммы и сводки остаются пустыми
+    """
+    # histogram_bins (histogram.HistogramBins): Интервалы гистограмм зарплат по умолчанию 
+    # (сливаются только части с одинаковыми интервалами)
+    histogram_bins = HistogramBins(0, 500_000, 50)
+    # all_parts (tuple): Необязательные части статистики - 'prof' (суммы выбранной профессии), 'cities' (суммы 
+    # по городам), 'quantiles' (скетчи по годам и городам), 'histogram' (гистограммы), 'top' (частые названия и города)
+    all_parts = ('prof', 'cities', 'quantiles', 'histogram', 'top')
+
+    def __init__(self, req_prof, rates=None, bins=None, parts=None):
+        """Инициализирует пустой экземпляр VacancyAggregate.
+
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии
+            rates (currency_rates.RateTable or None): Помесячные курсы валют, None - постоянные курсы из dic_money
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - histogram_bins
+            parts (iterable or None): Накапливаемые части статистики из all_parts (None - все). Суммы и количества 
+                по месяцам накапливаются всегда, остальное - только для нужных показателей (см. DynamicObjects.parts_for)
+
+        Returns:
+            Экземпляр класса VacancyAggregate
+        """
+        self.parts = frozenset(VacancyAggregate.all_parts if parts is None else parts)
+        if not self.parts <= set(VacancyAggregate.all_parts):
+            raise ValueError(f'Неизвестные части статистики: {sorted(self.parts - set(VacancyAggregate.all_parts))}')
+        self._prof, self._cities, self._quantiles, self._histogram, self._top = \
+            (part in self.parts for part in VacancyAggregate.all_parts)
+        self.req_prof = req_prof
+        self.rates = rates
+        self.count = 0
+        self.sal_by_month, self.vac_by_month = {}, {}
+        self.sal_by_month_prof, self.vac_by_month_prof = {}, {}
+        self.cities = CityDictionary()
+        self.sal_by_city, self.vac_by_city = [], []
+        self.year_sketches, self.city_sketches = {}, []
+        self.name_top, self.city_top = SpaceSaving(), SpaceSaving()
+        self.prof_key = normalize_title(req_prof)
+        self.titles = TitleNormalizer()
+        self.bins = bins if bins is not None else VacancyAggregate.histogram_bins
+        self.year_histograms = {}
+
+    def add(self, vac):
+        """Учитывает в статистике одну вакансию
+
+        Args:
+            vac (Vacancy): Вакансия
+        """
+        month = timecodes.month_id(vac.published_at)
+        year = month // 12
+        currency = vac.salary.salary_currency
+        sal_m = ((float(vac.salary.salary_to)+float(vac.salary.salary_from)) *
+                (dic_money[currency]['cost'] if self.rates is None else self.rates.cost(month, currency)))
+        self.count += 1
+        if (month in self.sal_by_month):
+            self.sal_by_month[month] += sal_m
+            self.vac_by_month[month] += 1
+        else:
+            self.sal_by_month[month] = sal_m
+            self.vac_by_month[month] = 1
+        if (self._quantiles):
+            if (year not in self.year_sketches):
+                self.year_sketches[year] = KLLSketch()
+            self.year_sketches[year].update(sal_m / 2)
+        if (self._histogram):
+            if (year not in self.year_histograms):
+                self.year_histograms[year] = [0] * self.bins.count
+            self.year_histograms[year][self.bins.index(sal_m / 2)] += 1
+        if (self._prof and self.prof_key in self.titles(vac.name)):
+            if (month in self.sal_by_month_prof):
+                self.sal_by_month_prof[month] += sal_m
+                self.vac_by_month_prof[month] += 1
+            else:
+                self.sal_by_month_prof[month] = sal_m
+                self.vac_by_month_prof[month] = 1
+        if (self._cities):
+            city = self.cities.id(vac.area_name)
+            if (city < len(self.vac_by_city)):
+                self.sal_by_city[city] += sal_m
+                self.vac_by_city[city] += 1
+            else:
+                self.sal_by_city.append(sal_m)
+                self.vac_by_city.append(1)
+                if (self._quantiles):
+                    self.city_sketches.append(KLLSketch())
+            if (self._quantiles):
+                self.city_sketches[city].update(sal_m / 2)
+        if (self._top):
+            self.name_top.update(vac.name)
+            self.city_top.update(vac.area_name)
+
+    def add_all(self, vacancies, progress=None):
+        """Учитывает в статистике вакансии списка (ход обработки отмечается раз в Progress.every вакансий)
+
+        Args:
+            vacancies (list[Vacancy]): Вакансии
+            progress (progress.Progress or None): Ход обработки. При отмене - Cancelled, в Cancelled.partial - 
+                текущая статистика (каждая вакансия учтена полностью или не учтена)
+        """
+        if progress is None:
+            for vac in vacancies:
+                self.add(vac)
+            return
+        progress.start('Расчет статистики', len(vacancies))
+        try:
+            for n, vac in enumerate(vacancies, 1):
+                self.add(vac)
+                if not n % Progress.every:
+                    progress.update(n)
+        except Cancelled as e:
+            e.partial = self
+            raise
+        progress.done = len(vacancies)
+        progress.finish()
+
+    def add_columns(self, data, start=0, stop=None):
+        """Учитывает в статистике вакансии start..stop столбцового набора (см. columnar.py). 
+           Суммы и количества считаются по массивам numpy, скетчи и сводки частых значений - построчно 
+           в порядке вакансий (результат тот же, что при add для каждой вакансии)
+
+        Args:
+            data (columnar.ColumnarDataset): Столбцовый набор (в т.ч. подключенный к общей памяти)
+            start (int): Номер первой вакансии
+            stop (int or None): Номер вакансии после последней (None - до конца набора)
+        """
+        stop = len(data) if stop is None else stop
+        months = data.columns['month'][start:stop]
+        salaries = data.columns['salary'][start:stop]
+        cities = data.columns['city'][start:stop]
+        names = data.columns['name'][start:stop]
+        if len(months) == 0:
+            return
+        self.count += len(months)
+        groups = [(self.sal_by_month, self.vac_by_month, months, salaries)]
+        if (self._prof):
+            name_codes, name_inverse = np.unique(names, return_inverse=True)
+            is_prof = np.array([self.prof_key in self.titles(data.names[c]) for c in name_codes.tolist()], dtype=bool)
+            is_prof = is_prof[name_inverse]
+            groups.append((self.sal_by_month_prof, self.vac_by_month_prof, months[is_prof], salaries[is_prof]))
+        for by_sal, by_vac, m, sal in groups:
+            keys, inverse = np.unique(m, return_inverse=True)
+            sums, counts = np.bincount(inverse, weights=sal, minlength=len(keys)), np.bincount(inverse, minlength=len(keys))
+            for key, total, n in zip(keys.tolist(), sums.tolist(), counts.tolist()):
+                by_sal[key] = by_sal.get(key, 0) + total
+                by_vac[key] = by_vac.get(key, 0) + n
+        halves = salaries / 2
+        years, half_values = (months // 12).tolist(), halves.tolist()
+        if (self._cities):
+            city_codes, city_first, city_inverse = np.unique(cities, return_index=True, return_inverse=True)
+            for code in city_codes[np.argsort(city_first, kind='stable')].tolist():
+                self.cities.id(data.cities[code])
+            ids = np.array([self.cities.ids[data.cities[c]] for c in city_codes.tolist()], dtype='int64')[city_inverse]
+            added = len(self.cities) - len(self.vac_by_city)
+            self.sal_by_city.extend([0] * added)
+            self.vac_by_city.extend([0] * added)
+            sums, counts = np.bincount(ids, weights=salaries, minlength=len(self.cities)), np.bincount(ids, minlength=len(self.cities))
+            for i in np.flatnonzero(counts).tolist():
+                self.sal_by_city[i] += sums[i].item()
+                self.vac_by_city[i] += counts[i].item()
+            if (self._quantiles):
+                self.city_sketches.extend(KLLSketch() for _ in range(added))
+                for city, half in zip(ids.tolist(), half_values):
+                    self.city_sketches[city].update(half)
+        if (self._quantiles):
+            for year, half in zip(years, half_values):
+                if (year not in self.year_sketches):
+                    self.year_sketches[year] = KLLSketch()
+                self.year_sketches[year].update(half)
+        if (self._histogram):
+            for year, hist_index in zip(years, self.bins.indices(halves).tolist()):
+                if (year not in self.year_histograms):
+                    self.year_histograms[year] = [0] * self.bins.count
+                self.year_histograms[year][hist_index] += 1
+        if (self._top):
+            for name_code, city_code in zip(names.tolist(), cities.tolist()):
+                self.name_top.update(data.names[name_code])
+                self.city_top.update(data.cities[city_code])
+
+    def merge(self, other):
+        """Добавляет к текущей статистике статистику другой части данных
+
+        Args:
+            other (VacancyAggregate): Статистика другой части данных (для той же профессии, с теми же частями)
+
+        Returns:
+            VacancyAggregate: Текущая статистика (self)
+        """
+        if other.bins != self.bins:
+            raise ValueError(f'Нельзя слить гистограммы с разными интервалами: {self.bins} и {other.bins}')
+        if other.parts != self.parts:
+            raise ValueError(f'Нельзя слить статистику с разными частями: {sorted(self.parts)} и {sorted(other.parts)}')
+        self.count += other.count
+        for mine, theirs in ((self.sal_by_month, other.sal_by_month), (self.vac_by_month, other.vac_by_month),
+                             (self.sal_by_month_prof, other.sal_by_month_prof), (self.vac_by_month_prof, other.vac_by_month_prof)):
+            for key, value in theirs.items():
+                mine[key] = mine.get(key, 0) + value
+        for key, sketch in other.year_sketches.items():
+            if key in self.year_sketches:
+                self.year_sketches[key].merge(sketch)
+            else:
+                self.year_sketches[key] = sketch
+        for key, counts in other.year_histograms.items():
+            if key in self.year_histograms:
+                merge_counts(self.year_histograms[key], counts)
+            else:
+                self.year_histograms[key] = list(counts)
+        mapping = self.cities.remap(other.cities)
+        added = len(self.cities) - len(self.vac_by_city)
+        self.sal_by_city.extend([0] * added)
+        self.vac_by_city.extend([0] * added)
+        if (self._quantiles):
+            self.city_sketches.extend([None] * added)
+        for theirs, mine in enumerate(mapping):
+            self.sal_by_city[mine] += other.sal_by_city[theirs]
+            self.vac_by_city[mine] += other.vac_by_city[theirs]
+            if not self._quantiles:
+                continue
+            if self.city_sketches[mine] is None:
+                self.city_sketches[mine] = other.city_sketches[theirs]
+            else:
+                self.city_sketches[mine].merge(other.city_sketches[theirs])
+        self.name_top.merge(other.name_top)
+        self.city_top.merge(other.city_top)
+        self.titles.merge(other.titles)
+        return self
+
 
 class DynamicObjects:  
     """Класс для представления данных о всех вакансиях.
+       Показатели - свойства, вычисляемые при первом обращении к ним (и запоминаемые) по общей частичной 
+       статистике aggregate: вычисляются только те показатели, которые действительно используются
 
     Attributes:
         Свойства в виде словарей {наименование показателя: словарь вычисленных значений}
@@ -149,70 +871,251 @@ class DynamicObjects:
         vacByYearProf (dict): Статистика для динамики количества вакансий по годам для выбранной профессии 
         salByCity (dict): Статистика для уровеня зарплат по городам (в порядке убывания) 
         vacByCity (dict): Статистика для доли вакансий по городам (в порядке убывания)
+        salQuantByYear (dict): Статистика для p10, медианы и p90 зарплат по годам
+        salQuantByCity (dict): Статистика для p10, медианы и p90 зарплат по городам (для городов из salByCity)
+        topProf (dict): Статистика для самых частых названий вакансий {название: количество вакансий (оценка)}
+        topCity (dict): Статистика для самых частых городов {город: количество вакансий (оценка)}
+        salHistByYear (dict): Статистика для распределения зарплат по годам {год: количества вакансий в интервалах 
+            гистограммы aggregate.bins}
+        aggregate (VacancyAggregate): Частичная статистика, по которой вычислены показатели (используется by_period)
     """
-    def __init__(self, task, vacancies_objects):
+    # periods (dict): Поддерживаемые периоды динамики {период: (функция номер месяца -> номер периода, подпись, 
+    # функция номер периода -> подпись)}
+    periods = {'year': (timecodes.month_year, 'годам', str),
+               'quarter': (timecodes.month_quarter, 'кварталам', timecodes.quarter_label),
+               'month': (lambda mid: mid, 'месяцам', timecodes.month_label)}
+    # top_count (int): Количество значений в topProf и topCity
+    top_count = 20
+    # quantiles (tuple): Уровни квантилей для salQuantByYear и salQuantByCity - p10, медиана, p90
+    quantiles = (0.1, 0.5, 0.9)
+    # statistic_parts (dict): Части частичной статистики (VacancyAggregate.all_parts), нужные показателям
+    statistic_parts = {'salByYear': (), 'vacByYear': (), 'salByYearProf': ('prof',), 'vacByYearProf': ('prof',),
+                       'salByCity': ('cities',), 'vacByCity': ('cities',), 'salQuantByYear': ('quantiles',),
+                       'salQuantByCity': ('cities', 'quantiles'), 'topProf': ('top',), 'topCity': ('top',),
+                       'salHistByYear': ('histogram',)}
+
+    def __init__(self, task, vacancies_objects, aggregate=None, rates=None, bins=None, parts=None, progress=None):
         """Инициализирует экземпляр класса DynamicObjects.
 
         Args:
             task (__main__.InputConnect): Экземпляр класса InputConnect, содержащий требования к формированию класса DataSet
             vacancies_objects (list[Vacancy]): Лист экземпляров Vacancy хранящий данные о всех прочитанных из file_name вакансиях 
+            aggregate (VacancyAggregate or None): Уже посчитанная (например, параллельно по нескольким файлам) 
+                частичная статистика - если передана, vacancies_objects не используется
+            rates (currency_rates.RateTable or None): Помесячные курсы валют, None - постоянные курсы из dic_money
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            parts (iterable or None): Накапливаемые части статистики (см. VacancyAggregate.all_parts), None - все
+            progress (progress.Progress or None): Ход расчета статистики (см. VacancyAggregate.add_all)
 
         Returns:
-            Экземпляр класса с вычисленными значениями статистики для переданных task и vacancies_objects
-        """
-        self.salByYear     = {'name': 'Динамика уровня зарплат по годам', 'val': {}}                
-        self.vacByYear     = {'name': 'Динамика количества вакансий по годам', 'val': {}} 
-        self.salByYearProf = {'name': 'Динамика уровня зарплат по годам для выбранной профессии', 'val': {}}
-        self.vacByYearProf = {'name': 'Динамика количества вакансий по годам для выбранной профессии', 'val': {}}
-        self.salByCity     = {'name': 'Уровень зарплат по городам (в порядке убывания)', 'val': {}} 
-        self.vacByCity     = {'name': 'Доля вакансий по городам (в порядке убывания)', 'val': {}}
-        for vac in vacancies_objects:
-            year = int(vac.published_at[0:4])
-            sal_m = ((float(vac.salary.salary_to)+float(vac.salary.salary_from)) *
-                    dic_money[vac.salary.salary_currency]['cost'])
-            if (year in self.salByYear['val'].keys()):
-                self.salByYear['val'][year] += sal_m
-                self.vacByYear['val'][year] += 1
-            else:
-                self.salByYear['val'][year] = sal_m
-                self.vacByYear['val'][year] = 1
-            if (task.task_params['req_prof']['val'] in vac.name):
-                if (year in self.salByYearProf['val'].keys()):
-                    self.salByYearProf['val'][year] += sal_m
-                    self.vacByYearProf['val'][year] += 1
-                else:
-                    self.salByYearProf['val'][year] = sal_m
-                    self.vacByYearProf['val'][year] = 1
-            city = vac.area_name
-            if (city in self.salByCity['val'].keys()):
-                self.salByCity['val'][city] += sal_m
-                self.vacByCity['val'][city] += 1
-            else:
-                self.salByCity['val'][city] = sal_m
-                self.vacByCity['val'][city] = 1
-        for k in self.salByYear['val'].keys(): 
-            self.salByYear['val'][k] = int(self.salByYear['val'][k] / (self.vacByYear['val'][k] * 2))
-        self.salByYear['val'] = dict(sorted(self.salByYear['val'].items(), key = lambda x: x[0]))
-        self.vacByYear['val'] = dict(sorted(self.vacByYear['val'].items(), key = lambda x: x[0]))
-        if len(self.vacByYearProf['val']) == 0: 
-            self.salByYearProf['val'] = {2022: 0}
-            self.vacByYearProf['val'] = {2022: 0}
-        else:
-            for k in self.vacByYearProf['val'].keys():
-                self.salByYearProf['val'][k] = int(self.salByYearProf['val'][k] / (self.vacByYearProf['val'][k] * 2))
-        self.salByYearProf['val'] = dict(sorted(self.salByYearProf['val'].items(), key = lambda x: x[0]))
-        self.vacByYearProf['val'] = dict(sorted(self.vacByYearProf['val'].items(), key = lambda x: x[0]))
-        
-        for c in self.salByCity['val'].keys():
-            self.salByCity['val'][c] = int(self.salByCity['val'][c] / (self.vacByCity['val'][c] * 2))
-        self.vacByCity['val'] = dict(filter(lambda x: x[1] >= len(vacancies_objects) / 100, self.vacByCity['val'].items()))
-        self.salByCity['val'] = dict(filter(lambda x: self.vacByCity['val'].__contains__(x[0])  , self.salByCity['val'].items()))
-        self.salByCity['val'] = dict(sorted(self.salByCity['val'].items(), key = lambda x: x[1], reverse=True))
-        self.vacByCity['val'] = dict(sorted(self.vacByCity['val'].items(), key = lambda x: (-x[1])))
-        for c in self.vacByCity['val']:
-            self.vacByCity['val'][c] = round(self.vacByCity['val'][c] / len(vacancies_objects), 4)
-        self.salByCity['val'] = dict(itertools.islice(self.salByCity['val'].items(), 10))
-        self.vacByCity['val'] = dict(itertools.islice(self.vacByCity['val'].items(), 10))    
+            Экземпляр класса с частичной статистикой для переданных task и vacancies_objects 
+            (показатели вычисляются при обращении к ним)
+        """
+        if aggregate is None:
+            aggregate = VacancyAggregate(task.task_params['req_prof']['val'], rates, bins, parts)
+            aggregate.add_all(vacancies_objects, progress)
+        self.aggregate = aggregate
+
+    @staticmethod
+    def parts_for(statistics):
+        """Части частичной статистики, нужные для показателей statistics
+
+        Args:
+            statistics (iterable or None): Имена показателей (свойств класса), None - все показатели
+
+        Returns:
+            frozenset or None: Части для VacancyAggregate (None - все)
+
+        >>> sorted(DynamicObjects.parts_for(['salByYear', 'salQuantByCity']))
+        ['cities', 'quantiles']
+        """
+        if statistics is None:
+            return None
+        unknown = set(statistics) - set(DynamicObjects.statistic_parts)
+        if unknown:
+            raise ValueError(f'Неизвестные показатели: {sorted(unknown)}')
+        return frozenset(part for name in statistics for part in DynamicObjects.statistic_parts[name])
+
+    def _require(self, name):
+        """Внутренний метод класса. Проверяет, что для показателя name накоплены нужные части статистики
+
+        Args:
+            name (str): Имя показателя
+        """
+        missing = set(DynamicObjects.statistic_parts[name]) - self.aggregate.parts
+        if missing:
+            raise ValueError(f'Показатель {name} не вычисляется: не накоплены части статистики {sorted(missing)}')
+
+    @functools.cached_property
+    def salByYear(self):
+        """Статистика для динамики уровня зарплат по годам (вычисляется при первом обращении)"""
+        sal = DynamicObjects.rollup(self.aggregate.sal_by_month, timecodes.month_year)
+        vac = self.vacByYear['val']
+        return {'name': 'Динамика уровня зарплат по годам', 
+                'val': {k: int(sal[k] / (vac[k] * 2)) for k in sorted(sal)}}
+
+    @functools.cached_property
+    def vacByYear(self):
+        """Статистика для динамики количества вакансий по годам (вычисляется при первом обращении)"""
+        vac = DynamicObjects.rollup(self.aggregate.vac_by_month, timecodes.month_year)
+        return {'name': 'Динамика количества вакансий по годам', 'val': dict(sorted(vac.items(), key = lambda x: x[0]))}
+
+    @functools.cached_property
+    def salByYearProf(self):
+        """Статистика для динамики уровня зарплат по годам для выбранной профессии (вычисляется при первом обращении)"""
+        self._require('salByYearProf')
+        sal = DynamicObjects.rollup(self.aggregate.sal_by_month_prof, timecodes.month_year)
+        vac = DynamicObjects.rollup(self.aggregate.vac_by_month_prof, timecodes.month_year)
+        return {'name': 'Динамика уровня зарплат по годам для выбранной профессии', 
+                'val': {k: int(sal[k] / (vac[k] * 2)) for k in sorted(sal)} if vac else {2022: 0}}
+
+    @functools.cached_property
+    def vacByYearProf(self):
+        """Статистика для динамики количества вакансий по годам для выбранной профессии (вычисляется при первом обращении)"""
+        self._require('vacByYearProf')
+        vac = DynamicObjects.rollup(self.aggregate.vac_by_month_prof, timecodes.month_year)
+        return {'name': 'Динамика количества вакансий по годам для выбранной профессии', 
+                'val': dict(sorted(vac.items(), key = lambda x: x[0])) if vac else {2022: 0}}
+
+    def _frequent_cities(self):
+        """Внутренний метод класса. Города, в которых не меньше 1% всех вакансий
+
+        Returns:
+            list[tuple]: (номер города, название города) в порядке первого появления
+        """
+        threshold = self.aggregate.count / 100
+        return [(i, c) for i, c in enumerate(self.aggregate.cities.names) if self.aggregate.vac_by_city[i] >= threshold]
+
+    @functools.cached_property
+    def salByCity(self):
+        """Статистика для уровня зарплат по 10 городам (в порядке убывания, вычисляется при первом обращении)"""
+        self._require('salByCity')
+        sal, vac = self.aggregate.sal_by_city, self.aggregate.vac_by_city
+        levels = sorted(((c, int(sal[i] / (vac[i] * 2))) for i, c in self._frequent_cities()), key = lambda x: x[1], reverse=True)
+        return {'name': 'Уровень зарплат по городам (в порядке убывания)', 'val': dict(itertools.islice(levels, 10))}
+
+    @functools.cached_property
+    def vacByCity(self):
+        """Статистика для доли вакансий по 10 городам (в порядке убывания, вычисляется при первом обращении)"""
+        self._require('vacByCity')
+        vac, count = self.aggregate.vac_by_city, self.aggregate.count
+        counts = sorted(((c, vac[i]) for i, c in self._frequent_cities()), key = lambda x: (-x[1]))
+        return {'name': 'Доля вакансий по городам (в порядке убывания)', 
+                'val': {c: round(n / count, 4) for c, n in itertools.islice(counts, 10)}}
+
+    @functools.cached_property
+    def salQuantByYear(self):
+        """Статистика для p10, медианы и p90 зарплат по годам (вычисляется при первом обращении)"""
+        self._require('salQuantByYear')
+        return {'name': 'Зарплаты по годам (p10, медиана, p90)', 
+                'val': {y: DynamicObjects.sketch_quantiles(self.aggregate.year_sketches[y]) for y in self.vacByYear['val']}}
+
+    @functools.cached_property
+    def salQuantByCity(self):
+        """Статистика для p10, медианы и p90 зарплат по городам из salByCity (вычисляется при первом обращении)"""
+        self._require('salQuantByCity')
+        sketches, ids = self.aggregate.city_sketches, self.aggregate.cities.ids
+        return {'name': 'Зарплаты по городам (p10, медиана, p90)', 
+                'val': {c: DynamicObjects.sketch_quantiles(sketches[ids[c]]) for c in self.salByCity['val']}}
+
+    @functools.cached_property
+    def topProf(self):
+        """Статистика для самых частых названий вакансий (вычисляется при первом обращении)"""
+        self._require('topProf')
+        return {'name': 'Самые частые названия вакансий', 
+                'val': {name: n for name, n, _ in self.aggregate.name_top.top(DynamicObjects.top_count)}}
+
+    @functools.cached_property
+    def topCity(self):
+        """Статистика для самых частых городов (вычисляется при первом обращении)"""
+        self._require('topCity')
+        return {'name': 'Самые частые города вакансий', 
+                'val': {city: n for city, n, _ in self.aggregate.city_top.top(DynamicObjects.top_count)}}
+
+    @functools.cached_property
+    def salHistByYear(self):
+        """Статистика для распределения зарплат по годам (вычисляется при первом обращении)"""
+        self._require('salHistByYear')
+        return {'name': 'Распределение зарплат по годам', 
+                'val': {y: list(self.aggregate.year_histograms[y]) for y in self.vacByYear['val']}}
+
+    @staticmethod
+    def rollup(by_month, to_period):
+        """Суммирует помесячные значения по более крупным периодам
+
+        Args:
+            by_month (dict): Значения по номерам месяцев
+            to_period (function): Функция номер месяца -> номер периода
+
+        Returns:
+            dict: Суммы по номерам периодов
+        """
+        result = {}
+        for month, value in by_month.items():
+            period = to_period(month)
+            result[period] = result.get(period, 0) + value
+        return result
+
+    def by_period(self, period):
+        """Вычисляет динамику уровня зарплат и количества вакансий (всех и выбранной профессии) по периодам.
+           Считается по уже накопленным помесячным суммам - повторного прохода по данным нет
+
+        Args:
+            period (str): Период - 'year', 'quarter' или 'month'
+
+        Returns:
+            tuple: Четыре статистики (dict) в формате свойств класса - salByPeriod, vacByPeriod, salByPeriodProf, 
+                vacByPeriodProf. Ключи 'val' - подписи периодов ('2003', '2003-Q4', '2003-10'), 
+                все периоды от первого до последнего, без пропусков
+        """
+        self._require('salByYearProf')
+        to_period, title, label = DynamicObjects.periods[period]
+        sums = [DynamicObjects.rollup(by_month, to_period) for by_month in 
+                (self.aggregate.sal_by_month, self.aggregate.vac_by_month,
+                 self.aggregate.sal_by_month_prof, self.aggregate.vac_by_month_prof)]
+        keys = range(min(sums[1]), max(sums[1]) + 1) if sums[1] else range(0)
+        sal, vac, sal_prof, vac_prof = [
+            {'name': f'Динамика {name} по {title}{prof}', 'val': {}} for prof in ('', ' для выбранной профессии') 
+            for name in ('уровня зарплат', 'количества вакансий')]
+        for key in keys:
+            for (sal_stat, vac_stat), (sal_sums, vac_sums) in (((sal, vac), sums[0:2]), ((sal_prof, vac_prof), sums[2:4])):
+                count = vac_sums.get(key, 0)
+                sal_stat['val'][label(key)] = int(sal_sums[key] / (count * 2)) if count else 0
+                vac_stat['val'][label(key)] = count
+        return sal, vac, sal_prof, vac_prof
+
+    def by_region(self, regions, level='region'):
+        """Вычисляет уровень зарплат и долю вакансий по регионам или странам.
+           Считается по уже накопленным суммам по номерам городов - повторного прохода по данным нет
+
+        Args:
+            regions (cities.RegionTable): Таблица укрупнения город -> регион -> страна
+            level (str): 'region' или 'country'
+
+        Returns:
+            tuple: Две статистики (dict) в формате свойств класса - salByRegion, vacByRegion (в порядке убывания)
+        """
+        self._require('salByCity')
+        title = {'region': 'регионам', 'country': 'странам'}[level]
+        sums = regions.roll_up(self.aggregate.cities, self.aggregate.sal_by_city, level)
+        counts = regions.roll_up(self.aggregate.cities, self.aggregate.vac_by_city, level)
+        sal = {'name': f'Уровень зарплат по {title} (в порядке убывания)', 
+               'val': dict(sorted(((k, int(sums[k] / (n * 2))) for k, n in counts.items()), key=lambda x: x[1], reverse=True))}
+        vac = {'name': f'Доля вакансий по {title} (в порядке убывания)', 
+               'val': {k: round(n / self.aggregate.count, 4) for k, n in sorted(counts.items(), key=lambda x: -x[1])}}
+        return sal, vac
+
+    @staticmethod
+    def sketch_quantiles(sketch):
+        """Вычисляет по квантильному скетчу значения p10, медианы и p90 (в рублях, целые)
+
+        Args:
+            sketch (quantiles.KLLSketch): Скетч зарплат группы вакансий (года или города)
+
+        Returns:
+            tuple: (p10, медиана, p90)
+        """
+        return tuple(int(v) for v in sketch.quantiles(DynamicObjects.quantiles))
        
 class InputConnect:
     """Класс, хранящий требования к обработке данных. 
@@ -251,23 +1154,79 @@ class Report:
         selected_vacancy_year_count (dict): то же что и dataset.dynamics_objects.vacByYearProf['val']
         salaries_city_level (dict):         то же что и dataset.dynamics_objects.salByCity['val']
         vacancies_city_count (dict):        то же что и dataset.dynamics_objects.vacByCity['val']
+        salaries_year_quantiles (dict):     то же что и dataset.dynamics_objects.salQuantByYear['val']
+        salaries_city_quantiles (dict):     то же что и dataset.dynamics_objects.salQuantByCity['val']
+        top_professions (dict):             то же что и dataset.dynamics_objects.topProf['val']
+        top_cities (dict):                  то же что и dataset.dynamics_objects.topCity['val']
+        salary_histograms (dict):           то же что и dataset.dynamics_objects.salHistByYear['val']
+        histogram_bins (histogram.HistogramBins): интервалы гистограмм (dataset.dynamics_objects.aggregate.bins)
+        period (str):                       Период динамики - 'year', 'quarter' или 'month'
+        period_dynamics (tuple or None):    для period, отличного от 'year' - dataset.dynamics_objects.by_period(period), 
+                                            значения 'val' (уровень зарплат, количество вакансий, то же для профессии)
+        dynamics_objects (__main__.DynamicObjects): Статистика dataset - показатели читаются из нее при первом обращении 
+                                            к ним, поэтому вычисляются только показатели, нужные строящимся отчетам
+        cache (report_cache.ReportCache or None): Манифест и кеш отчетов - отчеты, для которых не изменились 
+                                            статистика и настройки, не перестраиваются (None - строятся всегда)
     """
+    # quantile_heads (list): Заголовки столбцов для p10, медианы и p90 зарплат (порядок DynamicObjects.quantiles)
+    quantile_heads = ["Зарплата p10", "Медианная зарплата", "Зарплата p90"]
+    # statistics (dict): Показатели отчета {свойство Report: свойство DynamicObjects}
+    statistics = {'salaries_year_level': 'salByYear', 'vacancies_year_count': 'vacByYear',
+                  'selected_salary_year_level': 'salByYearProf', 'selected_vacancy_year_count': 'vacByYearProf',
+                  'salaries_city_level': 'salByCity', 'vacancies_city_count': 'vacByCity',
+                  'salaries_year_quantiles': 'salQuantByYear', 'salaries_city_quantiles': 'salQuantByCity',
+                  'top_professions': 'topProf', 'top_cities': 'topCity', 'salary_histograms': 'salHistByYear'}
+    # table_statistics (tuple): Показатели таблиц pdf- и html-отчетов (см. table_rows)
+    table_statistics = ('salaries_year_level', 'vacancies_year_count', 'selected_salary_year_level',
+                        'selected_vacancy_year_count', 'salaries_year_quantiles', 'salaries_city_level',
+                        'salaries_city_quantiles', 'vacancies_city_count')
 
-    def __init__(self, dataset):
-        """Инициализатор класса Report - просто копирует данные статистики в новую структуру
+    def __init__(self, dataset, period='year', cache=None):
+        """Инициализатор класса Report - запоминает статистику dataset (показатели читаются из нее при обращении к ним)
 
     Args:
         dataset (__main__.DataSet): экземпляр DataSet, содержащий в свойстве dynamics_objects всю необходимую статистику
+        period (str): Период динамики для таблиц и графиков - 'year' (по умолчанию), 'quarter' или 'month'
+        cache (report_cache.ReportCache or None): Манифест и кеш отчетов
 
     Returns:
         Заполненный экземпляр класса
         """
-        self.salaries_year_level = dataset.dynamics_objects.salByYear['val']
-        self.vacancies_year_count = dataset.dynamics_objects.vacByYear['val']
-        self.selected_salary_year_level = dataset.dynamics_objects.salByYearProf['val']
-        self.selected_vacancy_year_count = dataset.dynamics_objects.vacByYearProf['val']
-        self.salaries_city_level = dataset.dynamics_objects.salByCity['val']
-        self.vacancies_city_count = dataset.dynamics_objects.vacByCity['val']
+        self.dynamics_objects = dataset.dynamics_objects
+        self.period = period
+        self.cache = cache
+
+    def __getattr__(self, name):
+        """Показатель отчета (см. statistics) - значение 'val' свойства dynamics_objects, вычисляется при первом обращении"""
+        if name in Report.statistics:
+            return getattr(self.dynamics_objects, Report.statistics[name])['val']
+        raise AttributeError(f"'Report' object has no attribute '{name}'")
+
+    @property
+    def histogram_bins(self):
+        """Интервалы гистограмм зарплат (dataset.dynamics_objects.aggregate.bins)"""
+        return self.dynamics_objects.aggregate.bins
+
+    @functools.cached_property
+    def period_dynamics(self):
+        """Динамика по периоду period (None - для 'year'), вычисляется при первом обращении"""
+        return None if self.period == 'year' else \
+            tuple(stat['val'] for stat in self.dynamics_objects.by_period(self.period))
+
+    def _cache_key(self, artifact, statistics, *settings):
+        """Внутренний метод класса. Вычисляет ключ отчета по используемым им показателям и настройкам вывода
+
+        Args:
+            artifact (str): Имя файла отчета
+            statistics (iterable): Имена свойств Report, по которым строится отчет
+            settings: Настройки вывода (профессия, хеши шаблонов и т.п.)
+
+        Returns:
+            str or None: Ключ отчета, None - если кеш не используется
+        """
+        if self.cache is None:
+            return None
+        return ReportCache.key(artifact, {name: getattr(self, name) for name in statistics}, *settings)
 
     def generate_excel(self, req_prof):
         """Требуемый заказчиком метод генерации excel-файла. 
@@ -278,28 +1237,53 @@ class Report:
             req_prof (str): Наименование запрашиваемой профессии (используется для формирования имен столбцов в report.xlsx)
         
         Returns:
-            Нет. Метод просто создает(перезаписывает) файл 'report.xlsx'
+            Нет. Метод просто создает(перезаписывает) файл 'report.xlsx' (если он не актуален)
         """
+        key = self._cache_key('report.xlsx', Report.table_statistics + ('period_dynamics', 'top_professions', 'top_cities'),
+                              req_prof)
+        if key is not None and self.cache.fetch('report.xlsx', key):
+            return
         workbook = Workbook()
         stats_by_year = workbook.worksheets[0]
         stats_by_year.title = "Cтатистика по годам"
         stats_by_city = workbook.create_sheet("Cтатистика по городам")
         stats_by_year.append(["Год", "Средняя зарплата", f"Средняя зарплата - {req_prof}",
-                              "Количество вакансий", f"Количество вакансий - {req_prof}"])
+                              "Количество вакансий", f"Количество вакансий - {req_prof}"] + Report.quantile_heads)
         for i, year in enumerate(self.salaries_year_level.keys(), 2):
             stats_by_year.cell(row=i, column=1, value=year)
             for j, dictionary in enumerate((self.salaries_year_level, self.vacancies_year_count,
                         self.selected_salary_year_level, self.selected_vacancy_year_count), 2):
                 stats_by_year.cell(row=i, column=j, value=dictionary[year])
-        stats_by_city.append(["Город", "Уровень зарплат", "", "Город", "Доля вакансий"])
+            for j, value in enumerate(self.salaries_year_quantiles[year], 6):
+                stats_by_year.cell(row=i, column=j, value=value)
+        stats_by_city.append(["Город", "Уровень зарплат"] + Report.quantile_heads + ["", "Город", "Доля вакансий"])
         for i, city in enumerate(self.salaries_city_level.keys(), 2):
             stats_by_city.cell(row=i, column=1, value=city)
             stats_by_city.cell(row=i, column=2, value=self.salaries_city_level[city])
+            for j, value in enumerate(self.salaries_city_quantiles[city], 3):
+                stats_by_city.cell(row=i, column=j, value=value)
         for i, city in enumerate(self.vacancies_city_count.keys(), 2):
-            stats_by_city.cell(row=i, column=4, value=city)
-            stats_by_city.cell(row=i, column=5, value=self.vacancies_city_count[city]).number_format = '0.00%'
+            stats_by_city.cell(row=i, column=7, value=city)
+            stats_by_city.cell(row=i, column=8, value=self.vacancies_city_count[city]).number_format = '0.00%'
+        if self.period_dynamics is not None:
+            period_name = {'quarter': 'Квартал', 'month': 'Месяц'}[self.period]
+            stats_by_period = workbook.create_sheet(f"Cтатистика по {DynamicObjects.periods[self.period][1]}")
+            stats_by_period.append([period_name, "Средняя зарплата", "Количество вакансий", 
+                                    f"Средняя зарплата - {req_prof}", f"Количество вакансий - {req_prof}"])
+            for label in self.period_dynamics[0]:
+                stats_by_period.append([label] + [dictionary[label] for dictionary in self.period_dynamics])
+        top_professions = workbook.create_sheet("Топ профессий")
+        top_professions.append(["Название вакансии", "Количество вакансий", "", "Город", "Количество вакансий"])
+        for i, name in enumerate(self.top_professions.keys(), 2):
+            top_professions.cell(row=i, column=1, value=name)
+            top_professions.cell(row=i, column=2, value=self.top_professions[name])
+        for i, city in enumerate(self.top_cities.keys(), 2):
+            top_professions.cell(row=i, column=4, value=city)
+            top_professions.cell(row=i, column=5, value=self.top_cities[city])
         self.wb_style(workbook)
         workbook.save('report.xlsx')
+        if key is not None:
+            self.cache.store('report.xlsx', key)
 
     @staticmethod
     def wb_style(wb):
@@ -333,14 +1317,30 @@ class Report:
             req_prof (str): Наименование запрашиваемой профессии (используется для формирования подписей в graph.png)
         
         Returns:
-            Нет. Метод просто создает(перезаписывает) файл 'graph.png'
+            Нет. Метод просто создает(перезаписывает) файл 'graph.png' (если он не актуален)
         """
-        fig1, ((f11, f12), (f21, f22)) = plt.subplots(2, 2, figsize=(12, 7.5), layout='constrained')
-        self.generate_salByYear_graph(f11, req_prof)
-        self.generate_vacByYear_graph(f12, req_prof)
+        key = self._cache_key('graph.png', ('salaries_year_level', 'vacancies_year_count', 'selected_salary_year_level',
+                              'selected_vacancy_year_count', 'period_dynamics', 'salaries_city_level', 'vacancies_city_count',
+                              'salary_histograms', 'histogram_bins'), req_prof)
+        if key is not None and self.cache.fetch('graph.png', key):
+            return
+        fig1, axes = plt.subplot_mosaic([['f11', 'f12', 'hist'], ['f21', 'f22', 'hist']], figsize=(17, 7.5),
+                                        layout='constrained')
+        f11, f12, f21, f22 = axes['f11'], axes['f12'], axes['f21'], axes['f22']
+        if self.period_dynamics is None:
+            self.generate_salByYear_graph(f11, req_prof)
+            self.generate_vacByYear_graph(f12, req_prof)
+        else:
+            self.generate_period_graph(f11, self.period_dynamics[0], self.period_dynamics[2], 
+                'Средняя з/п', f'З/п {req_prof}', "Уровень зарплат")
+            self.generate_period_graph(f12, self.period_dynamics[1], self.period_dynamics[3], 
+                'Количество вакансий', f'Количество вакансий {req_prof}', "Количество вакансий")
         self.generate_salByCity_graph(f21)
         self.generate_vacByCity_graph(f22)
+        self.generate_salHist_graph(axes['hist'])
         plt.savefig('graph.png')
+        if key is not None:
+            self.cache.store('graph.png', key)
 
     def generate_salByYear_graph(self, f, req_prof):
         """Метод генерации части graph.png - рисунка(диаграммы) для "Уровеня зарплат по годам". 
@@ -384,6 +1384,31 @@ class Report:
         f.yaxis.grid(True)
         f.legend(fontsize=8, loc='upper left')
 
+    def generate_period_graph(self, f, values, selected_values, label, selected_label, title):
+        """Метод генерации части graph.png для динамики по кварталам или месяцам. 
+           Длинные ряды рисуются линиями, подписи оси x прореживаются (не более 24)
+           
+        Args:
+            f (matplotlib.axes._subplots.AxesSubplot): Подрисунок для graph.png
+            values (dict): Значения по периодам для всех вакансий
+            selected_values (dict): Значения по периодам для выбранной профессии
+            label (str): Подпись ряда values
+            selected_label (str): Подпись ряда selected_values
+            title (str): Заголовок подрисунка (дополняется названием периода)
+        
+        Returns:
+            Нет. Метод просто заполняет свойства переданной структуры подрисунка
+        """
+        f_labels = list(values.keys())
+        x = np.arange(len(f_labels))
+        f.plot(x, list(values.values()), label=label)
+        f.plot(x, list(selected_values.values()), label=selected_label)
+        step = max(1, len(f_labels) // 24)
+        f.set_xticks(x[::step], f_labels[::step], fontsize=8, rotation=90, ha='right')
+        f.set_title(f"{title} по {DynamicObjects.periods[self.period][1]}")
+        f.yaxis.grid(True)
+        f.legend(fontsize=8, loc='upper left')
+
     def generate_salByCity_graph(self, f):
         """Метод генерации части graph.png - рисунка(диаграммы) для "Уровеня зарплат по городам". 
            Для генерации используются экземпляр класса Report и внешние библиотеки matplotlib и numpy
@@ -421,6 +1446,48 @@ class Report:
                     'tab:gray','tab:olive','tab:cyan','tab:blue','tab:blue'])
         f.set_title("Доля вакансий по городам")
 
+    def table_rows(self, req_prof):
+        """Метод формирования заголовков и строк таблиц отчета (общий для pdf- и html-отчетов)
+
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии (используется для формирования подписей)
+
+        Returns:
+            tuple: h1, h2, h3 (list[str]) - заголовки таблиц по годам, уровня зарплат и доли вакансий по городам;
+                   r1, r2, r3 (list[list]) - строки этих таблиц
+        """
+        h1, h2, h3 = (["Год", "Средняя зарплата", f"Средняя зарплата - {req_prof}", "Количество вакансий",
+            f"Количество вакансий - {req_prof}"] + Report.quantile_heads, ["Город", "Уровень зарплат"] + Report.quantile_heads,
+            ["Город", "Доля вакансий"])
+        r1 = list(map(lambda year: [year] + [dict[year] for dict in (self.salaries_year_level, self.vacancies_year_count,
+            self.selected_salary_year_level, self.selected_vacancy_year_count)] + list(self.salaries_year_quantiles[year]),
+            self.salaries_year_level.keys()))
+        r2 = list(map(lambda city: [city, self.salaries_city_level[city]] + list(self.salaries_city_quantiles[city]),
+            self.salaries_city_level.keys()))
+        r3 = list(map(lambda city: [city, f'{round(self.vacancies_city_count[city]*100,2)}%'], self.vacancies_city_count.keys()))
+        return h1, h2, h3, r1, r2, r3
+
+    def generate_salHist_graph(self, f):
+        """Метод генерации части graph.png - рисунка(тепловой карты) для "Распределения зарплат по годам". 
+           Строка карты - гистограмма года, цвет - доля вакансий года в интервале зарплат
+           
+        Args:
+            f (matplotlib.axes._subplots.AxesSubplot): Подрисунок для graph.png
+                
+        Returns:
+            Нет. Метод просто заполняет свойства переданной структуры подрисунка
+        """
+        years = list(self.salary_histograms.keys())
+        shares = np.array([np.array(counts) / max(sum(counts), 1) for counts in self.salary_histograms.values()])
+        mesh = f.pcolormesh(self.histogram_bins.edges, np.arange(len(years) + 1), shares.reshape(len(years), -1), 
+                            cmap='viridis')
+        if self.histogram_bins.log:
+            f.set_xscale('log')
+        f.set_yticks(np.arange(len(years)) + 0.5, labels=years, fontsize=8)
+        f.tick_params(axis='x', labelsize=8)
+        f.set_title("Распределение зарплат по годам")
+        plt.colorbar(mesh, ax=f, label='Доля вакансий года')
+
     def generate_pdf(self, req_prof):
         """Требуемый заказчиком метод генерации pdf-файла. 
            Для генерации используются экземпляр класса Report, внешние библиотеки jinja2 и pdfkit, 
@@ -430,15 +1497,13 @@ class Report:
             req_prof (str): Наименование запрашиваемой профессии (используется для формирования подписей)
         
         Returns:
-            Нет. Метод просто создает(перезаписывает) файл 'report.pdf'
+            Нет. Метод просто создает(перезаписывает) файл 'report.pdf' (если он не актуален)
         """
+        key = self._cache_key('report.pdf', Report.table_statistics, req_prof, file_digest('pdf_template.html'), file_digest('graph.png'))
+        if key is not None and self.cache.fetch('report.pdf', key):
+            return
      
-        h1, h2, h3 = (["Год", "Средняя зарплата", f"Средняя зарплата - {req_prof}", "Количество вакансий",
-            f"Количество вакансий - {req_prof}"], ["Город", "Уровень зарплат"], ["Город", "Доля вакансий"])
-        r1 = list(map(lambda year: [year] + [dict[year] for dict in (self.salaries_year_level, self.vacancies_year_count,
-            self.selected_salary_year_level, self.selected_vacancy_year_count)], self.salaries_year_level.keys()))
-        r2 = list(map(lambda city: [city, self.salaries_city_level[city]], self.salaries_city_level.keys()))
-        r3 = list(map(lambda city: [city, f'{round(self.vacancies_city_count[city]*100,2)}%'], self.vacancies_city_count.keys()))
+        h1, h2, h3, r1, r2, r3 = self.table_rows(req_prof)
         env = Environment(loader=FileSystemLoader('.'))
         template = env.get_template("pdf_template.html")
         pdf_template = template.render(graph_name='graph.png',req_prof=req_prof,h1=h1,h2=h2,h3=h3,r1=r1,r2=r2,r3=r3)
@@ -446,27 +1511,198 @@ class Report:
             r'D:/LIZOK/_Практика PY/Pyton 2 курс/Тема2_1 Библиотеки/02_01_03 PDF/wkhtmltopdf/wkhtmltopdf.exe')
         options = {'enable-local-file-access': None}
         pdfkit.from_string(pdf_template, 'report.pdf', options=options, configuration=config)
+        if key is not None:
+            self.cache.store('report.pdf', key)
+
+    def generate_html(self, req_prof, filename='report.html'):
+        """Метод генерации html-отчета: те же диаграммы, что в graph.png (встроенный SVG, модуль svg_charts), 
+           и те же таблицы, что в report.pdf. Файл пишется за один проход, без matplotlib, шаблонов 
+           и внешних программ - быстрый формат для выдачи большого количества отчетов
+           
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии (используется для формирования подписей)
+            filename (str): Имя html-файла
+        
+        Returns:
+            Нет. Метод просто создает(перезаписывает) файл filename (если он не актуален)
+        """
+        key = self._cache_key(filename, Report.table_statistics + ('period_dynamics',), req_prof)
+        if key is not None and self.cache.fetch(filename, key):
+            return
+        if self.period_dynamics is None:
+            years = list(self.salaries_year_level.keys())
+            charts = [svg_charts.bar_chart("Уровень зарплат по годам", years,
+                          [('Средняя з/п', list(self.salaries_year_level.values())),
+                           (f'З/п {req_prof}', list(self.selected_salary_year_level.values()))]),
+                      svg_charts.bar_chart("Количество вакансий по годам", years,
+                          [('Количество вакансий', list(self.vacancies_year_count.values())),
+                           (f'Количество вакансий {req_prof}', list(self.selected_vacancy_year_count.values()))])]
+        else:
+            sal, vac, sal_prof, vac_prof = self.period_dynamics
+            period_name = DynamicObjects.periods[self.period][1]
+            charts = [svg_charts.line_chart(f"Уровень зарплат по {period_name}", list(sal.keys()),
+                          [('Средняя з/п', list(sal.values())), (f'З/п {req_prof}', list(sal_prof.values()))]),
+                      svg_charts.line_chart(f"Количество вакансий по {period_name}", list(vac.keys()),
+                          [('Количество вакансий', list(vac.values())),
+                           (f'Количество вакансий {req_prof}', list(vac_prof.values()))])]
+        shares = list(self.vacancies_city_count.values())
+        charts.append(svg_charts.hbar_chart("Уровень зарплат по городам", list(self.salaries_city_level.keys()),
+                                            list(self.salaries_city_level.values())))
+        charts.append(svg_charts.pie_chart("Доля вакансий по городам", list(self.vacancies_city_count.keys()) + ['Другие'],
+                                           shares + [max(0, 1 - sum(shares))]))
+        h1, h2, h3, r1, r2, r3 = self.table_rows(req_prof)
+        parts = ['<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">',
+                 f'<title>Аналитика по зарплатам и городам для профессии {escape(req_prof)}</title>',
+                 '<style>body{font-family:sans-serif}table{border-collapse:collapse;margin:12px 0}'
+                 'th,td{border:1px solid #000;padding:2px 6px;text-align:center}</style></head><body>',
+                 f'<h1>Аналитика по зарплатам и городам для профессии {escape(req_prof)}</h1><div>']
+        parts.extend(charts)
+        parts.append('</div>')
+        for title, head, rows in (("Статистика по годам", h1, r1), ("Статистика по городам", h2, r2),
+                                  ("", h3, r3)):
+            if title:
+                parts.append(f'<h2>{title}</h2>')
+            parts.append('<table><tr>' + ''.join(f'<th>{escape(str(h))}</th>' for h in head) + '</tr>')
+            parts.extend('<tr>' + ''.join(f'<td>{escape(str(v))}</td>' for v in row) + '</tr>' for row in rows)
+            parts.append('</table>')
+        parts.append('</body></html>')
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+        if key is not None:
+            self.cache.store(filename, key)
+
+    def generate_matrix_excel(self, matrix, filename='report_matrix.xlsx', max_cities=100):
+        """Метод генерации excel-файла с матрицей профессия x город: лист средних зарплат и лист количеств 
+           вакансий (строки - профессии, столбцы - города с наибольшим количеством вакансий, пустые ячейки не заполняются)
+
+        Args:
+            matrix (prof_matrix.ProfCityMatrix): Матрица (см. DataSet.prof_city_matrix)
+            filename (str): Имя excel-файла
+            max_cities (int): Количество городов (столбцов)
+
+        Returns:
+            Нет. Метод просто создает(перезаписывает) файл filename (если он не актуален)
+        """
+        key = self._cache_key(filename, (), matrix.professions, matrix.cities.names, matrix.to_csr(), max_cities)
+        if key is not None and self.cache.fetch(filename, key):
+            return
+        cities = matrix.top_cities(max_cities)
+        workbook = Workbook()
+        salaries_sheet = workbook.worksheets[0]
+        salaries_sheet.title = "Зарплаты по профессиям"
+        counts_sheet = workbook.create_sheet("Вакансии по профессиям")
+        for sheet, values in zip((salaries_sheet, counts_sheet), matrix.table(cities)):
+            sheet.append(["Профессия"] + [matrix.cities.names[col] for col in cities])
+            for profession, row in zip(matrix.professions, values):
+                sheet.append([profession] + row)
+        self.wb_style(workbook)
+        workbook.save(filename)
+        if key is not None:
+            self.cache.store(filename, key)
+
+    def generate_matrix_image(self, matrix, filename='matrix.png', max_cities=30):
+        """Метод генерации png-рисунка - тепловой карты средних зарплат профессия x город 
+           (пустые ячейки не закрашиваются). Для генерации используются внешние библиотеки matplotlib и numpy
+
+        Args:
+            matrix (prof_matrix.ProfCityMatrix): Матрица (см. DataSet.prof_city_matrix)
+            filename (str): Имя png-файла
+            max_cities (int): Количество городов (с наибольшим количеством вакансий)
+
+        Returns:
+            Нет. Метод просто создает(перезаписывает) файл filename (если он не актуален)
+        """
+        key = self._cache_key(filename, (), matrix.professions, matrix.cities.names, matrix.to_csr(), max_cities)
+        if key is not None and self.cache.fetch(filename, key):
+            return
+        cities = matrix.top_cities(max_cities)
+        salaries, _ = matrix.table(cities)
+        values = np.ma.masked_invalid(np.array([[np.nan if v is None else v for v in row] for row in salaries], 
+                                               dtype=float).reshape(len(matrix.professions), len(cities)))
+        fig, f = plt.subplots(figsize=(max(6, 0.4 * len(cities) + 3), max(3, 0.35 * len(matrix.professions) + 2)),
+                              layout='constrained')
+        image = f.imshow(values, aspect='auto', cmap='viridis')
+        f.set_xticks(np.arange(len(cities)), labels=[matrix.cities.names[col] for col in cities], rotation=90, fontsize=8)
+        f.set_yticks(np.arange(len(matrix.professions)), labels=matrix.professions, fontsize=8)
+        f.set_title("Средняя зарплата по профессиям и городам")
+        fig.colorbar(image, ax=f)
+        fig.savefig(filename)
+        plt.close(fig)
+        if key is not None:
+            self.cache.store(filename, key)
+
+    def generate_all(self, req_prof, progress=None):
+        """Метод генерации всех отчетов (report.xlsx, graph.png, report.pdf, report.html) по очереди
+           
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии
+            progress (progress.Progress or None): Ход генерации (по отчетам). Отмена (Ctrl+C) проверяется 
+                между отчетами - каждый файл отчета создан полностью или не начат (Cancelled)
+        """
+        generators = (self.generate_excel, self.generate_image, self.generate_pdf, self.generate_html)
+        if progress is not None: progress.start('Отчеты', len(generators), 'отчетов')
+        for i, generate in enumerate(generators, 1):
+            generate(req_prof)
+            if progress is not None: progress.update(i)
+        if progress is not None: progress.finish()
 
 #####  Исполняемая часть кода  ######################################################################################
+if __name__ == '__main__':
+    # Ввод данных пользователя:  
+    my_task = InputConnect()                        # Создаем пустой экземпляр InputConnect - my_task
+    my_task.get_task()                              # Заполняем поля этого экземпляра в диалоге с пользователем 
+    my_rates = RateTable('data_currencies.csv', {c: dic_money[c]['cost'] for c in dic_money})  # Помесячные курсы валют
+    my_progress = Progress()                        # Ход обработки (в stderr); Ctrl+C - прервать с частичной статистикой
+    my_progress.catch_sigint()
+    try:
+        my_data = DataSet(my_task, dedup='auto', rates=my_rates, progress=my_progress)  # Создаем заполненный экземпляр 
+                                                    # DataSet - данные о вакансиях и статистика в соответствии с запросами 
+                                                    # пользователя из my_task (без дубликатов, зарплаты по курсу на месяц публикации)
+    except Cancelled as e:                          # Прервано - печатаем статистику по уже учтенным вакансиям (если есть)
+        print('Обработка прервана')
+        if e.partial is not None:
+            my_partial = DynamicObjects(None, None, e.partial)
+            print(f'Учтено вакансий: {e.partial.count}')
+            print(f'{my_partial.salByYear["name"]}: {my_partial.salByYear["val"]}')
+            print(f'{my_partial.vacByYear["name"]}: {my_partial.vacByYear["val"]}')
+        exit()
+    if (sum(fs['rows'] for fs in my_data.file_stats) == 0): exit()  # Если результатов нет - выходим
+
+    # Результаты есть - печатаем в требуемом виде
+    for fs in my_data.file_stats:
+        print(f'Файл {fs["file"]}: вакансий - {fs["rows"]}, дубликатов - {fs["duplicates"]}, время обработки - {fs["seconds"]} с')
+    print(f'Удалено дубликатов вакансий: {my_data.duplicates_count}')
+    print(f'Доля названий вакансий, нормализованных из кеша: {my_data.dynamics_objects.aggregate.titles.hit_rate:.2%}')
+    print(f'{my_data.dynamics_objects.salByYear["name"]}: {my_data.dynamics_objects.salByYear["val"]}')
+    print(f'{my_data.dynamics_objects.vacByYear["name"]}: {my_data.dynamics_objects.vacByYear["val"]}')
+    print(f'{my_data.dynamics_objects.salByYearProf["name"]}: {my_data.dynamics_objects.salByYearProf["val"]}')
+    print(f'{my_data.dynamics_objects.vacByYearProf["name"]}: {my_data.dynamics_objects.vacByYearProf["val"]}')
+    print(f'{my_data.dynamics_objects.salByCity["name"]}: {my_data.dynamics_objects.salByCity["val"]}')
+    print(f'{my_data.dynamics_objects.vacByCity["name"]}: {my_data.dynamics_objects.vacByCity["val"]}')
+    print(f'{my_data.dynamics_objects.salQuantByYear["name"]}: {my_data.dynamics_objects.salQuantByYear["val"]}')
+    print(f'{my_data.dynamics_objects.salQuantByCity["name"]}: {my_data.dynamics_objects.salQuantByCity["val"]}')
+    print(f'{my_data.dynamics_objects.topProf["name"]}: {my_data.dynamics_objects.topProf["val"]}')
+    print(f'{my_data.dynamics_objects.topCity["name"]}: {my_data.dynamics_objects.topCity["val"]}')
+    if os.path.isfile('cities_regions.csv'):            # Есть таблица укрупнения городов - печатаем и по регионам
+        for stat in my_data.dynamics_objects.by_region(RegionTable.from_csv('cities_regions.csv')):
+            print(f'{stat["name"]}: {stat["val"]}')
+    my_matrix = None
+    if os.path.isfile('professions.txt'):               # Есть список профессий (по одной в строке) - матрица профессия x город
+        with open('professions.txt', encoding='utf-8') as f:
+            my_matrix = my_data.prof_city_matrix([line.strip() for line in f if line.strip()])
+        print(f'Матрица профессия x город: профессий - {len(my_matrix.professions)}, городов - {len(my_matrix.cities)}, '
+              f'непустых ячеек - {len(my_matrix)}')
 
-# Ввод данных пользователя:  
-my_task = InputConnect()                        # Создаем пустой экземпляр InputConnect - my_task
-my_task.get_task()                              # Заполняем поля этого экземпляра в диалоге с пользователем 
-my_data = DataSet(my_task)                      # Создаем заполненный экземпляр DataSet - данные о вакансиях и статистика
-                                                # в соответствии с запросами пользователя из my_task
-if (my_data.vacancies_objects == None): exit()  # Если результатов нет - выходим
-
-# Результаты есть - печатаем в требуемом виде
-print(f'{my_data.dynamics_objects.salByYear["name"]}: {my_data.dynamics_objects.salByYear["val"]}')
-print(f'{my_data.dynamics_objects.vacByYear["name"]}: {my_data.dynamics_objects.vacByYear["val"]}')
-print(f'{my_data.dynamics_objects.salByYearProf["name"]}: {my_data.dynamics_objects.salByYearProf["val"]}')
-print(f'{my_data.dynamics_objects.vacByYearProf["name"]}: {my_data.dynamics_objects.vacByYearProf["val"]}')
-print(f'{my_data.dynamics_objects.salByCity["name"]}: {my_data.dynamics_objects.salByCity["val"]}')
-print(f'{my_data.dynamics_objects.vacByCity["name"]}: {my_data.dynamics_objects.vacByCity["val"]}')
-
-# Формируем экземпляр класса Report для имеющегося экземпляра DataSet - my_data
-# Генерируем требуемые отчеты (report.xlsx, graph.png, report.pdf) для требуемой профессии
-my_report = Report(my_data)
-my_report.generate_excel(my_task.task_params['req_prof']['val'])
-my_report.generate_image(my_task.task_params['req_prof']['val'])
-my_report.generate_pdf(my_task.task_params['req_prof']['val'])
\ No newline at end of file
+    # Формируем экземпляр класса Report для имеющегося экземпляра DataSet - my_data
+    # Генерируем требуемые отчеты (report.xlsx, graph.png, report.pdf, report.html) для требуемой профессии
+    my_report = Report(my_data, cache=ReportCache())
+    try:
+        my_report.generate_all(my_task.task_params['req_prof']['val'], my_progress)
+    except Cancelled:
+        print('Генерация отчетов прервана')
+    else:
+        if my_matrix is not None:                   # Матрица профессия x город - report_matrix.xlsx и matrix.png
+            my_report.generate_matrix_excel(my_matrix)
+            my_report.generate_matrix_image(my_matrix)
+    for artifact, status in my_report.cache.log:
+        print(f'{artifact}: {status}')
\ No newline at end of file
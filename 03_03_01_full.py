@@ -1,30 +1,30 @@
-import pandas as pd
+import csv
+import sys
+from profiler import DatasetProfile
+from timecodes import month_id
+from cbr_rates import RateCache, monthly_rates
 
-file_name = 'vacancies_dif_currencies.csv'
-df = pd.read_csv(file_name)
-curr = df['salary_currency'].unique()
-req_curr = []
-for c in curr:
-    if list(df['salary_currency']).count(c) > 5000:
-        req_curr.append(c)
-del req_curr[0]
-df.sort_values(by='published_at', inplace=True)
-first_date = list(df['published_at'])[0]
-second_date = list(df['published_at'])[-1]
+# файл вакансий - аргумент командной строки (его передает pipeline.py)
+file_name = sys.argv[1] if len(sys.argv) > 1 else 'vacancies_dif_currencies.csv'
+profile = DatasetProfile(file_name)
+req_curr = profile.frequent_currencies(5000)
+first_date = profile.first_date
+second_date = profile.last_date
 print(req_curr, first_date, second_date)
-data = pd.DataFrame(columns=['date', 'BYR', 'USD', 'EUR', 'KZT', 'UAH'])
-for year in range(2003, 2023):
-    for month in range(1, 13):
-        date = f'01/0{month}/{year}' if month < 10 else f'01/{month}/{year}'
-        new_row = {'date': date}
-        res = f'http://www.cbr.ru/scripts/XML_daily.asp?date_req={date}'
-        values_cur = pd.read_xml(res, encoding='cp1251')
-        for c in req_curr:
-            if len(values_cur[values_cur['CharCode'] == c]['Value'].values) != 0:
-                value = '.'.join(str(values_cur[values_cur['CharCode'] == c]['Value'].values[0]).split(','))
-                new_row[c] = float(value) / int(values_cur[values_cur['CharCode'] == c]['Nominal'].values[0])
-        data = pd.concat([data, pd.DataFrame.from_records([new_row])], axis=0, ignore_index=True)
-        if date == '01/12/2022':
-            break
-data.to_csv('dataencies.csv', index=False)
-print(data)
\ No newline at end of file
+profile.save('vacancies_profile.json')
+if first_date is None:
+    sys.exit(f'{file_name}: нет вакансий с датой публикации - курсы валют не загружаются')
+try:
+    first_month, last_month = month_id(first_date), month_id(second_date)
+except ValueError:
+    sys.exit(f'{file_name}: даты публикации не в формате ISO ({first_date} - {second_date})')
+# ответы ЦБ берутся из кеша (cbr_cache), недостающие месяцы загружаются; разбор - без DataFrame (см. cbr_rates.py)
+rows = monthly_rates(first_month, last_month, req_curr, RateCache())
+columns = ['BYR', 'USD', 'EUR', 'KZT', 'UAH']
+columns += [c for c in req_curr if c not in columns and any(c in rates for _, rates in rows)]
+with open('data_currencies.csv', 'w', encoding='utf-8', newline='') as f:
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(['date'] + columns)
+    for date, rates in rows:
+        writer.writerow([date] + [rates.get(c, '') for c in columns])
+print(f'data_currencies.csv: месяцев - {len(rows)}, валюты - {columns}')
\ No newline at end of file
@@ -1,10 +1,15 @@
 import pandas as pd
 import math
+import sys
+from compressed import open_text
 
-file_name = 'vacancies_dif_currencies.csv'
-df = pd.read_csv(file_name)
+# файл вакансий - аргумент командной строки (его передает pipeline.py)
+file_name = sys.argv[1] if len(sys.argv) > 1 else 'vacancies_dif_currencies.csv'
+with open_text(file_name) as f:
+    df = pd.read_csv(f)
 df.insert(1, 'salary', None)
 df_currencies = pd.read_csv('data_currencies.csv')
+currencies = list(df_currencies.columns[1:])   # валюты, курсы которых загружены по профилю данных (03_03_01_full.py)
 for row in df.itertuples():
     salary_from = row.salary_from
     salary_to = row.salary_to
@@ -17,7 +22,7 @@ for row in df.itertuples():
             salary = salary_from
         elif not math.isnan(salary_to):
             salary = salary_to
-        if salary_currency != 'RUR' and salary_currency in ['BYR', 'USD', 'EUR', 'KZT', 'UAH']:
+        if salary_currency != 'RUR' and salary_currency in currencies:
             cost = df_currencies[df_currencies['date'] == f'01/{row.published_at[5:7]}/{row.published_at[:4]}'][
                 salary_currency].values[0]
             salary = None if math.isnan(cost) else float(int(salary * cost))
@@ -0,0 +1,140 @@
+"""Курсы валют ЦБ РФ (XML_daily.asp): разбор ответов за один проход и локальный кеш ответов.
+
+Ответ ЦБ - XML в кодировке windows-1251: по элементу Valute на валюту с CharCode, Nominal и Value
+(десятичная запятая). parse_daily разбирает ответ потоково (XMLPullParser, данные можно подавать
+частями по мере загрузки) и за один проход собирает курсы всех нужных валют за единицу валюты,
+без DataFrame и без повторного поиска по таблице для каждой валюты. Ответы сохраняются в каталоге
+кеша (файл на месяц), поэтому повторное построение data_currencies.csv за все месяцы 2003-2022
+читает и разбирает только локальные файлы.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+import requests
+
+# CBR_URL (str): Адрес ежедневных курсов ЦБ РФ (дата в формате ДД/ММ/ГГГГ)
+CBR_URL = 'http://www.cbr.ru/scripts/XML_daily.asp?date_req={date}'
+# CACHE_DIR (str): Каталог кеша ответов ЦБ (файл ГГГГ-ММ.xml на месяц)
+CACHE_DIR = 'cbr_cache'
+
+
+def parse_daily(data, currencies=None):
+    """Разбирает ответ ЦБ за один проход
+
+    Args:
+        data (bytes or iterable): Ответ целиком или части ответа (bytes) в порядке получения
+        currencies (iterable or None): Нужные коды валют (None - все)
+
+    Returns:
+        dict: Курсы {код валюты: курс за единицу валюты} в порядке элементов ответа
+
+    >>> parse_daily('<?xml version="1.0" encoding="windows-1251"?><ValCurs Date="01.01.2003">'
+    ...     '<Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal>'
+    ...     '<Name>Доллар США</Name><Value>31,7844</Value></Valute><Valute ID="R01335"><CharCode>KZT</CharCode>'
+    ...     '<Nominal>100</Nominal><Value>20,3550</Value></Valute></ValCurs>'.encode('cp1251'), ['KZT', 'EUR'])
+    {'KZT': 0.20355}
+    """
+    wanted = None if currencies is None else frozenset(currencies)
+    parser = ElementTree.XMLPullParser(events=('end',))
+    rates = {}
+    code = nominal = value = None
+    for chunk in (data,) if isinstance(data, bytes) else data:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            tag = elem.tag
+            if tag == 'CharCode':
+                code = elem.text
+            elif tag == 'Nominal':
+                nominal = elem.text
+            elif tag == 'Value':
+                value = elem.text
+            elif tag == 'Valute':
+                if (wanted is None or code in wanted) and value and nominal:
+                    rates[code] = float(value.replace(',', '.')) / int(nominal)
+                elem.clear()
+                code = nominal = value = None
+    parser.close()
+    return rates
+
+
+class RateCache:
+    """Класс для представления локального кеша ответов ЦБ.
+
+    Attributes:
+        directory (str): Каталог кеша
+        url (str): Шаблон адреса запроса (с {date})
+    """
+    def __init__(self, directory=CACHE_DIR, url=CBR_URL):
+        """Инициализирует экземпляр RateCache (каталог создается при первой загрузке)
+
+        Args:
+            directory (str): Каталог кеша
+            url (str): Шаблон адреса запроса
+
+        Returns:
+            Экземпляр класса RateCache
+        """
+        self.directory = directory
+        self.url = url
+
+    def path(self, date):
+        """Имя файла кеша для даты
+
+        Args:
+            date (str): Дата в формате ДД/ММ/ГГГГ
+
+        Returns:
+            str: Путь к файлу (ГГГГ-ММ.xml - для первого числа месяца, иначе ГГГГ-ММ-ДД.xml)
+        """
+        day, month, year = date.split('/')
+        name = f'{year}-{month}.xml' if day == '01' else f'{year}-{month}-{day}.xml'
+        return os.path.join(self.directory, name)
+
+    def fetch(self, date):
+        """Ответ ЦБ за дату: из кеша, иначе загружается и сохраняется в кеш (файл появляется только целиком)
+
+        Args:
+            date (str): Дата в формате ДД/ММ/ГГГГ
+
+        Returns:
+            bytes: Ответ
+        """
+        path = self.path(date)
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        response = requests.get(self.url.format(date=date))
+        response.raise_for_status()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(response.content)
+        os.replace(path + '.tmp', path)
+        return response.content
+
+
+def monthly_rates(first_month, last_month, currencies, cache=None, workers=8):
+    """Курсы на первое число каждого месяца. Ответы, которых нет в кеше, загружаются параллельно (workers потоков),
+       разбор - последовательно в текущем потоке
+
+    Args:
+        first_month, last_month (int): Номера первого и последнего месяцев (см. timecodes.month_id)
+        currencies (iterable): Нужные коды валют
+        cache (RateCache or None): Кеш ответов (None - RateCache())
+        workers (int): Количество потоков загрузки
+
+    Returns:
+        list[tuple]: (дата ДД/ММ/ГГГГ, dict - курсы {код валюты: курс за единицу}) по месяцам
+    """
+    cache = cache if cache is not None else RateCache()
+    dates = [f'01/{m % 12 + 1:02d}/{m // 12}' for m in range(first_month, last_month + 1)]
+    missing = [date for date in dates if not os.path.isfile(cache.path(date))]
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(cache.fetch, missing))
+    currencies = frozenset(currencies)
+    return [(date, parse_daily(cache.fetch(date), currencies)) for date in dates]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
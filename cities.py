@@ -0,0 +1,129 @@
+"""Словарь городов (целочисленные номера) и таблица укрупнения город -> регион -> страна.
+
+При чтении вакансий название города один раз переводится в номер (в порядке первого появления),
+суммы и количества по городам хранятся в списках, индексируемых этим номером. Части статистики
+из разных файлов и процессов сливаются через перенумерацию (CityDictionary.remap).
+Статистика по регионам и странам получается из сумм по городам (RegionTable.roll_up) - без
+повторного чтения данных. Таблица укрупнения - csv-файл со столбцами city, region, country.
+"""
+import csv
+
+
+class CityDictionary:
+    """Класс для представления словаря городов.
+
+    Attributes:
+        names (list[str]): Названия городов по номерам
+        ids (dict): Номера городов {название: номер}
+    """
+    def __init__(self):
+        """Инициализирует пустой экземпляр CityDictionary
+
+        Returns:
+            Экземпляр класса CityDictionary
+        """
+        self.names = []
+        self.ids = {}
+
+    def __len__(self):
+        """Количество городов в словаре"""
+        return len(self.names)
+
+    def id(self, name):
+        """Возвращает номер города, добавляя новый город в словарь
+
+        Args:
+            name (str): Название города
+
+        Returns:
+            int: Номер города
+
+        >>> cities = CityDictionary()
+        >>> [cities.id(name) for name in ['Москва', 'Казань', 'Москва']], cities.names
+        ([0, 1, 0], ['Москва', 'Казань'])
+        """
+        city_id = self.ids.get(name)
+        if city_id is None:
+            city_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return city_id
+
+    def remap(self, other):
+        """Перенумеровывает города другого словаря в номера текущего (новые города добавляются)
+
+        Args:
+            other (CityDictionary): Другой словарь
+
+        Returns:
+            list[int]: Номер в текущем словаре для каждого номера other
+        """
+        return [self.id(name) for name in other.names]
+
+
+class RegionTable:
+    """Класс для представления таблицы укрупнения городов.
+
+    Attributes:
+        regions (dict): {город: (регион, страна)}
+        unknown (str): Группа для городов, которых нет в таблице
+    """
+    # levels (dict): Уровни укрупнения {уровень: номер в кортеже (регион, страна)}
+    levels = {'region': 0, 'country': 1}
+
+    def __init__(self, regions, unknown='Другие'):
+        """Инициализирует экземпляр RegionTable
+
+        Args:
+            regions (dict): {город: (регион, страна)}
+            unknown (str): Группа для городов, которых нет в таблице
+
+        Returns:
+            Экземпляр класса RegionTable
+        """
+        self.regions = dict(regions)
+        self.unknown = unknown
+
+    @classmethod
+    def from_csv(cls, filename, unknown='Другие'):
+        """Читает таблицу укрупнения из csv-файла (столбцы city, region, country)
+
+        Args:
+            filename (str): Имя файла
+            unknown (str): Группа для городов, которых нет в таблице
+
+        Returns:
+            RegionTable: Таблица
+        """
+        with open(filename, encoding='utf-8-sig', newline='') as f:
+            return cls({row['city']: (row['region'], row['country']) for row in csv.DictReader(f)}, unknown)
+
+    def roll_up(self, cities, values, level='region'):
+        """Суммирует значения по городам в значения по регионам или странам
+
+        Args:
+            cities (CityDictionary): Словарь городов
+            values (list): Значения по номерам городов
+            level (str): 'region' или 'country'
+
+        Returns:
+            dict: Суммы {регион или страна: сумма} в порядке первого появления
+
+        >>> cities = CityDictionary()
+        >>> ids = [cities.id(name) for name in ['Москва', 'Химки', 'Минск', 'Тверь']]
+        >>> table = RegionTable({'Москва': ('Москва', 'Россия'), 'Химки': ('Московская область', 'Россия'),
+        ...                      'Минск': ('Минск', 'Беларусь')})
+        >>> table.roll_up(cities, [10, 5, 3, 1], 'country')
+        {'Россия': 15, 'Беларусь': 3, 'Другие': 1}
+        """
+        position = RegionTable.levels[level]
+        result = {}
+        for name, value in zip(cities.names, values):
+            place = self.regions.get(name)
+            group = place[position] if place is not None else self.unknown
+            result[group] = result.get(group, 0) + value
+        return result
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,258 @@
+"""Столбцовое представление набора вакансий для общей памяти (multiprocessing.shared_memory или mmap-файл).
+
+Вакансии хранятся не объектами Vacancy, а массивами numpy по столбцам: номер месяца публикации,
+оклад от / до, код валюты, номер города, номер названия, зарплата в рублях (от + до, по курсу месяца).
+Вместе с ними хранится таблица помесячных курсов валют (матрица валюта x месяц).
+Набор один раз публикуется (publish - в общую память, save - в файл), процессы-обработчики
+подключаются к нему (attach) без копирования и без pickle: массивы - представления буфера общей памяти.
+Словари (названия, города, валюты) хранятся в json-заголовке и декодируются при подключении.
+
+Формат буфера: 8 байт длины заголовка (little-endian), json-заголовок, массивы (выравнивание 64 байта).
+"""
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+# COLUMNS (dict): Столбцы набора {имя: тип numpy}
+COLUMNS = {'month': 'int32', 'salary_from': 'float64', 'salary_to': 'float64', 'currency': 'int16',
+           'city': 'int32', 'name': 'int32', 'salary': 'float64'}
+_ALIGN = 64
+
+
+class ColumnarDataset:
+    """Класс для представления столбцового набора вакансий.
+
+    Attributes:
+        names (list[str]): Названия вакансий по номерам (столбец 'name')
+        cities (list[str]): Города по номерам (столбец 'city')
+        currencies (list[str]): Валюты по кодам (столбец 'currency')
+        columns (dict): Столбцы {имя: numpy.ndarray}
+        rate_first_month (int): Номер первого месяца матрицы курсов
+        rate_matrix (numpy.ndarray): Курсы [код валюты, месяц - rate_first_month] (nan - курса нет)
+        fallback (numpy.ndarray): Запасные курсы по кодам валют (nan - курс неизвестен)
+        source (str or None): Имя блока общей памяти или файла, к которому подключен набор (None - обычная память)
+    """
+    def __init__(self, header, arrays, handle=None, source=None):
+        """Инициализирует экземпляр ColumnarDataset (используйте from_vacancies и attach)
+
+        Args:
+            header (dict): Словари и параметры курсов
+            arrays (dict): Столбцы и матрица курсов {имя: numpy.ndarray}
+            handle: Объект общей памяти или mmap, удерживаемый, пока набор используется
+            source (str or None): Имя блока общей памяти или файла
+
+        Returns:
+            Экземпляр класса ColumnarDataset
+        """
+        self.names, self.cities, self.currencies = header['names'], header['cities'], header['currencies']
+        self.rate_first_month = header['rate_first_month']
+        self.columns = {name: arrays[name] for name in COLUMNS}
+        self.rate_matrix = arrays['rate_matrix']
+        self.fallback = arrays['fallback']
+        self.source = source
+        self._handle = handle
+
+    def __len__(self):
+        """Количество вакансий"""
+        return len(self.columns['month'])
+
+    @classmethod
+    def from_vacancies(cls, vacancies, fallback, rates=None):
+        """Строит набор из экземпляров Vacancy (один раз, в основном процессе)
+
+        Args:
+            vacancies (iterable[Vacancy]): Вакансии
+            fallback (dict): Постоянные курсы {код валюты: курс}
+            rates (currency_rates.RateTable or None): Помесячные курсы, None - только постоянные
+
+        Returns:
+            ColumnarDataset: Набор в обычной памяти
+        """
+        dictionaries = {'name': {}, 'city': {}, 'currency': {}}
+        lists = {key: [] for key in COLUMNS if key != 'salary'}
+        for vac in vacancies:
+            date = vac.published_at
+            lists['month'].append(int(date[:4]) * 12 + int(date[5:7]) - 1)
+            lists['salary_from'].append(float(vac.salary.salary_from))
+            lists['salary_to'].append(float(vac.salary.salary_to))
+            for key, value in (('currency', vac.salary.salary_currency), ('city', vac.area_name), ('name', vac.name)):
+                codes = dictionaries[key]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                lists[key].append(code)
+        currencies = list(dictionaries['currency'])
+        if rates is not None and rates.months_count:
+            matrix = np.array([[np.nan if v is None else v for v in rates.by_currency.get(c, [None] * rates.months_count)]
+                               for c in currencies], dtype='float64').reshape(len(currencies), rates.months_count)
+            first_month = rates.first_month
+        else:
+            matrix, first_month = np.zeros((len(currencies), 0)), 0
+        arrays = {key: np.array(values, dtype=COLUMNS[key]) for key, values in lists.items()}
+        arrays['rate_matrix'] = matrix
+        arrays['fallback'] = np.array([fallback.get(c, np.nan) for c in currencies], dtype='float64')
+        header = {'names': list(dictionaries['name']), 'cities': list(dictionaries['city']), 'currencies': currencies,
+                  'rate_first_month': first_month}
+        dataset = cls(header, dict(arrays, salary=np.zeros(0)))
+        dataset.columns['salary'] = (arrays['salary_to'] + arrays['salary_from']) * \
+            dataset.costs(arrays['month'], arrays['currency'])
+        return dataset
+
+    def costs(self, months, currencies):
+        """Курсы валют для массивов номеров месяцев и кодов валют (исторический курс, иначе запасной)
+
+        Args:
+            months (numpy.ndarray): Номера месяцев
+            currencies (numpy.ndarray): Коды валют
+
+        Returns:
+            numpy.ndarray: Курсы (nan - курс неизвестен)
+        """
+        result = self.fallback[currencies]
+        count = self.rate_matrix.shape[1]
+        if count:
+            offsets = months - self.rate_first_month
+            inside = (offsets >= 0) & (offsets < count)
+            rates = np.full(len(months), np.nan)
+            rates[inside] = self.rate_matrix[currencies[inside], offsets[inside]]
+            result = np.where(np.isnan(rates), result, rates)
+        return result
+
+    def _layout(self):
+        """Внутренний метод класса. Заголовок буфера и смещения массивов
+
+        Returns:
+            tuple: (bytes - длина и заголовок, list[tuple] - (массив, смещение), int - размер буфера)
+        """
+        arrays = dict(self.columns, rate_matrix=self.rate_matrix, fallback=self.fallback)
+        specs, placed, offset = {}, [], 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            specs[name] = {'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset}
+            placed.append((array, offset))
+            offset += -(-array.nbytes // _ALIGN) * _ALIGN
+        header = json.dumps({'names': self.names, 'cities': self.cities, 'currencies': self.currencies,
+                             'rate_first_month': self.rate_first_month, 'arrays': specs}, ensure_ascii=False).encode('utf-8')
+        head = struct.pack('<Q', len(header)) + header
+        start = -(-len(head) // _ALIGN) * _ALIGN
+        return head, [(array, start + off) for array, off in placed], start + max(offset, 1)
+
+    @staticmethod
+    def _write(buffer, layout):
+        """Внутренний метод класса. Записывает набор в буфер
+
+        Args:
+            buffer (memoryview or mmap.mmap): Буфер (размер - не меньше layout[2])
+            layout (tuple): Результат _layout
+        """
+        head, placed, _ = layout
+        buffer[:len(head)] = head
+        for array, offset in placed:
+            buffer[offset:offset + array.nbytes] = array.tobytes()
+
+    def publish(self, name=None):
+        """Публикует набор в общую память. Блок нужно освободить (unlink), когда обработчики закончат работу
+
+        Args:
+            name (str or None): Имя блока общей памяти (None - случайное)
+
+        Returns:
+            ColumnarDataset: Набор, подключенный к блоку общей памяти (source - имя блока для attach)
+
+        Статистика, посчитанная обработчиками по общей памяти, совпадает с построчной (VacancyAggregate.add)
+        везде, кроме квантилей (скетчи при слиянии частей сжимаются по-другому):
+        >>> from distributed import load_engine
+        >>> engine = load_engine()
+        >>> vacancies = [engine.Vacancy({'name': ('Python-программист', 'Аналитик', 'Junior Python developer')[i % 3],
+        ...     'salary_from': 1000 * (i % 50 + 10), 'salary_to': 1000 * (i % 70 + 20),
+        ...     'salary_currency': ('RUR', 'USD', 'EUR')[i % 7 % 3], 'area_name': ('Москва', 'Казань', 'Пермь')[i % 5 % 3],
+        ...     'published_at': f'{2015 + i % 6}-{i % 12 + 1:02}-01T00:00:00+0300'}) for i in range(300)]
+        >>> by_rows = engine.VacancyAggregate('python')
+        >>> for vac in vacancies:
+        ...     by_rows.add(vac)
+        >>> shared = ColumnarDataset.from_vacancies(vacancies, {c: v['cost'] for c, v in engine.dic_money.items()}).publish()
+        >>> by_columns = engine.DataSet.columnar_stats(shared, 'python', workers=3)
+        >>> shared.unlink()
+        >>> expected = engine.DynamicObjects(None, None, by_rows)
+        >>> [name for name in ('salByYear', 'vacByYear', 'salByYearProf', 'vacByYearProf', 'salByCity', 'vacByCity',
+        ...                    'topProf', 'topCity', 'salHistByYear') if getattr(by_columns, name) != getattr(expected, name)]
+        []
+        """
+        layout = self._layout()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=layout[2])
+        ColumnarDataset._write(shm.buf, layout)
+        return ColumnarDataset._from_buffer(shm.buf, shm, shm.name)
+
+    def save(self, filename):
+        """Сохраняет набор в файл (для подключения через mmap)
+
+        Args:
+            filename (str): Имя файла
+        """
+        layout = self._layout()
+        with open(filename, 'wb+') as f:
+            f.truncate(layout[2])
+            with mmap.mmap(f.fileno(), layout[2]) as buffer:
+                ColumnarDataset._write(buffer, layout)
+
+    @staticmethod
+    def _from_buffer(buffer, handle, source):
+        """Внутренний метод класса. Создает набор, массивы которого - представления буфера (без копирования)
+
+        Args:
+            buffer (memoryview or mmap.mmap): Буфер
+            handle: Владелец буфера
+            source (str): Имя блока общей памяти или файла
+
+        Returns:
+            ColumnarDataset: Набор
+        """
+        size, = struct.unpack_from('<Q', buffer, 0)
+        header = json.loads(bytes(buffer[8:8 + size]).decode('utf-8'))
+        start = -(-(8 + size) // _ALIGN) * _ALIGN
+        arrays = {name: np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=buffer, 
+                                   offset=start + spec['offset']) for name, spec in header['arrays'].items()}
+        return ColumnarDataset(header, arrays, handle, source)
+
+    @staticmethod
+    def attach(source):
+        """Подключается к опубликованному (publish) или сохраненному (save) набору без копирования данных
+
+        Args:
+            source (str): Имя блока общей памяти или файла
+
+        Returns:
+            ColumnarDataset: Набор (только для чтения - массивы общие для всех процессов)
+        """
+        if os.path.isfile(source):
+            with open(source, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return ColumnarDataset._from_buffer(buffer, buffer, source)
+        shm = shared_memory.SharedMemory(name=source)
+        # блок освобождает создавший его процесс - подключившийся не должен удалять его при завершении.
+        # Дочерние процессы multiprocessing используют resource_tracker родителя, им отменять регистрацию не нужно
+        if multiprocessing.parent_process() is None:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return ColumnarDataset._from_buffer(shm.buf, shm, source)
+
+    def close(self):
+        """Отключается от общей памяти или файла (массивы набора становятся недоступны)"""
+        handle, self._handle = self._handle, None
+        self.columns = self.rate_matrix = self.fallback = None
+        if handle is not None:
+            handle.close()
+
+    def unlink(self):
+        """Освобождает блок общей памяти (вызывает процесс, опубликовавший набор) и отключается от него"""
+        if isinstance(self._handle, shared_memory.SharedMemory):
+            self._handle.unlink()
+        self.close()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,195 @@
+"""Чтение сжатых файлов с вакансиями без распаковки на диск (gzip, bz2, xz, zstd).
+
+Формат определяется по сигнатуре (magic number) в начале файла, если сигнатуры нет - по расширению.
+Файл распаковывается потоком прямо в читающий его код (csv.reader, pandas.read_csv).
+Если файл состоит из независимых блоков, известных заранее (BGZF - gzip из блоков с размером в
+заголовке, seekable zstd - zstd с таблицей кадров в конце), блоки распаковываются параллельно
+в потоках (zlib и zstandard освобождают GIL), порядок строк сохраняется.
+Для zstd нужна внешняя библиотека zstandard (pip install zstandard).
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# MAGIC (dict): Сигнатуры форматов {начало файла: формат}
+MAGIC = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz', b'\x28\xb5\x2f\xfd': 'zstd'}
+# EXTENSIONS (dict): Расширения форматов {расширение: формат}
+EXTENSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.bgz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.lzma': 'xz',
+              '.zst': 'zstd', '.zstd': 'zstd'}
+_SEEKABLE_ZSTD_MAGIC = 0x8F92EAB1
+
+
+def compression(filename):
+    """Определяет формат сжатия файла
+
+    Args:
+        filename (str): Имя файла
+
+    Returns:
+        str or None: 'gzip', 'bz2', 'xz', 'zstd' или None - файл не сжат
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(6)
+    for magic, kind in MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def _bgzf_blocks(f):
+    """Внутренняя функция. Читает блоки BGZF (каждый блок - отдельный gzip-член с размером в поле BC заголовка)
+
+    Args:
+        f (io.BufferedReader): Файл, открытый в двоичном режиме
+
+    Returns:
+        list[int] or None: Размеры блоков, None - файл не в формате BGZF
+    """
+    sizes, offset, total = [], 0, os.fstat(f.fileno()).st_size
+    while offset < total:
+        f.seek(offset)
+        head = f.read(18)
+        if len(head) < 18 or head[:4] != b'\x1f\x8b\x08\x04' or head[12:14] != b'BC':
+            return None
+        size = struct.unpack('<H', head[16:18])[0] + 1
+        sizes.append(size)
+        offset += size
+    f.seek(0)
+    return sizes
+
+
+def _zstd_frames(f):
+    """Внутренняя функция. Читает таблицу кадров seekable zstd (пропускаемый кадр в конце файла)
+
+    Args:
+        f (io.BufferedReader): Файл, открытый в двоичном режиме
+
+    Returns:
+        list[tuple] or None: (сжатый размер, распакованный размер) кадров, None - таблицы нет
+    """
+    total = os.fstat(f.fileno()).st_size
+    if total < 17:
+        return None
+    f.seek(total - 9)
+    count, descriptor, magic = struct.unpack('<IBI', f.read(9))
+    entry = 12 if descriptor & 0x80 else 8
+    table = None
+    if magic == _SEEKABLE_ZSTD_MAGIC and total >= 17 + count * entry:
+        f.seek(total - 9 - count * entry)
+        table = f.read(count * entry)
+    f.seek(0)
+    return None if table is None else [struct.unpack_from('<II', table, i * entry) for i in range(count)]
+
+
+def _parallel_chunks(f, blocks, decompress, workers):
+    """Внутренняя функция. Параллельно распаковывает блоки, отдавая результаты в порядке блоков.
+       Одновременно в работе не более 2 * workers блоков
+
+    Args:
+        f (io.BufferedReader): Файл, открытый в двоичном режиме
+        blocks (list): Блоки - (сжатый размер, параметр распаковки)
+        decompress (function): Функция (сжатые данные, параметр) -> распакованные данные
+        workers (int or None): Количество потоков
+
+    Returns:
+        generator: Распакованные блоки (bytes)
+    """
+    workers = workers or os.cpu_count() or 1
+    with f, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for size, param in blocks:
+            pending.append(executor.submit(decompress, f.read(size), param))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _ChunkStream(io.RawIOBase):
+    """Внутренний класс. Двоичный поток, читающий данные из последовательности блоков bytes"""
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._chunks.close()
+        super().close()
+
+
+def open_binary(filename, workers=None):
+    """Открывает (возможно, сжатый) файл как двоичный поток распакованных данных
+
+    Args:
+        filename (str): Имя файла
+        workers (int or None): Количество потоков для параллельной распаковки блоков
+
+    Returns:
+        io.BufferedIOBase: Поток
+    """
+    kind = compression(filename)
+    if kind is None:
+        return open(filename, 'rb')
+    if kind == 'bz2':
+        return bz2.open(filename, 'rb')
+    if kind == 'xz':
+        return lzma.open(filename, 'rb')
+    f = open(filename, 'rb')
+    if kind == 'gzip':
+        blocks = _bgzf_blocks(f)
+        if blocks is None:
+            f.close()
+            return gzip.open(filename, 'rb')
+        chunks = _parallel_chunks(f, [(size, None) for size in blocks],
+                                  lambda data, _: zlib.decompress(data, 16 + zlib.MAX_WBITS), workers)
+        return io.BufferedReader(_ChunkStream(chunks), 1 << 20)
+    if zstandard is None:
+        f.close()
+        raise ImportError(f'Для чтения {filename} (zstd) нужна библиотека zstandard')
+    frames = _zstd_frames(f)
+    if frames is None:
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True)
+    chunks = _parallel_chunks(f, frames, lambda data, size: zstandard.ZstdDecompressor().decompress(
+        data, max_output_size=size) if size else b'', workers)
+    return io.BufferedReader(_ChunkStream(chunks), 1 << 20)
+
+
+def open_text(filename, encoding='utf-8-sig', newline='', workers=None):
+    """Открывает (возможно, сжатый) файл как текстовый поток - для csv.reader и pandas.read_csv
+
+    Args:
+        filename (str): Имя файла
+        encoding (str): Кодировка
+        newline (str or None): Обработка переводов строк (как в open; '' - для csv)
+        workers (int or None): Количество потоков для параллельной распаковки блоков
+
+    Returns:
+        io.TextIOWrapper: Поток
+    """
+    if compression(filename) is None:
+        return open(filename, encoding=encoding, newline=newline)
+    return io.TextIOWrapper(open_binary(filename, workers), encoding=encoding, newline=newline)
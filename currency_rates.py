@@ -0,0 +1,66 @@
+"""Таблица исторических (помесячных) курсов валют для перевода зарплат в рубли.
+
+Курсы читаются из data_currencies.csv (формируется 03_03_01_full.py: date в формате 01/ММ/ГГГГ
+и по столбцу на валюту) в плоские массивы по валютам, индексируемые номером месяца (см. timecodes.py).
+Перевод одной зарплаты - два обращения по индексу, без поиска даты в таблице для каждой вакансии.
+Для валют, которых нет в таблице, месяцев вне таблицы и пропущенных курсов используется
+запасной (постоянный) курс.
+"""
+import csv
+
+
+class RateTable:
+    """Класс для представления помесячных курсов валют.
+
+    Attributes:
+        first_month (int): Номер первого месяца таблицы (год * 12 + месяц - 1)
+        months_count (int): Количество месяцев в таблице
+        fallback (dict): Запасные курсы {код валюты: курс}
+        by_currency (dict): Курсы {код валюты: list[float] - курс для каждого месяца таблицы (пропуски заполнены запасным)}
+    """
+    def __init__(self, filename='data_currencies.csv', fallback=None):
+        """Инициализирует экземпляр RateTable, читая курсы из файла filename
+
+        Args:
+            filename (str): Имя csv-файла с курсами (столбец date и столбцы валют)
+            fallback (dict or None): Запасные курсы {код валюты: курс}, RUR всегда равен 1
+
+        Returns:
+            Экземпляр класса RateTable
+        """
+        self.fallback = dict(fallback or {})
+        self.fallback['RUR'] = 1.0
+        with open(filename, encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            head = next(reader)
+            rows = [row for row in reader if row]
+        months = [int(row[0][6:10]) * 12 + int(row[0][3:5]) - 1 for row in rows]
+        self.first_month = min(months) if months else 0
+        self.months_count = max(months) - self.first_month + 1 if months else 0
+        self.by_currency = {}
+        for j, currency in enumerate(head[1:], 1):
+            default = self.fallback.get(currency)
+            column = [default] * self.months_count
+            for month, row in zip(months, rows):
+                if row[j] != '':
+                    column[month - self.first_month] = float(row[j])
+            self.by_currency[currency] = column
+        self.by_currency['RUR'] = [1.0] * self.months_count
+
+    def cost(self, month, currency):
+        """Возвращает курс валюты в месяце month
+
+        Args:
+            month (int): Номер месяца (см. timecodes.month_id)
+            currency (str): Код валюты
+
+        Returns:
+            float or None: Курс (исторический, иначе запасной), None - если курс неизвестен
+        """
+        column = self.by_currency.get(currency)
+        offset = month - self.first_month
+        if column is not None and 0 <= offset < self.months_count:
+            rate = column[offset]
+            if rate is not None:
+                return rate
+        return self.fallback.get(currency)
@@ -0,0 +1,176 @@
+"""Потоковое удаление дубликатов вакансий из пересекающихся выгрузок.
+
+Ключ вакансии - 64-битный хеш blake2b от (name, area_name, published_at, зарплата).
+Режимы: 'exact' - точное множество хешей, 'bloom' - фильтр Блума фиксированного размера
+(для очень больших выгрузок, допускает малую долю ложных срабатываний),
+'auto' - точное множество, которое при превышении exact_limit ключей переводится в фильтр Блума.
+"""
+import hashlib
+import math
+
+
+def vacancy_key(name, area_name, published_at, salary_from, salary_to, salary_currency):
+    """Вычисляет 64-битный хеш вакансии для поиска дубликатов
+
+    Args:
+        name (str): Название вакансии
+        area_name (str): Город размещения вакансии
+        published_at (str): Дата публикации вакансии
+        salary_from (str): Нижняя граница оклада
+        salary_to (str): Верхняя граница оклада
+        salary_currency (str): Валюта оклада
+
+    Returns:
+        int: Хеш вакансии
+
+    >>> vacancy_key('Программист', 'Москва', '2022-12-07T10:00:00+0300', '100', '200', 'RUR') == \\
+    ...     vacancy_key('Программист', 'Москва', '2022-12-07T10:00:00+0300', '100', '200', 'RUR')
+    True
+    """
+    raw = '\x1f'.join((name, area_name, published_at, salary_from, salary_to, salary_currency))
+    return int.from_bytes(hashlib.blake2b(raw.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class VacancyDeduplicator:
+    """Класс для потокового отбора уникальных вакансий.
+
+    Attributes:
+        mode (str): Текущий режим - 'exact' или 'bloom'
+        exact_limit (int): Количество ключей, после которого режим 'auto' переходит на фильтр Блума
+        seen_count (int): Количество проверенных вакансий
+        duplicates_count (int): Количество найденных (и отброшенных) дубликатов
+    """
+    def __init__(self, mode='auto', exact_limit=2_000_000, capacity=20_000_000, error_rate=0.001):
+        """Инициализирует экземпляр VacancyDeduplicator.
+
+        Args:
+            mode (str): 'exact', 'bloom' или 'auto'
+            exact_limit (int): Порог перехода режима 'auto' на фильтр Блума
+            capacity (int): Ожидаемое количество уникальных вакансий (размер фильтра Блума)
+            error_rate (float): Допустимая доля ложных срабатываний фильтра Блума
+
+        Returns:
+            Экземпляр класса VacancyDeduplicator
+        """
+        if mode not in ('exact', 'bloom', 'auto'):
+            raise ValueError(f'Неизвестный режим удаления дубликатов: {mode}')
+        self.exact_limit = exact_limit if mode == 'auto' else None
+        self.seen_count = 0
+        self.duplicates_count = 0
+        self._bits_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes_count = max(1, round(self._bits_count / capacity * math.log(2)))
+        self._keys = set()
+        self._bits = None
+        self.mode = 'exact'
+        if mode == 'bloom':
+            self._to_bloom()
+
+    def _to_bloom(self):
+        """Внутренний метод класса. Переводит дедупликатор в режим фильтра Блума (с переносом уже известных ключей)
+        """
+        self._bits = bytearray((self._bits_count + 7) // 8)
+        for key in self._keys:
+            self._bloom_add(key)
+        self._keys = set()
+        self.mode = 'bloom'
+
+    def _bloom_positions(self, key):
+        """Внутренний метод класса. Возвращает номера битов фильтра Блума для ключа (двойное хеширование)
+
+        Args:
+            key (int): Хеш вакансии
+
+        Returns:
+            generator: Номера битов
+        """
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        return ((h1 + i * h2) % self._bits_count for i in range(self._hashes_count))
+
+    def _bloom_add(self, key):
+        """Внутренний метод класса. Добавляет ключ в фильтр Блума
+
+        Args:
+            key (int): Хеш вакансии
+
+        Returns:
+            bool: True - если ключа (вероятно) не было в фильтре
+        """
+        is_new = False
+        bits = self._bits
+        for pos in self._bloom_positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                is_new = True
+        return is_new
+
+    def __contains__(self, key):
+        """Проверяет, встречался ли ключ (без добавления)
+
+        Args:
+            key (int): Хеш вакансии
+
+        Returns:
+            bool: True - если ключ уже встречался (в режиме 'bloom' - вероятно встречался)
+        """
+        if self.mode == 'exact':
+            return key in self._keys
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._bloom_positions(key))
+
+    def add(self, key):
+        """Регистрирует очередную вакансию
+
+        Args:
+            key (int): Хеш вакансии (см. vacancy_key)
+
+        Returns:
+            bool: True - если вакансия новая, False - если это дубликат
+
+        >>> dd = VacancyDeduplicator('bloom', capacity=1000)
+        >>> [dd.add(k) for k in (1 << 40, 2 << 40, 1 << 40)], dd.duplicates_count
+        ([True, True, False], 1)
+        """
+        self.seen_count += 1
+        if self.mode == 'exact':
+            if key in self._keys:
+                self.duplicates_count += 1
+                return False
+            self._keys.add(key)
+            if self.exact_limit is not None and len(self._keys) > self.exact_limit:
+                self._to_bloom()
+            return True
+        if self._bloom_add(key):
+            return True
+        self.duplicates_count += 1
+        return False
+
+    def merge(self, other):
+        """Объединяет множество известных ключей с другим дедупликатором (счетчики складываются)
+
+        Args:
+            other (VacancyDeduplicator): Дедупликатор другой части данных (с теми же capacity и error_rate)
+
+        Returns:
+            VacancyDeduplicator: Текущий дедупликатор (self)
+        """
+        if self.mode == 'exact' and other.mode == 'exact':
+            self._keys |= other._keys
+            if self.exact_limit is not None and len(self._keys) > self.exact_limit:
+                self._to_bloom()
+        else:
+            if self.mode == 'exact':
+                self._to_bloom()
+            if other.mode == 'exact':
+                for key in other._keys:
+                    self._bloom_add(key)
+            else:
+                merged = int.from_bytes(self._bits, 'little') | int.from_bytes(other._bits, 'little')
+                self._bits = bytearray(merged.to_bytes(len(self._bits), 'little'))
+        self.seen_count += other.seen_count
+        self.duplicates_count += other.duplicates_count
+        return self
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,412 @@
+"""Распределенный расчет статистики: несколько узлов-обработчиков и координатор.
+
+Каждый обработчик (на этом или другом компьютере) владеет своей частью (shard) файлов с вакансиями:
+по запросу координатора он читает свои файлы (DataSet.read_files), считает частичную статистику
+VacancyAggregate и отправляет ее координатору. Координатор сливает части в порядке номеров частей
+и строит по ним DynamicObjects - результат можно передать в Report, как экземпляр DataSet.
+
+Протокол - TCP, сообщение - 8 байт длины (big-endian), 32 байта подписи HMAC-SHA256 и объект pickle:
+    обработчик -> {'shard': номер части, 'files': имя файла, маска или каталог части}
+    координатор -> {'req_prof', 'dedup', 'years', 'rates', 'bins', 'parts'} - параметры расчета
+    обработчик -> {'aggregate': VacancyAggregate, 'file_stats': list, 'duplicates': int} или {'error': текст}
+pickle выполняет код при чтении, поэтому сообщение распаковывается только после проверки подписи общим
+секретным ключом узлов (Coordinator.key, на обработчиках - переменная окружения KEY_ENV): узел, не знающий
+ключа, не может ни подключиться как обработчик, ни выполнить код на узлах. Данные не шифруются.
+Дубликаты удаляются внутри части; при делении секционированного каталога (partitions.py) по годам
+одинаковые вакансии всегда попадают в одну часть, и удаление дубликатов точное.
+Координатор ждет подключения обработчиков и их результатов не дольше timeout; проверка с несколькими обработчиками
+на localhost (run_local) - doctest: python -m doctest distributed.py
+"""
+import hashlib
+import hmac
+import importlib.util
+import multiprocessing
+import os
+import pickle
+import secrets
+import socket
+import struct
+import sys
+import threading
+import time
+
+# ENGINE_FILE (str): Скрипт с классами DataSet, VacancyAggregate, DynamicObjects и Report
+ENGINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '02_03_01_doc(from_02_01_03).py')
+# ENGINE_MODULE (str): Имя, под которым скрипт загружается как модуль (одинаковое на всех узлах - для pickle)
+ENGINE_MODULE = 'vacancy_engine'
+# KEY_ENV (str): Переменная окружения с общим секретным ключом узлов (hex)
+KEY_ENV = 'VACANCY_CLUSTER_KEY'
+
+
+def load_engine():
+    """Загружает скрипт ENGINE_FILE как модуль ENGINE_MODULE (имя скрипта не является именем модуля)
+
+    Returns:
+        module: Модуль с классами DataSet, VacancyAggregate, DynamicObjects, Report
+    """
+    if ENGINE_MODULE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(ENGINE_MODULE, ENGINE_FILE)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[ENGINE_MODULE] = module
+        spec.loader.exec_module(module)
+    return sys.modules[ENGINE_MODULE]
+
+
+def cluster_key(key=None):
+    """Общий секретный ключ узлов
+
+    Args:
+        key (bytes or None): Ключ (None - из переменной окружения KEY_ENV)
+
+    Returns:
+        bytes: Ключ. Если ключ не задан - ValueError
+    """
+    if key is None and os.environ.get(KEY_ENV):
+        key = bytes.fromhex(os.environ[KEY_ENV])
+    if not key:
+        raise ValueError(f'Не задан общий секретный ключ узлов (переменная окружения {KEY_ENV})')
+    return key
+
+
+def _signature(key, data):
+    """Внутренняя функция. Подпись сообщения
+
+    Args:
+        key (bytes): Общий секретный ключ узлов
+        data (bytes): Длина и pickle объекта
+
+    Returns:
+        bytes: HMAC-SHA256 (32 байта)
+    """
+    return hmac.new(key, data, hashlib.sha256).digest()
+
+
+def send_message(sock, obj, key):
+    """Отправляет объект: длина, подпись и pickle
+
+    Args:
+        sock (socket.socket): Соединение
+        obj: Объект
+        key (bytes): Общий секретный ключ узлов
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    header = struct.pack('>Q', len(data))
+    sock.sendall(header + _signature(key, header + data) + data)
+
+
+def _receive_exactly(sock, size, deadline=None):
+    """Внутренняя функция. Читает из соединения ровно size байт
+
+    Args:
+        sock (socket.socket): Соединение
+        size (int): Количество байт
+        deadline (float or None): Момент (time.monotonic), после которого ждать нельзя (None - без ограничения)
+
+    Returns:
+        bytes: Данные. Если данные не получены до deadline - socket.timeout
+    """
+    chunks = []
+    while size > 0:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout('Время ожидания сообщения истекло')
+            sock.settimeout(remaining)
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('Соединение закрыто до получения сообщения')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def receive_message(sock, key, deadline=None):
+    """Получает объект, отправленный send_message. Объект распаковывается, только если подпись верна
+
+    Args:
+        sock (socket.socket): Соединение
+        key (bytes): Общий секретный ключ узлов
+        deadline (float or None): Момент (time.monotonic), после которого ждать нельзя (None - без ограничения)
+
+    Returns:
+        Объект. Если подпись неверна - ConnectionError, если не получен до deadline - socket.timeout
+
+    >>> left, right = socket.socketpair()
+    >>> send_message(left, {'shard': 0}, b'secret')
+    >>> receive_message(right, b'secret')
+    {'shard': 0}
+    >>> send_message(left, {'shard': 0}, b'other')
+    >>> receive_message(right, b'secret')
+    Traceback (most recent call last):
+    ...
+    ConnectionError: Неверная подпись сообщения - отправитель не знает общего ключа узлов
+    >>> receive_message(right, b'secret', time.monotonic() + 0.1)
+    Traceback (most recent call last):
+    ...
+    TimeoutError: timed out
+    >>> left.close(), right.close()
+    (None, None)
+    """
+    header = _receive_exactly(sock, 8, deadline)
+    signature = _receive_exactly(sock, 32, deadline)
+    data = _receive_exactly(sock, struct.unpack('>Q', header)[0], deadline)
+    if not hmac.compare_digest(signature, _signature(key, header + data)):
+        raise ConnectionError('Неверная подпись сообщения - отправитель не знает общего ключа узлов')
+    return pickle.loads(data)
+
+
+def run_worker(host, port, shard, files, key=None):
+    """Обработчик: подключается к координатору, получает параметры расчета, считает статистику
+       по своей части файлов и отправляет ее координатору
+
+    Args:
+        host (str): Адрес координатора
+        port (int): Порт координатора
+        shard (int): Номер части (определяет порядок слияния)
+        files (str or list[str]): Файл, маска, список файлов или секционированный каталог этой части
+        key (bytes or None): Общий секретный ключ узлов (None - из переменной окружения KEY_ENV)
+    """
+    engine = load_engine()
+    key = cluster_key(key)
+    with socket.create_connection((host, port)) as sock:
+        send_message(sock, {'shard': shard, 'files': files}, key)
+        job = receive_message(sock, key)
+        try:
+            row_filter = engine.VacancyFilter(years=job['years']) if job['years'] is not None else None
+            file_names = engine.DataSet.input_files(files, job['years'])
+            aggregate, deduplicator, file_stats = engine.DataSet.read_files(file_names, job['req_prof'], job['dedup'],
+                                                                            job['rates'], row_filter, job['bins'],
+                                                                            job['parts'])
+            send_message(sock, {'aggregate': aggregate, 'file_stats': file_stats,
+                                'duplicates': deduplicator.duplicates_count if deduplicator else 0}, key)
+        except Exception as e:
+            send_message(sock, {'error': f'{type(e).__name__}: {e}'}, key)
+
+
+class Coordinator:
+    """Класс для представления координатора распределенного расчета.
+       После run экземпляр можно передать в Report вместо DataSet.
+
+    Attributes:
+        req_prof (str): Наименование запрашиваемой профессии
+        workers (int): Количество ожидаемых обработчиков
+        dedup (str or None): Режим удаления дубликатов (внутри каждой части)
+        years (tuple or None): Диапазон лет публикации
+        rates (currency_rates.RateTable or None): Помесячные курсы валют (отправляются обработчикам)
+        bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат (отправляются обработчикам)
+        parts (frozenset or None): Накапливаемые части статистики для нужных показателей (None - все)
+        address (tuple): Адрес и порт, на которых координатор ждет обработчиков
+        timeout (float or None): Сколько секунд ждать подключения и результатов всех обработчиков (None - без ограничения)
+        key (bytes): Общий секретный ключ узлов - подписывает сообщения (обработчикам передается вне протокола)
+        dynamics_objects (DynamicObjects or None): Статистика по всем частям (после run)
+        file_stats (list[dict]): Статистика чтения файлов всех частей (после run)
+        duplicates_count (int): Количество отброшенных дубликатов (после run)
+    """
+    # poll_interval (float): Период (сек.) проверки времени ожидания и состояния обработчиков при ожидании подключений
+    poll_interval = 0.5
+
+    def __init__(self, req_prof, workers, host='127.0.0.1', port=0, dedup=None, years=None, rates=None, timeout=600,
+                 bins=None, statistics=None, key=None):
+        """Инициализирует экземпляр Coordinator и открывает порт для обработчиков
+
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии
+            workers (int): Количество ожидаемых обработчиков
+            host (str): Адрес ('0.0.0.0' - для обработчиков с других компьютеров)
+            port (int): Порт (0 - любой свободный, см. address)
+            dedup (str or None): Режим удаления дубликатов
+            years (tuple or None): Диапазон лет публикации
+            rates (currency_rates.RateTable or None): Помесячные курсы валют
+            timeout (float or None): Сколько секунд ждать подключения и результатов всех обработчиков (None - без ограничения)
+            bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат, None - VacancyAggregate.histogram_bins
+            statistics (iterable or None): Нужные показатели DynamicObjects (None - все)
+            key (bytes or None): Общий секретный ключ узлов (None - из переменной окружения KEY_ENV, 
+                если она не задана - новый случайный ключ)
+
+        Returns:
+            Экземпляр класса Coordinator
+        """
+        self.req_prof = req_prof
+        self.workers = workers
+        self.dedup = dedup
+        self.years = tuple(years) if years is not None else None
+        self.rates = rates
+        self.timeout = timeout
+        self.bins = bins
+        self.parts = load_engine().DynamicObjects.parts_for(statistics)
+        self.key = key if key is not None else cluster_key() if os.environ.get(KEY_ENV) else secrets.token_bytes(32)
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(Coordinator.poll_interval)
+        self.address = self._server.getsockname()[:2]
+        self.dynamics_objects = None
+        self.file_stats = []
+        self.duplicates_count = 0
+
+    def _serve(self, sock, results, deadline):
+        """Внутренний метод класса. Обмен сообщениями с одним обработчиком (в отдельном потоке).
+           Ошибка соединения, неверная подпись или истекшее время ожидания - ошибка части
+
+        Args:
+            sock (socket.socket): Соединение с обработчиком
+            results (list): Список, в который добавляется тройка (номер части, файлы части, ответ обработчика)
+            deadline (float or None): Момент (time.monotonic), после которого ждать нельзя
+        """
+        hello = {'shard': '?', 'files': 'обработчик не представился'}
+        with sock:
+            try:
+                hello = receive_message(sock, self.key, deadline)
+                send_message(sock, {'req_prof': self.req_prof, 'dedup': self.dedup, 'years': self.years,
+                                    'rates': self.rates, 'bins': self.bins, 'parts': self.parts}, self.key)
+                answer = receive_message(sock, self.key, deadline)
+            except OSError as e:
+                answer = {'error': f'{type(e).__name__}: {e}'}
+        results.append((hello['shard'], hello['files'], answer))
+
+    def _accept(self, connected, deadline, check):
+        """Внутренний метод класса. Ждет подключения очередного обработчика
+
+        Args:
+            connected (int): Количество уже подключившихся обработчиков
+            deadline (float or None): Момент (time.monotonic), после которого ждать нельзя
+            check (function or None): Вызывается при ожидании - проверяет обработчики (исключение прерывает ожидание)
+
+        Returns:
+            socket.socket: Соединение с обработчиком
+        """
+        while True:
+            try:
+                return self._server.accept()[0]
+            except socket.timeout:
+                if check is not None:
+                    check()
+                if deadline is not None and time.monotonic() > deadline:
+                    raise RuntimeError(f'За {self.timeout} с подключились {connected} обработчиков из {self.workers}')
+
+    def run(self, check=None):
+        """Ждет workers обработчиков и их частичную статистику (все вместе - не дольше timeout) и сливает ее
+
+        Args:
+            check (function or None): Вызывается при ожидании подключений - проверяет, что обработчики 
+                еще работают (например, процессы run_local), и выбрасывает исключение, если нет
+
+        Returns:
+            Coordinator: Текущий экземпляр (self) с заполненными dynamics_objects, file_stats, duplicates_count
+
+        >>> Coordinator('Программист', 1, timeout=1).run()
+        Traceback (most recent call last):
+        ...
+        RuntimeError: За 1 с подключились 0 обработчиков из 1
+
+        Обработчик, который подключился, но не отвечает, - ошибка части по истечении timeout:
+        >>> coordinator = Coordinator('Программист', 1, timeout=1)
+        >>> silent = socket.create_connection(coordinator.address)
+        >>> coordinator.run()  # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        RuntimeError: Часть ? (обработчик не представился): TimeoutError: ...
+        >>> silent.close()
+        """
+        engine = load_engine()
+        results, threads = [], []
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        with self._server:
+            for connected in range(self.workers):
+                sock = self._accept(connected, deadline, check)
+                thread = threading.Thread(target=self._serve, args=(sock, results, deadline))
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+        errors = [f'Часть {shard} ({files}): {answer["error"]}' for shard, files, answer in results if 'error' in answer]
+        if errors:
+            raise RuntimeError('; '.join(errors))
+        aggregate = engine.VacancyAggregate(self.req_prof, self.rates, self.bins, self.parts)
+        for shard, files, answer in sorted(results, key=lambda result: result[0]):
+            aggregate.merge(answer['aggregate'])
+            self.file_stats.extend(answer['file_stats'])
+            self.duplicates_count += answer['duplicates']
+        self.dynamics_objects = engine.DynamicObjects(None, None, aggregate)
+        return self
+
+
+def run_local(shards, req_prof, dedup=None, years=None, rates=None, timeout=600, bins=None, statistics=None):
+    """Распределенный расчет на одном компьютере: координатор и по процессу-обработчику на каждую часть.
+       Если процесс-обработчик завершился с ошибкой, не подключившись, расчет прерывается (RuntimeError)
+
+    Args:
+        shards (list): Части - для каждой файл, маска, список файлов или секционированный каталог
+        req_prof (str): Наименование запрашиваемой профессии
+        dedup (str or None): Режим удаления дубликатов
+        years (tuple or None): Диапазон лет публикации
+        rates (currency_rates.RateTable or None): Помесячные курсы валют
+        timeout (float or None): Сколько секунд ждать подключения обработчиков
+        bins (histogram.HistogramBins or None): Интервалы гистограмм зарплат
+        statistics (iterable or None): Нужные показатели DynamicObjects (None - все)
+
+    Returns:
+        Coordinator: Координатор с результатами расчета
+
+    Результат совпадает с параллельным чтением тех же файлов в одном процессе (DataSet.read_files):
+    >>> import os, tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> files = [os.path.join(folder, f'part{shard}.csv') for shard in range(3)]
+    >>> for shard, file in enumerate(files):
+    ...     with open(file, 'w', encoding='utf-8') as f:
+    ...         _ = f.write('name,salary_from,salary_to,salary_currency,area_name,published_at\\n' + ''.join(
+    ...             f'{("Программист", "Аналитик")[i % 2]},{1000 * i},{2000 * i},RUR,{("Москва", "Казань")[i % 3 // 2]},'
+    ...             f'{2019 + shard}-0{i}-01T00:00:00+0300\\n' for i in range(1, 10)))
+    >>> coordinator = run_local(files[:2] + [files[2:]], 'Программист')
+    >>> coordinator.dynamics_objects.vacByYear['val'], coordinator.dynamics_objects.vacByYearProf['val']
+    ({2019: 9, 2020: 9, 2021: 9}, {2019: 4, 2020: 4, 2021: 4})
+    >>> engine = load_engine()
+    >>> expected = engine.DynamicObjects(None, None, engine.DataSet.read_files(files, 'Программист')[0])
+    >>> all(getattr(coordinator.dynamics_objects, name) == getattr(expected, name) for name in
+    ...     ('salByYear', 'vacByYear', 'salByYearProf', 'vacByYearProf', 'salByCity', 'vacByCity', 'topCity'))
+    True
+    >>> run_local([files[0], os.path.join(folder, 'missing.csv')], 'Программист')  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    RuntimeError: Часть 1 (...missing.csv): FileNotFoundError: ...
+    """
+    coordinator = Coordinator(req_prof, len(shards), dedup=dedup, years=years, rates=rates, timeout=timeout, bins=bins,
+                              statistics=statistics, key=secrets.token_bytes(32))
+    host, port = coordinator.address
+    processes = [multiprocessing.Process(target=run_worker, args=(host, port, i, files, coordinator.key))
+                 for i, files in enumerate(shards)]
+    for process in processes:
+        process.start()
+
+    def check():
+        failed = [i for i, process in enumerate(processes) if process.exitcode not in (None, 0)]
+        if failed:
+            raise RuntimeError(f'Обработчики частей {failed} завершились с ошибкой до подключения к координатору')
+
+    try:
+        return coordinator.run(check)
+    finally:
+        for process in processes:
+            process.join(Coordinator.poll_interval)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+
+if __name__ == '__main__':
+    mode = input('Введите режим (coordinator / worker): ').strip()
+    my_host, my_port = input('Введите адрес координатора (host:port): ').strip().rsplit(':', 1)
+    if mode == 'worker':
+        run_worker(my_host, int(my_port), int(input('Введите номер части: ')),
+                   ' '.join(input('Введите название файла (маску, каталог) части: ').split()),
+                   None if os.environ.get(KEY_ENV) else bytes.fromhex(input('Введите общий ключ узлов: ').strip()))
+    else:
+        my_coordinator = Coordinator(' '.join(input('Введите название профессии: ').split()),
+                                     int(input('Введите количество обработчиков: ')), my_host, int(my_port),
+                                     dedup='auto')
+        if not os.environ.get(KEY_ENV):
+            print(f'Общий ключ узлов (ввести на обработчиках или задать в {KEY_ENV}): {my_coordinator.key.hex()}')
+        my_coordinator.run()
+        for fs in my_coordinator.file_stats:
+            print(f'Файл {fs["file"]}: вакансий - {fs["rows"]}, дубликатов - {fs["duplicates"]}, время обработки - {fs["seconds"]} с')
+        my_report = load_engine().Report(my_coordinator)
+        my_report.generate_excel(my_coordinator.req_prof)
+        my_report.generate_html(my_coordinator.req_prof)
@@ -0,0 +1,113 @@
+"""Потоковый поиск самых частых значений (алгоритм Space-Saving, Metwally и др.).
+
+Хранится не более capacity счетчиков, поэтому самые частые названия вакансий и города
+находятся без словаря по всем (миллионам) различных названий. Для значений, встречающихся
+чаще чем (количество элементов) / capacity раз, результат гарантированно попадает в счетчики;
+оценка количества завышена не более чем на error. Сводки сливаются методом merge.
+"""
+import heapq
+import itertools
+
+
+class SpaceSaving:
+    """Класс для представления сводки Space-Saving.
+
+    Attributes:
+        capacity (int): Максимальное количество счетчиков
+        count (int): Количество учтенных элементов
+        counters (dict): Счетчики {значение: [оценка количества, максимальная ошибка оценки]}
+    """
+    def __init__(self, capacity=1000):
+        """Инициализирует пустой экземпляр SpaceSaving.
+
+        Args:
+            capacity (int): Максимальное количество счетчиков
+
+        Returns:
+            Экземпляр класса SpaceSaving
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.counters = {}
+        self._heap = []
+
+    def _pop_min(self):
+        """Внутренний метод класса. Удаляет счетчик с наименьшей оценкой.
+           В куче у каждого значения одна запись, ее оценка может быть устаревшей (заниженной) -
+           такие записи обновляются при извлечении
+
+        Returns:
+            list: [оценка количества, ошибка] удаленного счетчика
+        """
+        while True:
+            recorded, item = self._heap[0]
+            current = self.counters[item]
+            if current[0] == recorded:
+                heapq.heappop(self._heap)
+                return self.counters.pop(item)
+            heapq.heapreplace(self._heap, (current[0], item))
+
+    def update(self, item, weight=1):
+        """Учитывает очередное значение
+
+        Args:
+            item (str): Значение (название вакансии, город)
+            weight (int): Вес (количество повторений)
+
+        >>> top = SpaceSaving(capacity=2)
+        >>> for name in ['a', 'b', 'a', 'c', 'a']: top.update(name)
+        >>> top.top(1)
+        [('a', 3, 0)]
+        """
+        self.count += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0]
+            heapq.heappush(self._heap, (weight, item))
+            return
+        min_count = self._pop_min()[0]
+        self.counters[item] = [min_count + weight, min_count]
+        heapq.heappush(self._heap, (min_count + weight, item))
+
+    def merge(self, other):
+        """Сливает в текущую сводку другую сводку (other не изменяется).
+           Значению, отсутствующему в заполненной сводке, приписывается ее минимальная оценка (как ошибка)
+
+        Args:
+            other (SpaceSaving): Сводка другой части данных
+
+        Returns:
+            SpaceSaving: Текущая сводка (self)
+        """
+        my_min = min(c[0] for c in self.counters.values()) if len(self.counters) >= self.capacity else 0
+        other_min = min(c[0] for c in other.counters.values()) if len(other.counters) >= other.capacity else 0
+        merged = {}
+        for item in itertools.chain(self.counters, (item for item in other.counters if item not in self.counters)):
+            mine = self.counters.get(item, [my_min, my_min])
+            theirs = other.counters.get(item, [other_min, other_min])
+            merged[item] = [mine[0] + theirs[0], mine[1] + theirs[1]]
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda x: x[1][0])
+        self.counters = dict(kept)
+        self._heap = [(counter[0], item) for item, counter in kept]
+        heapq.heapify(self._heap)
+        self.count += other.count
+        return self
+
+    def top(self, k):
+        """Возвращает k самых частых значений
+
+        Args:
+            k (int): Количество значений
+
+        Returns:
+            list[tuple]: (значение, оценка количества, максимальная ошибка) в порядке убывания оценки
+        """
+        return [(item, c[0], c[1]) for item, c in heapq.nlargest(k, self.counters.items(), key=lambda x: x[1][0])]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,109 @@
+"""Гистограмма зарплат с фиксированными интервалами (линейными или логарифмическими).
+
+Интервалы задаются заранее (HistogramBins), поэтому гистограмма - просто массив количеств:
+она заполняется за тот же проход, что и остальная статистика, а части, посчитанные по разным
+файлам или процессам, сливаются сложением массивов (только при одинаковых интервалах).
+Значения ниже нижней границы попадают в первый интервал, выше верхней - в последний.
+"""
+import math
+import numpy as np
+
+
+class HistogramBins:
+    """Класс для представления интервалов гистограммы.
+
+    Attributes:
+        low (float): Нижняя граница первого интервала
+        high (float): Верхняя граница последнего интервала
+        count (int): Количество интервалов
+        log (bool): True - интервалы равной ширины в логарифмической шкале
+        edges (list[float]): Границы интервалов (count + 1 значение)
+    """
+    def __init__(self, low=0, high=500_000, count=50, log=False):
+        """Инициализирует экземпляр HistogramBins
+
+        Args:
+            low (float): Нижняя граница (для log - больше 0)
+            high (float): Верхняя граница
+            count (int): Количество интервалов
+            log (bool): Логарифмическая шкала
+
+        Returns:
+            Экземпляр класса HistogramBins
+        """
+        if high <= low or count < 1 or (log and low <= 0):
+            raise ValueError(f'Неверные интервалы гистограммы: {low}..{high}, {count}, log={log}')
+        self.low, self.high, self.count, self.log = low, high, count, log
+        if log:
+            self._start, self._width = math.log(low), (math.log(high) - math.log(low)) / count
+            self.edges = [math.exp(self._start + self._width * i) for i in range(count + 1)]
+        else:
+            self._start, self._width = low, (high - low) / count
+            self.edges = [low + self._width * i for i in range(count + 1)]
+
+    def index(self, value):
+        """Возвращает номер интервала для значения
+
+        Args:
+            value (float): Значение (зарплата в рублях)
+
+        Returns:
+            int: Номер интервала (0 .. count - 1)
+
+        >>> bins = HistogramBins(0, 100, 10)
+        >>> [bins.index(v) for v in (-5, 0, 15, 99.9, 100, 1000)]
+        [0, 0, 1, 9, 9, 9]
+        >>> HistogramBins(1000, 1_000_000, 3, log=True).index(50_000)
+        1
+        """
+        if self.log:
+            value = math.log(value) if value > 0 else -math.inf
+        i = int((value - self._start) // self._width) if value > self._start else 0
+        return min(i, self.count - 1)
+
+    def indices(self, values):
+        """Возвращает номера интервалов для массива значений (то же, что index для каждого значения)
+
+        Args:
+            values (numpy.ndarray): Значения
+
+        Returns:
+            numpy.ndarray: Номера интервалов
+
+        >>> HistogramBins(0, 100, 10).indices(np.array([-5, 0, 15, 99.9, 100, 1000])).tolist()
+        [0, 0, 1, 9, 9, 9]
+        """
+        values = np.asarray(values, dtype='float64')
+        if self.log:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(values > 0, np.log(values), -np.inf)
+        above = values > self._start
+        result = np.zeros(len(values), dtype='int64')
+        result[above] = np.floor_divide(values[above] - self._start, self._width)
+        return np.minimum(result, self.count - 1)
+
+    def __eq__(self, other):
+        return isinstance(other, HistogramBins) and repr(self) == repr(other)
+
+    def __repr__(self):
+        return f'HistogramBins({self.low}, {self.high}, {self.count}, log={self.log})'
+
+
+def merge_counts(mine, theirs):
+    """Прибавляет массив количеств theirs к массиву mine (на месте)
+
+    Args:
+        mine (list[int]): Количества, к которым прибавляется
+        theirs (list[int]): Прибавляемые количества (той же длины)
+
+    Returns:
+        list[int]: mine
+    """
+    for i, n in enumerate(theirs):
+        mine[i] += n
+    return mine
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,352 @@
+"""Потоковый сбор вакансий с hh.ru со статистикой, доступной во время сбора.
+
+Страницы ответа API (как в 03_03_03.py: вакансии за день по четырем интервалам времени, до 20 страниц
+по 100 вакансий) сразу после получения приводятся к строкам vacancies_api.csv, дописываются в файл
+и учитываются в общей частичной статистике VacancyAggregate (зарплаты переводятся в рубли по курсам
+на месяц публикации). Статистику по годам и городам можно запрашивать (snapshot) из другого потока
+в любой момент сбора - она строится по копии частичной статистики, снятой под блокировкой.
+Для проверки без сети ReplayServer воспроизводит записанный (или сгенерированный) поток ответов API
+с заданной скоростью - страниц в секунду.
+"""
+import csv
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import requests
+from distributed import load_engine
+
+# API_URL (str): Адрес списка вакансий API hh.ru
+API_URL = 'https://api.hh.ru/vacancies'
+# API_COLUMNS (list): Столбцы строк вакансий (как в vacancies_api.csv)
+API_COLUMNS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+# DAY_PERIODS (list): Границы интервалов времени суток, по которым запрашиваются вакансии (не больше 2000 на интервал)
+DAY_PERIODS = ['00:00:01', '06:00:00', '12:00:00', '18:00:00', '23:59:59']
+# LIVE_STATISTICS (list): Показатели, доступные во время сбора (статистика по годам и городам)
+LIVE_STATISTICS = ['salByYear', 'vacByYear', 'salByYearProf', 'vacByYearProf', 'salByCity', 'vacByCity']
+
+
+def normalize(item):
+    """Приводит вакансию из ответа API к строке vacancies_api.csv
+
+    Args:
+        item (dict): Вакансия из списка items ответа API
+
+    Returns:
+        dict: {столбец из API_COLUMNS: значение (str), пустая строка - нет значения}
+
+    >>> normalize({'name': 'Программист', 'salary': {'from': 100000, 'to': None, 'currency': 'RUR'},
+    ...            'area': {'name': 'Москва'}, 'published_at': '2022-12-07T10:00:00+0300'})['salary_from']
+    '100000'
+    """
+    salary = item.get('salary') or {}
+    values = [item.get('name'), salary.get('from'), salary.get('to'), salary.get('currency'),
+              (item.get('area') or {}).get('name'), item.get('published_at')]
+    return {column: '' if value is None else str(value) for column, value in zip(API_COLUMNS, values)}
+
+
+def fetch_pages(url=API_URL, date='2022-12-07', recording=None):
+    """Запрашивает вакансии за день постранично (как 03_03_03.py)
+
+    Args:
+        url (str): Адрес списка вакансий (API_URL или адрес ReplayServer)
+        date (str): День публикации (ГГГГ-ММ-ДД)
+        recording (list or None): Список, в который дописываются параметры и ответы (для ReplayServer)
+
+    Returns:
+        generator: Списки вакансий (items) страниц в порядке получения
+    """
+    with requests.Session() as session:
+        for i in range(1, len(DAY_PERIODS)):
+            for page in range(20):
+                params = {'specialization': 1, 'per_page': 100, 'page': page,
+                          'date_from': f'{date}T{DAY_PERIODS[i - 1]}', 'date_to': f'{date}T{DAY_PERIODS[i]}'}
+                response = session.get(url, params=params)
+                response.raise_for_status()
+                answer = response.json()
+                if recording is not None:
+                    recording.append({'params': params, 'response': answer})
+                if len(answer['items']) == 0:
+                    break
+                yield answer['items']
+
+
+class LiveStats:
+    """Класс для представления статистики, накапливаемой во время сбора вакансий.
+
+    Attributes:
+        req_prof (str): Наименование запрашиваемой профессии
+        rates (currency_rates.RateTable or None): Помесячные курсы валют, None - постоянные курсы из dic_money
+        aggregate (VacancyAggregate): Частичная статистика по собранным вакансиям (части для LIVE_STATISTICS)
+        deduplicator (dedup.VacancyDeduplicator): Дедупликатор (страницы могут повторять вакансии при сдвиге выдачи)
+        output (str or None): Файл, в который дописываются все собранные строки (None - не записывать)
+        pages (int): Количество обработанных страниц
+        rows (int): Количество собранных вакансий
+        used (int): Количество вакансий, учтенных в статистике (без пустых полей, валют без курса и дубликатов)
+        error (Exception or None): Ошибка сбора в фоновом потоке
+    """
+    def __init__(self, req_prof, rates=None, output='vacancies_api.csv'):
+        """Инициализирует пустой экземпляр LiveStats (файл output создается заново с заголовком)
+
+        Args:
+            req_prof (str): Наименование запрашиваемой профессии
+            rates (currency_rates.RateTable or None): Помесячные курсы валют
+            output (str or None): Файл для собранных строк
+
+        Returns:
+            Экземпляр класса LiveStats
+        """
+        self._engine = load_engine()
+        self.req_prof = req_prof
+        self.rates = rates
+        self._parts = self._engine.DynamicObjects.parts_for(LIVE_STATISTICS)
+        self.aggregate = self._engine.VacancyAggregate(req_prof, rates, parts=self._parts)
+        self.deduplicator = self._engine.VacancyDeduplicator('exact')
+        self.output = output
+        self.pages = self.rows = self.used = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        if output is not None:
+            with open(output, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerow(API_COLUMNS)
+
+    def _has_rate(self, row):
+        """Внутренний метод класса. Проверяет, известен ли курс валюты оклада на месяц публикации
+
+        Args:
+            row (dict): Строка вакансии
+
+        Returns:
+            bool: True - зарплату можно перевести в рубли
+        """
+        currency = row['salary_currency']
+        if self.rates is None:
+            return currency in self._engine.dic_money
+        return self.rates.cost(self._engine.timecodes.month_id(row['published_at']), currency) is not None
+
+    def add_page(self, items):
+        """Учитывает страницу ответа API: строки дописываются в output, вакансии с заполненными полями -
+           в статистику (как при чтении vacancies_api.csv)
+
+        Args:
+            items (list[dict]): Вакансии страницы
+        """
+        rows = [normalize(item) for item in items]
+        if self.output is not None:
+            with open(self.output, 'a', encoding='utf-8', newline='') as f:
+                csv.DictWriter(f, API_COLUMNS).writerows(rows)
+        vacancies = [self._engine.Vacancy(row) for row in rows
+                     if '' not in row.values() and self._has_rate(row)
+                     and self.deduplicator.add(self._engine.DataSet.dedup_key(row))]
+        with self._lock:
+            for vac in vacancies:
+                self.aggregate.add(vac)
+            self.pages += 1
+            self.rows += len(rows)
+            self.used += len(vacancies)
+
+    def snapshot(self):
+        """Статистика по вакансиям, собранным к текущему моменту (можно вызывать во время сбора)
+
+        Returns:
+            DynamicObjects: Статистика (показатели LIVE_STATISTICS)
+        """
+        copy = self._engine.VacancyAggregate(self.req_prof, self.rates, parts=self._parts)
+        with self._lock:
+            copy.merge(self.aggregate)
+        return self._engine.DynamicObjects(None, None, copy)
+
+    def progress(self):
+        """Ход сбора
+
+        Returns:
+            dict: Количество страниц, собранных и учтенных вакансий, вакансий в секунду
+        """
+        seconds = time.perf_counter() - self._started
+        return {'pages': self.pages, 'rows': self.rows, 'used': self.used,
+                'rows_per_second': round(self.rows / seconds, 1) if seconds > 0 else 0.0}
+
+    def collect(self, url=API_URL, date='2022-12-07', recording=None):
+        """Собирает вакансии за день, учитывая страницы по мере получения
+
+        Args:
+            url (str): Адрес списка вакансий
+            date (str): День публикации
+            recording (list or None): Список для записи ответов API (см. fetch_pages)
+        """
+        for items in fetch_pages(url, date, recording):
+            self.add_page(items)
+
+    def start(self, url=API_URL, date='2022-12-07', recording=None):
+        """Запускает сбор в фоновом потоке (ошибка сбора сохраняется в error)
+
+        Args:
+            url (str): Адрес списка вакансий
+            date (str): День публикации
+            recording (list or None): Список для записи ответов API
+
+        Returns:
+            threading.Thread: Поток сбора
+        """
+        def run():
+            try:
+                self.collect(url, date, recording)
+            except Exception as e:
+                self.error = e
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+
+def synthetic_recording(pages=20, per_page=100, date='2022-12-07', seed=0):
+    """Генерирует поток ответов API для ReplayServer (для проверки скорости без записи настоящего потока)
+
+    Args:
+        pages (int): Количество страниц в каждом интервале DAY_PERIODS
+        per_page (int): Количество вакансий на странице
+        date (str): День публикации
+        seed (int): Начальное значение генератора случайных чисел
+
+    Returns:
+        list[dict]: Записи {'params': параметры запроса, 'response': ответ API}
+    """
+    rnd = random.Random(seed)
+    names = ['Программист Python', 'Аналитик', 'Frontend-разработчик', 'Тестировщик', 'Менеджер проекта']
+    areas = ['Москва', 'Санкт-Петербург', 'Казань', 'Екатеринбург', 'Новосибирск', 'Минск']
+    currencies = ['RUR'] * 8 + ['USD', 'KZT']
+    recording = []
+    for i in range(1, len(DAY_PERIODS)):
+        for page in range(pages + 1):
+            items = []
+            for _ in range(per_page if page < pages else 0):
+                low = rnd.randrange(20, 200) * 1000
+                salary = None if rnd.random() < 0.3 else {'from': low, 'to': low + rnd.randrange(0, 100) * 1000,
+                                                          'currency': rnd.choice(currencies)}
+                items.append({'name': rnd.choice(names), 'salary': salary, 'area': {'name': rnd.choice(areas)},
+                              'published_at': f'{date}T{DAY_PERIODS[i - 1][:2]}:{rnd.randrange(60):02d}:00+0300'})
+            recording.append({'params': {'page': page, 'date_from': f'{date}T{DAY_PERIODS[i - 1]}',
+                                         'date_to': f'{date}T{DAY_PERIODS[i]}'}, 'response': {'items': items}})
+    return recording
+
+
+class ReplayServer:
+    """Класс для представления локального сервера, воспроизводящего записанный поток ответов API.
+       Ответ выбирается по (date_from, date_to, page) запроса; неизвестный запрос - пустая страница
+
+    Attributes:
+        pages_per_second (float or None): Скорость выдачи страниц (None - без ограничения)
+        url (str): Адрес списка вакансий сервера (для fetch_pages и LiveStats.collect)
+    """
+    def __init__(self, recording, pages_per_second=None, host='127.0.0.1', port=0):
+        """Инициализирует экземпляр ReplayServer и запускает сервер в фоновом потоке
+
+        Args:
+            recording (list[dict] or str): Записи (см. fetch_pages, synthetic_recording) или json-файл с ними
+            pages_per_second (float or None): Скорость выдачи страниц
+            host (str): Адрес сервера
+            port (int): Порт (0 - любой свободный)
+
+        Returns:
+            Экземпляр класса ReplayServer
+
+        >>> server = ReplayServer(synthetic_recording(pages=3, per_page=50), pages_per_second=200)
+        >>> live = LiveStats('Программист', output=None)
+        >>> thread = live.start(server.url)
+        >>> during = live.snapshot().vacByYear['val']
+        >>> thread.join(); server.close()
+        >>> live.error, live.pages, live.rows, sum(during.values()) <= live.used
+        (None, 12, 600, True)
+        >>> sum(live.snapshot().vacByYear['val'].values()) == live.used
+        True
+        """
+        if isinstance(recording, str):
+            with open(recording, encoding='utf-8') as f:
+                recording = json.load(f)
+        self.pages_per_second = pages_per_second
+        self._responses = {ReplayServer._request_key(entry['params']): json.dumps(entry['response']).encode('utf-8')
+                           for entry in recording}
+        self._lock = threading.Lock()
+        self._next = time.perf_counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                body = server._responses.get(ReplayServer._request_key(params), b'{"items": []}')
+                server._pace()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f'http://{host}:{self._server.server_address[1]}/vacancies'
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _request_key(params):
+        """Внутренний метод класса. Ключ ответа по параметрам запроса
+
+        Args:
+            params (dict): Параметры запроса
+
+        Returns:
+            tuple: (date_from, date_to, page)
+        """
+        return str(params.get('date_from')), str(params.get('date_to')), int(params.get('page', 0))
+
+    def _pace(self):
+        """Внутренний метод класса. Ждет очередного интервала выдачи страницы (1 / pages_per_second)"""
+        if not self.pages_per_second:
+            return
+        with self._lock:
+            wait = self._next - time.perf_counter()
+            self._next = max(self._next, time.perf_counter()) + 1 / self.pages_per_second
+        if wait > 0:
+            time.sleep(wait)
+
+    def close(self):
+        """Останавливает сервер"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == '__main__':
+    my_prof = ' '.join(input('Введите название профессии: ').split())
+    my_replay = ' '.join(input('Введите файл записи ответов API (пусто - hh.ru, * - сгенерированный поток): ').split())
+    my_engine = load_engine()
+    my_rates = my_engine.RateTable('data_currencies.csv', {c: my_engine.dic_money[c]['cost'] for c in my_engine.dic_money}) \
+        if os.path.isfile('data_currencies.csv') else None
+    my_server = None
+    if my_replay:
+        my_speed = input('Введите скорость воспроизведения, страниц в секунду (пусто - без ограничения): ').strip()
+        my_server = ReplayServer(synthetic_recording() if my_replay == '*' else my_replay,
+                                 float(my_speed) if my_speed else None)
+    my_recording = [] if my_server is None else None      # ответы hh.ru записываются для воспроизведения
+    my_live = LiveStats(my_prof, my_rates)
+    my_thread = my_live.start(my_server.url if my_server else API_URL, recording=my_recording)
+    while my_thread.is_alive():                             # статистика во время сбора - раз в 2 секунды
+        my_thread.join(2)
+        my_stats = my_live.snapshot()
+        print(my_live.progress())
+        print(f'{my_stats.vacByYear["name"]}: {my_stats.vacByYear["val"]}')
+        print(f'{my_stats.salByCity["name"]}: {my_stats.salByCity["val"]}')
+    if my_server is not None:
+        my_server.close()
+    if my_live.error is not None:
+        print(f'Ошибка сбора: {my_live.error}')
+    if my_recording:
+        with open('vacancies_api_recording.json', 'w', encoding='utf-8') as f:
+            json.dump(my_recording, f, ensure_ascii=False)
+    my_stats = my_live.snapshot()
+    for name in LIVE_STATISTICS:
+        print(f'{getattr(my_stats, name)["name"]}: {getattr(my_stats, name)["val"]}')
@@ -0,0 +1,193 @@
+"""Секционированное по годам хранение вакансий.
+
+Вакансии раскладываются по каталогам <каталог>/year=<год>/vacancies.csv (по году published_at),
+рядом записывается файл метаданных _partitions.json: для каждого года - количество вакансий,
+минимальная и максимальная зарплата (по каждой валюте, среднее от/до) и множество городов.
+При чтении с фильтром по годам файлы остальных лет не открываются, а часть запросов
+(количество вакансий и городов по годам, диапазон зарплат) решается по одним метаданным.
+"""
+import csv
+import glob
+import json
+import os
+from compressed import open_text
+
+# PARTITION_META (str): Имя файла метаданных секционированного каталога
+PARTITION_META = '_partitions.json'
+# PARTITION_FILE (str): Имя файла с вакансиями внутри каталога одного года
+PARTITION_FILE = 'vacancies.csv'
+
+
+def partition_path(dataset_dir, year):
+    """Возвращает путь к файлу вакансий заданного года
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        year (int): Год
+
+    Returns:
+        str: Путь к файлу
+    """
+    return os.path.join(dataset_dir, f'year={year}', PARTITION_FILE)
+
+
+def is_partitioned(path):
+    """Проверяет, является ли путь секционированным каталогом
+
+    Args:
+        path (str): Путь, введенный пользователем
+
+    Returns:
+        bool: True - если path - каталог с файлом метаданных
+    """
+    return isinstance(path, str) and os.path.isfile(os.path.join(path, PARTITION_META))
+
+
+def in_years(year, years):
+    """Проверяет попадание года в диапазон
+
+    Args:
+        year (int): Год
+        years (tuple or None): Диапазон (первый год, последний год) включительно, None - без ограничений
+
+    Returns:
+        bool: True - если год попадает в диапазон
+    """
+    return years is None or years[0] <= year <= years[1]
+
+
+def write_partitions(filenames, dataset_dir):
+    """Раскладывает вакансии из csv-файлов по годам публикации (за один проход, с потоковой записью).
+       Вакансии с пустыми полями отбрасываются - как при чтении в DataSet
+
+    Args:
+        filenames (list[str]): Файлы с вакансиями (с одинаковыми заголовками)
+        dataset_dir (str): Каталог для секционированных данных (существующие секции перезаписываются)
+
+    Returns:
+        dict: Метаданные секций {год: {'rows', 'salary', 'cities'}}
+    """
+    files, writers, meta = {}, {}, {}
+    try:
+        for filename in filenames:
+            with open_text(filename) as f:
+                reader = csv.reader(f)
+                head = next(reader, None)
+                if head is None:
+                    continue
+                i_from, i_to, i_cur = head.index('salary_from'), head.index('salary_to'), head.index('salary_currency')
+                i_area, i_date = head.index('area_name'), head.index('published_at')
+                for row in reader:
+                    if '' in row:
+                        continue
+                    year = int(row[i_date][0:4])
+                    if year not in writers:
+                        path = partition_path(dataset_dir, year)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        files[year] = open(path, 'w', encoding='utf-8-sig', newline='')
+                        writers[year] = csv.writer(files[year])
+                        writers[year].writerow(head)
+                        meta[year] = {'rows': 0, 'salary': {}, 'cities': set()}
+                    writers[year].writerow(row)
+                    year_meta = meta[year]
+                    year_meta['rows'] += 1
+                    year_meta['cities'].add(row[i_area])
+                    salary = (float(row[i_from]) + float(row[i_to])) / 2
+                    bounds = year_meta['salary'].get(row[i_cur])
+                    if bounds is None:
+                        year_meta['salary'][row[i_cur]] = [salary, salary]
+                    elif salary < bounds[0]:
+                        bounds[0] = salary
+                    elif salary > bounds[1]:
+                        bounds[1] = salary
+    finally:
+        for f in files.values():
+            f.close()
+    for year_meta in meta.values():
+        year_meta['cities'] = sorted(year_meta['cities'])
+    with open(os.path.join(dataset_dir, PARTITION_META), 'w', encoding='utf-8') as f:
+        json.dump({str(year): meta[year] for year in sorted(meta)}, f, ensure_ascii=False)
+    return meta
+
+
+def read_metadata(dataset_dir, years=None):
+    """Читает метаданные секций
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        years (tuple or None): Диапазон лет (первый, последний) включительно, None - все года
+
+    Returns:
+        dict: Метаданные {год (int): {'rows', 'salary', 'cities'}} в порядке возрастания лет
+    """
+    with open(os.path.join(dataset_dir, PARTITION_META), encoding='utf-8') as f:
+        meta = json.load(f)
+    return {int(year): value for year, value in meta.items() if in_years(int(year), years)}
+
+
+def select_partitions(dataset_dir, years=None):
+    """Отбирает файлы секций, попадающих в диапазон лет (остальные секции не открываются)
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        years (tuple or None): Диапазон лет (первый, последний) включительно, None - все года
+
+    Returns:
+        list[str]: Пути к файлам секций
+    """
+    return [partition_path(dataset_dir, year) for year in read_metadata(dataset_dir, years)]
+
+
+def vacancies_by_year(dataset_dir, years=None):
+    """Количество вакансий по годам - только по метаданным
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        years (tuple or None): Диапазон лет (первый, последний) включительно, None - все года
+
+    Returns:
+        dict: {год: количество вакансий}
+    """
+    return {year: value['rows'] for year, value in read_metadata(dataset_dir, years).items()}
+
+
+def cities_count(dataset_dir, years=None):
+    """Количество различных городов в диапазоне лет - только по метаданным
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        years (tuple or None): Диапазон лет (первый, последний) включительно, None - все года
+
+    Returns:
+        int: Количество городов
+    """
+    cities = set()
+    for value in read_metadata(dataset_dir, years).values():
+        cities.update(value['cities'])
+    return len(cities)
+
+
+def salary_range(dataset_dir, currency, years=None):
+    """Минимальная и максимальная зарплата (среднее от/до) в валюте currency - только по метаданным
+
+    Args:
+        dataset_dir (str): Секционированный каталог
+        currency (str): Код валюты
+        years (tuple or None): Диапазон лет (первый, последний) включительно, None - все года
+
+    Returns:
+        tuple or None: (минимум, максимум), None - если вакансий в этой валюте нет
+    """
+    bounds = [value['salary'][currency] for value in read_metadata(dataset_dir, years).values()
+              if currency in value['salary']]
+    if not bounds:
+        return None
+    return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+
+if __name__ == '__main__':
+    source = ' '.join(input('Введите название файла (или маску файлов): ').split())
+    target = ' '.join(input('Введите каталог для секционированных данных: ').split())
+    result = write_partitions(sorted(glob.glob(source)) if glob.has_magic(source) else [source], target)
+    for year, year_meta in result.items():
+        print(f'{year}: вакансий - {year_meta["rows"]}, городов - {len(year_meta["cities"])}')
@@ -0,0 +1,245 @@
+"""Запуск всей цепочки обработки (курсы валют -> сбор вакансий -> перевод зарплат -> база данных -> отчеты).
+
+Каждый этап - отдельный скрипт с объявленными входными и выходными файлами. Зависимости между этапами
+определяются по файлам: этап ждет этапы, которые производят его входные файлы. Ключ этапа - sha256
+от содержимого скрипта, входных файлов и ввода пользователя; этап пропускается, если ключ совпадает
+с записанным при прошлом запуске и выходные файлы не изменялись. Независимые этапы (загрузка курсов
+и сбор вакансий с hh.ru) выполняются параллельно в отдельных процессах.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from report_cache import file_digest
+
+# PIPELINE_STATE (str): Файл с ключами и хешами выходных файлов выполненных этапов
+PIPELINE_STATE = '_pipeline.json'
+# PIPELINE_LOGS (str): Каталог с выводом скриптов (по файлу на этап)
+PIPELINE_LOGS = '_pipeline_logs'
+# RATES_MODULES (list): Модули, которые импортирует скрипт загрузки курсов (03_03_01_full.py)
+RATES_MODULES = ['profiler.py', 'compressed.py', 'timecodes.py', 'cbr_rates.py']
+# ENGINE_MODULES (list): Модули, которые импортирует скрипт отчетов (их изменение меняет отчеты)
+ENGINE_MODULES = ['quantiles.py', 'dedup.py', 'partitions.py', 'timecodes.py', 'currency_rates.py',
+                  'heavy_hitters.py', 'report_cache.py', 'svg_charts.py', 'titles.py',
+                  'cities.py', 'compressed.py', 'histogram.py', 'columnar.py', 'spill.py', 'progress.py',
+                  'prof_matrix.py']
+
+
+class Stage:
+    """Класс для представления этапа обработки.
+
+    Attributes:
+        name (str): Название этапа
+        script (str): Имя скрипта
+        inputs (list[str]): Входные файлы (кроме самого скрипта)
+        outputs (list[str]): Выходные файлы
+        stdin (str or None): Ввод для скриптов, запрашивающих параметры через input()
+        args (list[str]): Аргументы командной строки скрипта
+    """
+    def __init__(self, name, script, inputs=(), outputs=(), stdin=None, args=()):
+        """Инициализирует экземпляр Stage
+
+        Args:
+            name (str): Название этапа
+            script (str): Имя скрипта
+            inputs (list[str]): Входные файлы
+            outputs (list[str]): Выходные файлы
+            stdin (str or None): Ввод для скрипта
+            args (list[str]): Аргументы командной строки скрипта
+
+        Returns:
+            Экземпляр класса Stage
+        """
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.stdin = stdin
+        self.args = list(args)
+
+    def key(self):
+        """Вычисляет ключ этапа по содержимому скрипта, входных файлов, вводу и аргументам
+
+        Returns:
+            str: Ключ (sha256, hex)
+        """
+        raw = json.dumps([self.script, file_digest(self.script), {f: file_digest(f) for f in self.inputs}, self.stdin,
+                          self.args])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def default_stages(vacancies='vacancies_dif_currencies.csv', req_prof='Программист'):
+    """Возвращает этапы цепочки обработки в порядке их ручного запуска.
+       Входные файлы этапа - все файлы, которые читает скрипт, включая импортируемые модули репозитория 
+       и необязательные файлы (отсутствующий файл тоже входит в ключ)
+
+    Args:
+        vacancies (str): Файл с вакансиями для загрузки курсов, перевода зарплат и отчетов
+        req_prof (str): Профессия для отчетов
+
+    Returns:
+        list[Stage]: Этапы
+    """
+    return [
+        Stage('rates', '03_03_01_full.py', [vacancies] + RATES_MODULES, ['data_currencies.csv', 'vacancies_profile.json'],
+              args=[vacancies]),
+        Stage('collect', '03_03_03.py', [], ['vacancies_api.csv']),
+        Stage('convert', '03_03_02.py', [vacancies, 'data_currencies.csv', 'compressed.py'], ['vacancies_result.csv'],
+              args=[vacancies]),
+        Stage('database', '03_05_01.py', ['data_currencies.csv'], ['python_vac.db']),
+        Stage('report', '02_03_01_doc(from_02_01_03).py', 
+              [vacancies, 'data_currencies.csv', 'pdf_template.html', 'cities_regions.csv', 'professions.txt'] + ENGINE_MODULES,
+              ['report.xlsx', 'graph.png', 'report.pdf', 'report.html'], f'{vacancies}\n{req_prof}\n'),
+    ]
+
+
+class Pipeline:
+    """Класс для представления цепочки этапов и ее состояния.
+
+    Attributes:
+        stages (list[Stage]): Этапы
+        needs (dict): Зависимости {название этапа: set названий этапов, производящих его входные файлы}
+        state (dict): Результаты прошлых запусков {название этапа: {'key': ключ, 'outputs': {файл: sha256}}}
+        log (list[tuple]): Журнал текущего запуска (название этапа, 'skipped' / 'done' / 'failed' / 'blocked')
+    """
+    def __init__(self, stages, state_file=PIPELINE_STATE):
+        """Инициализирует экземпляр Pipeline, читая состояние прошлых запусков (если оно есть)
+
+        Args:
+            stages (list[Stage]): Этапы
+            state_file (str): Файл состояния
+
+        Returns:
+            Экземпляр класса Pipeline
+        """
+        self.stages = stages
+        self.state_file = state_file
+        producers = {out: stage.name for stage in stages for out in stage.outputs}
+        self.needs = {stage.name: {producers[f] for f in stage.inputs if f in producers and producers[f] != stage.name}
+                      for stage in stages}
+        self.state = {}
+        if os.path.isfile(state_file):
+            with open(state_file, encoding='utf-8') as f:
+                self.state = json.load(f)
+        self.log = []
+
+    def is_fresh(self, stage):
+        """Проверяет, можно ли пропустить этап: ключ не изменился и выходные файлы те же, что после прошлого запуска
+
+        Args:
+            stage (Stage): Этап
+
+        Returns:
+            bool: True - этап можно пропустить
+        """
+        entry = self.state.get(stage.name)
+        if entry is None or entry['key'] != stage.key():
+            return False
+        return all(os.path.isfile(f) and entry['outputs'].get(f) == file_digest(f) for f in stage.outputs)
+
+    def check(self):
+        """Проверяет, что зависимости этапов выполнимы: названия этапов не повторяются, в needs только 
+           существующие этапы и нет циклов (иначе этапы ждали бы друг друга бесконечно)
+
+        Returns:
+            None. Если зависимости невыполнимы - ValueError
+        """
+        names = [stage.name for stage in self.stages]
+        repeated = sorted({name for name in names if names.count(name) > 1})
+        if repeated:
+            raise ValueError(f'Повторяются названия этапов: {repeated}')
+        unknown = sorted({need for name in names for need in self.needs.get(name, ())} - set(names))
+        if unknown:
+            raise ValueError(f'Неизвестные этапы в зависимостях: {unknown}')
+        visited, path = set(), []
+
+        def visit(name):
+            if name in path:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f'Циклическая зависимость этапов: {" -> ".join(cycle)}')
+            if name in visited:
+                return
+            path.append(name)
+            for need in sorted(self.needs.get(name, ())):
+                visit(need)
+            path.pop()
+            visited.add(name)
+
+        for name in names:
+            visit(name)
+
+    @staticmethod
+    def _execute(stage):
+        """Внутренний метод класса. Выполняет скрипт этапа в отдельном процессе, вывод пишется в PIPELINE_LOGS
+
+        Args:
+            stage (Stage): Этап
+
+        Returns:
+            int: Код завершения скрипта
+        """
+        os.makedirs(PIPELINE_LOGS, exist_ok=True)
+        with open(os.path.join(PIPELINE_LOGS, stage.name + '.log'), 'w', encoding='utf-8') as log:
+            return subprocess.run([sys.executable, stage.script] + stage.args, input=stage.stdin, text=True,
+                                  stdout=log, stderr=subprocess.STDOUT).returncode
+
+    def run(self, force=(), workers=None):
+        """Выполняет этапы: как только все этапы, от которых зависит этап, закончены - он запускается
+           (или пропускается, если актуален). Этапы, зависящие от неудачного (прямо или через другие этапы), 
+           не запускаются. Зависимости проверяются до запуска (check)
+
+        Args:
+            force (tuple): Названия этапов, выполняемых независимо от ключа (например 'collect' для нового сбора)
+            workers (int or None): Количество одновременно выполняемых этапов
+
+        Returns:
+            bool: True - все этапы выполнены или пропущены. Если зависимости невыполнимы - ValueError
+        """
+        self.check()
+        by_name = {stage.name: stage for stage in self.stages}
+        finished, failed, running = set(), set(), {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while len(finished) + len(failed) < len(self.stages):
+                for stage in self.stages:
+                    if stage.name in finished or stage.name in failed or stage.name in running.values():
+                        continue
+                    if self.needs[stage.name] & failed:
+                        failed.add(stage.name)
+                        self.log.append((stage.name, 'blocked'))
+                    elif self.needs[stage.name] <= finished:
+                        if stage.name not in force and self.is_fresh(stage):
+                            finished.add(stage.name)
+                            self.log.append((stage.name, 'skipped'))
+                        else:
+                            running[executor.submit(Pipeline._execute, stage)] = stage.name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = by_name[running.pop(future)]
+                    if future.result() == 0:
+                        finished.add(stage.name)
+                        self.state[stage.name] = {'key': stage.key(),
+                                                  'outputs': {f: file_digest(f) for f in stage.outputs}}
+                        self._save()
+                        self.log.append((stage.name, 'done'))
+                    else:
+                        failed.add(stage.name)
+                        self.log.append((stage.name, 'failed'))
+        return not failed
+
+    def _save(self):
+        """Внутренний метод класса. Сохраняет состояние в файл"""
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == '__main__':
+    my_pipeline = Pipeline(default_stages(' '.join(input('Введите название файла: ').split()),
+                                          ' '.join(input('Введите название профессии: ').split())))
+    my_force = input('Введите этапы для обязательного запуска (через пробел): ').split()
+    my_pipeline.run(force=my_force)
+    for name, status in my_pipeline.log:
+        print(f'{name}: {status}')
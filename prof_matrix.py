@@ -0,0 +1,206 @@
+"""Разреженная матрица профессия x город: суммы и количества зарплат, заполняемые за один проход.
+
+Для каждой вакансии нормализованное название (titles.py) проверяется сразу на все профессии автоматом
+Ахо-Корасик - профессия подходит, если ее нормализованное название входит в нормализованное название
+вакансии (как prof_key в VacancyAggregate). Результат сопоставления запоминается по исходному названию:
+одинаковых названий в выгрузках очень много. Матрица хранится в формате COO - списки номеров строк
+(профессий), столбцов (городов), сумм и количеств только для непустых ячеек, поэтому память растет
+с количеством непустых ячеек, а не с произведением количества профессий и городов. Для вывода ячейки
+упорядочиваются по строкам (to_csr).
+"""
+import functools
+from collections import deque
+from titles import normalize_title
+from cities import CityDictionary
+
+
+class TitleMatcher:
+    """Класс для представления сопоставления названий вакансий сразу со многими профессиями.
+
+    Attributes:
+        professions (list[str]): Названия профессий
+        keys (list[str]): Нормализованные названия профессий
+    """
+    def __init__(self, professions, maxsize=65536):
+        """Инициализирует экземпляр TitleMatcher - строит автомат Ахо-Корасик по нормализованным названиям
+
+        Args:
+            professions (list[str]): Названия профессий
+            maxsize (int): Количество запоминаемых результатов сопоставления (по исходным названиям)
+
+        Returns:
+            Экземпляр класса TitleMatcher
+        """
+        self.professions = list(professions)
+        self.keys = [normalize_title(p) for p in self.professions]
+        self._goto, self._fail, self._out = [{}], [0], [set()]
+        for i, key in enumerate(self.keys):
+            state = 0
+            for char in key:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = self._goto[state][char]
+            self._out[state].add(i)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+        self.match = functools.lru_cache(maxsize=maxsize)(self._match)
+
+    def _match(self, title):
+        """Внутренний метод класса. Сопоставляет название со всеми профессиями (один проход по названию)
+
+        Args:
+            title (str): Исходное название вакансии
+
+        Returns:
+            tuple[int]: Номера подходящих профессий по возрастанию
+
+        >>> matcher = TitleMatcher(['Python', 'Программист', 'Аналитик данных', 'Java'])
+        >>> matcher.match('Senior Python-программист'), matcher.match('Аналитик'), matcher.match('JavaScript')
+        ((0, 1), (), (3,))
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(out[0])
+        state = 0
+        for char in normalize_title(title):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= out[state]
+        return tuple(sorted(found))
+
+
+class ProfCityMatrix:
+    """Класс для представления разреженной матрицы профессия x город (формат COO).
+
+    Attributes:
+        professions (list[str]): Названия профессий (строки матрицы)
+        cities (cities.CityDictionary): Номера городов (столбцы матрицы, в порядке первого появления)
+        cells (dict): Номера ячеек в списках {(номер профессии, номер города): номер ячейки}
+        rows, cols (list[int]): Номера профессий и городов непустых ячеек
+        sums (list[float]): Суммы зарплат (от + до, в рублях) ячеек
+        counts (list[int]): Количества вакансий ячеек
+    """
+    def __init__(self, professions):
+        """Инициализирует пустой экземпляр ProfCityMatrix
+
+        Args:
+            professions (list[str]): Названия профессий
+
+        Returns:
+            Экземпляр класса ProfCityMatrix
+        """
+        self.professions = list(professions)
+        self.cities = CityDictionary()
+        self.cells = {}
+        self.rows, self.cols, self.sums, self.counts = [], [], [], []
+
+    def __len__(self):
+        """Количество непустых ячеек"""
+        return len(self.counts)
+
+    def add(self, prof, city_name, salary, count=1):
+        """Учитывает зарплату в ячейке
+
+        Args:
+            prof (int): Номер профессии
+            city_name (str): Название города
+            salary (float): Сумма зарплат (от + до, в рублях)
+            count (int): Количество вакансий
+        """
+        key = (prof, self.cities.id(city_name))
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = len(self.counts)
+            self.rows.append(key[0])
+            self.cols.append(key[1])
+            self.sums.append(salary)
+            self.counts.append(count)
+        else:
+            self.sums[cell] += salary
+            self.counts[cell] += count
+
+    def merge(self, other):
+        """Добавляет ячейки другой матрицы (с теми же профессиями)
+
+        Args:
+            other (ProfCityMatrix): Матрица другой части данных
+
+        Returns:
+            ProfCityMatrix: Текущая матрица (self)
+        """
+        if other.professions != self.professions:
+            raise ValueError('Нельзя слить матрицы с разными профессиями')
+        for row, col, salary, count in zip(other.rows, other.cols, other.sums, other.counts):
+            self.add(row, other.cities.names[col], salary, count)
+        return self
+
+    def to_csr(self):
+        """Ячейки, упорядоченные по строкам (формат CSR)
+
+        Returns:
+            tuple: (indptr - list[int] начала строк, indices - list[int] номера городов,
+                    salaries - list[int] средние зарплаты, counts - list[int] количества вакансий)
+
+        >>> matrix = ProfCityMatrix(['Python', 'Java'])
+        >>> for prof, city, salary in [(1, 'Москва', 200), (0, 'Казань', 100), (1, 'Москва', 400)]:
+        ...     matrix.add(prof, city, salary)
+        >>> matrix.to_csr(), len(matrix)
+        (([0, 1, 2], [1, 0], [50, 150], [1, 2]), 2)
+        """
+        order = sorted(range(len(self.counts)), key=lambda i: (self.rows[i], self.cols[i]))
+        indptr = [0] * (len(self.professions) + 1)
+        for i in order:
+            indptr[self.rows[i] + 1] += 1
+        for row in range(len(self.professions)):
+            indptr[row + 1] += indptr[row]
+        return (indptr, [self.cols[i] for i in order], [int(self.sums[i] / (self.counts[i] * 2)) for i in order],
+                [self.counts[i] for i in order])
+
+    def top_cities(self, count):
+        """Города с наибольшим количеством вакансий по всем профессиям
+
+        Args:
+            count (int): Количество городов
+
+        Returns:
+            list[int]: Номера городов в порядке убывания количества вакансий
+        """
+        totals = [0] * len(self.cities)
+        for col, vacancies in zip(self.cols, self.counts):
+            totals[col] += vacancies
+        return sorted(range(len(totals)), key=lambda col: -totals[col])[:count]
+
+    def table(self, cities):
+        """Средние зарплаты и количества вакансий для выбранных городов (пустые ячейки - None)
+
+        Args:
+            cities (list[int]): Номера городов (столбцы таблицы)
+
+        Returns:
+            tuple: (list[list] средних зарплат, list[list] количеств вакансий) - строки по профессиям
+        """
+        position = {col: j for j, col in enumerate(cities)}
+        salaries = [[None] * len(cities) for _ in self.professions]
+        counts = [[None] * len(cities) for _ in self.professions]
+        for row, col, salary, count in zip(self.rows, self.cols, self.sums, self.counts):
+            j = position.get(col)
+            if j is not None:
+                salaries[row][j] = int(salary / (count * 2))
+                counts[row][j] = count
+        return salaries, counts
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,103 @@
+"""Профиль csv-файла с вакансиями за один потоковый проход.
+
+За одно чтение файла (без загрузки в DataFrame и без сортировок) считаются: частоты валют оклада,
+первая и последняя даты публикации, доля пустых значений по каждому столбцу и количество
+различных городов. Профиль используется при загрузке курсов валют (03_03_01_full.py - какие
+валюты и за какой период запрашивать) и может сохраняться в json для следующих этапов обработки.
+"""
+import csv
+import json
+from compressed import open_text
+
+
+class DatasetProfile:
+    """Класс для представления профиля файла с вакансиями.
+
+    Attributes:
+        filename (str): Имя профилируемого файла
+        rows_count (int): Количество вакансий (строк без заголовка)
+        currencies (dict): Частоты валют оклада {код валюты: количество} в порядке первого появления
+        first_date (str or None): Самая ранняя дата публикации (published_at)
+        last_date (str or None): Самая поздняя дата публикации (published_at)
+        null_rates (dict): Доля пустых значений по столбцам {столбец: доля}
+        cities_count (int): Количество различных городов (area_name)
+    """
+    def __init__(self, filename):
+        """Инициализирует экземпляр DatasetProfile, прочитав файл filename один раз
+
+        Args:
+            filename (str): Имя csv-файла с вакансиями (может быть сжатым, см. compressed.py)
+
+        Returns:
+            Экземпляр класса DatasetProfile
+        """
+        self.filename = filename
+        self.rows_count = 0
+        self.currencies = {}
+        self.first_date = None
+        self.last_date = None
+        cities = set()
+        with open_text(filename) as f:
+            reader = csv.reader(f)
+            head = next(reader, [])
+            nulls = [0] * len(head)
+            i_cur = head.index('salary_currency') if 'salary_currency' in head else None
+            i_date = head.index('published_at') if 'published_at' in head else None
+            i_area = head.index('area_name') if 'area_name' in head else None
+            currencies = self.currencies
+            for row in reader:
+                self.rows_count += 1
+                if '' in row:
+                    for i, value in enumerate(row):
+                        if value == '':
+                            nulls[i] += 1
+                if i_cur is not None and row[i_cur] != '':
+                    currency = row[i_cur]
+                    currencies[currency] = currencies.get(currency, 0) + 1
+                if i_date is not None and row[i_date] != '':
+                    date = row[i_date]
+                    if self.first_date is None or date < self.first_date:
+                        self.first_date = date
+                    if self.last_date is None or date > self.last_date:
+                        self.last_date = date
+                if i_area is not None:
+                    cities.add(row[i_area])
+        cities.discard('')
+        self.cities_count = len(cities)
+        self.null_rates = {column: round(nulls[i] / self.rows_count, 4) if self.rows_count else 0.0
+                           for i, column in enumerate(head)}
+
+    def frequent_currencies(self, min_count, exclude=('RUR',)):
+        """Возвращает валюты, встречающиеся чаще min_count раз
+
+        Args:
+            min_count (int): Порог частоты
+            exclude (tuple): Исключаемые валюты (по умолчанию - рубли, для них курс не нужен)
+
+        Returns:
+            list[str]: Коды валют в порядке первого появления
+        """
+        return [c for c, n in self.currencies.items() if n > min_count and c not in exclude]
+
+    def to_dict(self):
+        """Представляет профиль в виде словаря (для печати и сохранения)
+
+        Returns:
+            dict: Профиль
+        """
+        return dict(vars(self))
+
+    def save(self, filename):
+        """Сохраняет профиль в json-файл
+
+        Args:
+            filename (str): Имя json-файла
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+
+if __name__ == '__main__':
+    profile = DatasetProfile(' '.join(input('Введите название файла: ').split()))
+    for name, value in profile.to_dict().items():
+        print(f'{name}: {value}')
@@ -0,0 +1,189 @@
+"""Ход длительной обработки (чтение, расчет статистики, отчеты) и ее прерывание по Ctrl+C.
+
+Обработчик вызывает update не для каждой строки, а раз в Progress.every строк - в горячем цикле остается
+только проверка счетчика; строка хода (количество, доля, строк в секунду, оставшееся время) печатается
+не чаще раза в interval секунд. Внутри with Progress() (или после catch_sigint) первое нажатие Ctrl+C
+(SIGINT) не прерывает код в случайном месте, а только отмечает отмену: ближайший update выбрасывает
+Cancelled - между двумя вакансиями (частичная статистика цела) или между двумя отчетами (каждый файл
+отчета записан полностью или не начат). Повторное Ctrl+C прерывает обработку сразу (KeyboardInterrupt).
+"""
+import signal
+import sys
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """Исключение - обработка прервана пользователем.
+
+    Attributes:
+        partial (object or None): Статистика, накопленная до прерывания (например VacancyAggregate), None - нет
+    """
+    def __init__(self, partial=None):
+        """Инициализирует экземпляр Cancelled
+
+        Args:
+            partial (object or None): Накопленная статистика
+
+        Returns:
+            Экземпляр класса Cancelled
+        """
+        super().__init__('Обработка прервана')
+        self.partial = partial
+
+
+class Progress:
+    """Класс для представления хода обработки (этапы сменяют друг друга: start - update - finish).
+
+    Attributes:
+        interval (float): Минимальный интервал между строками хода, сек.
+        out (file or None): Поток вывода (None - sys.stderr)
+        label (str or None): Название текущего этапа
+        total (int or None): Объем этапа (None - неизвестен)
+        unit (str): Единица объема ('строк', 'файлов', 'отчетов')
+        done (int): Обработано в текущем этапе
+        cancelled (bool): True - запрошена отмена обработки
+    """
+    # every (int): Количество строк между вызовами update в циклах по строкам (степень двойки)
+    every = 1 << 14
+
+    def __init__(self, interval=1.0, out=None):
+        """Инициализирует экземпляр Progress
+
+        Args:
+            interval (float): Минимальный интервал между строками хода, сек.
+            out (file or None): Поток вывода (None - sys.stderr)
+
+        Returns:
+            Экземпляр класса Progress
+        """
+        self.interval = interval
+        self.out = out
+        self.label, self.total, self.unit = None, None, 'строк'
+        self.done = 0
+        self.cancelled = False
+        self._fraction = None
+        self._started = self._next = time.monotonic()
+        self._handler = None
+
+    def start(self, label, total=None, unit='строк'):
+        """Начинает этап
+
+        Args:
+            label (str): Название этапа
+            total (int or None): Объем этапа
+            unit (str): Единица объема
+        """
+        self.label, self.total, self.unit = label, total, unit
+        self.done = 0
+        self._fraction = None
+        self._started = time.monotonic()
+        self._next = self._started + self.interval
+        self.check()
+
+    def update(self, done, fraction=None):
+        """Отмечает ход этапа и печатает строку хода (не чаще раза в interval секунд)
+
+        Args:
+            done (int): Обработано с начала этапа
+            fraction (float or None): Доля выполнения, если объем известен не в единицах unit
+                (например, по прочитанным байтам файла), None - done / total
+
+        Returns:
+            None. Если запрошена отмена - Cancelled
+
+        >>> import io
+        >>> progress = Progress(interval=0, out=io.StringIO())
+        >>> progress.start('Расчет', total=4)
+        >>> progress.update(2)
+        >>> progress.out.getvalue().split(' (')[0]
+        'Расчет: 2 строк'
+        >>> progress.cancel()
+        >>> progress.update(3)  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ...
+        Cancelled: Обработка прервана
+        """
+        self.done = done
+        self._fraction = fraction
+        self.check()
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            self._print(now)
+
+    def finish(self):
+        """Заканчивает этап (печатает итоговую строку)"""
+        self._fraction = None if self.total is None else 1.0
+        self._print(time.monotonic())
+
+    def check(self):
+        """Проверяет, запрошена ли отмена
+
+        Returns:
+            None. Если запрошена отмена - Cancelled
+        """
+        if self.cancelled:
+            raise Cancelled()
+
+    def cancel(self):
+        """Запрашивает отмену обработки (выполняется при первом Ctrl+C)"""
+        self.cancelled = True
+
+    def line(self, now=None):
+        """Строка хода этапа
+
+        Args:
+            now (float or None): Текущее время (time.monotonic), None - сейчас
+
+        Returns:
+            str: Название, обработано, доля, скорость и оставшееся время (если объем известен)
+        """
+        seconds = (time.monotonic() if now is None else now) - self._started
+        fraction = self._fraction if self._fraction is not None else \
+            self.done / self.total if self.total else None
+        rate = self.done / seconds if seconds > 0 else 0.0
+        text = f'{self.label}: {self.done} {self.unit}'
+        if fraction is not None:
+            text += f' ({fraction:.0%})'
+        text += f', {rate:.0f} {self.unit}/с, прошло {seconds:.1f} с'
+        if fraction and fraction < 1:
+            text += f', осталось {seconds * (1 - fraction) / fraction:.0f} с'
+        return text
+
+    def _print(self, now):
+        """Внутренний метод класса. Печатает строку хода
+
+        Args:
+            now (float): Текущее время (time.monotonic)
+        """
+        print(self.line(now), file=self.out if self.out is not None else sys.stderr, flush=True)
+
+    def _on_sigint(self, signum, frame):
+        """Внутренний метод класса. Обработчик первого Ctrl+C: запрашивает отмену,
+           следующее Ctrl+C - обычный KeyboardInterrupt"""
+        self.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def catch_sigint(self):
+        """Перехватывает Ctrl+C (только в главном потоке): первое нажатие запрашивает отмену"""
+        if threading.current_thread() is threading.main_thread():
+            self._handler = signal.signal(signal.SIGINT, self._on_sigint)
+
+    def release_sigint(self):
+        """Восстанавливает прежний обработчик Ctrl+C"""
+        if self._handler is not None:
+            signal.signal(signal.SIGINT, self._handler)
+            self._handler = None
+
+    def __enter__(self):
+        self.catch_sigint()
+        return self
+
+    def __exit__(self, *exc):
+        self.release_sigint()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
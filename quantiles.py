@@ -0,0 +1,141 @@
+"""Потоковые квантильные скетчи (KLL) для медиан и перцентилей зарплат.
+
+Скетч хранит ограниченное число элементов (порядка 3*k) независимо от объема данных,
+поэтому медиану и перцентили можно считать по годам и городам без хранения всех зарплат.
+Скетчи сливаются методом merge, что позволяет считать их по частям (по файлам, по процессам).
+"""
+import math
+import random
+
+
+class KLLSketch:
+    """Класс для представления KLL-скетча (Karnin, Lang, Liberty) - приближенного квантильного скетча.
+
+    Attributes:
+        k (int): Емкость верхнего уровня скетча (точность: ошибка ранга порядка 1/k)
+        c (float): Коэффициент уменьшения емкости нижних уровней
+        count (int): Количество добавленных в скетч значений
+        compactors (list[list]): Уровни скетча. Элемент уровня h имеет вес 2**h
+    """
+    def __init__(self, k=200, c=2 / 3, seed=0):
+        """Инициализирует пустой экземпляр KLLSketch.
+
+        Args:
+            k (int): Емкость верхнего уровня скетча
+            c (float): Коэффициент уменьшения емкости нижних уровней
+            seed (int): Начальное значение генератора случайных чисел (для воспроизводимости отчетов)
+
+        Returns:
+            Экземпляр класса KLLSketch
+        """
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.compactors = []
+        self._size = 0
+        self._max_size = 0
+        self._rnd = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, height):
+        """Внутренний метод класса. Возвращает емкость уровня height
+
+        Args:
+            height (int): Номер уровня скетча
+
+        Returns:
+            int: Максимальное число элементов на уровне
+        """
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        """Внутренний метод класса. Добавляет в скетч новый (верхний) уровень
+        """
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        """Внутренний метод класса. Сжимает переполненные уровни: половина элементов уровня
+           (через один после сортировки) переходит на следующий уровень с удвоенным весом
+        """
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 >= len(self.compactors):
+                self._grow()
+            level.sort()
+            keep = [level.pop()] if len(level) % 2 else []
+            self.compactors[h + 1].extend(level[self._rnd.randint(0, 1)::2])
+            self.compactors[h] = keep
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def update(self, value):
+        """Добавляет в скетч одно значение
+
+        Args:
+            value (int or float): Добавляемое значение
+        """
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other):
+        """Сливает в текущий скетч данные другого скетча (other не изменяется)
+
+        Args:
+            other (KLLSketch): Скетч, построенный по другой части данных
+
+        Returns:
+            KLLSketch: Текущий скетч (self)
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.count += other.count
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Вычисляет приближенные квантили
+
+        Args:
+            qs (list[float]): Уровни квантилей в диапазоне [0, 1]
+
+        Returns:
+            list: Значения квантилей в порядке qs (None для пустого скетча)
+
+        >>> sketch = KLLSketch(k=50)
+        >>> for v in range(1, 10001): sketch.update(v)
+        >>> [abs(v - e) < 500 for v, e in zip(sketch.quantiles([0.1, 0.5, 0.9]), [1000, 5000, 9000])]
+        [True, True, True]
+        """
+        items = sorted((v, 1 << h) for h, level in enumerate(self.compactors) for v in level)
+        if not items:
+            return [None for _ in qs]
+        total = sum(w for _, w in items)
+        result = []
+        for q in qs:
+            target = q * total
+            cum = 0
+            value = items[-1][0]
+            for v, w in items:
+                cum += w
+                if cum >= target:
+                    value = v
+                    break
+            result.append(value)
+        return result
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
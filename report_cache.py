@@ -0,0 +1,126 @@
+"""Запоминание отчетов по содержимому статистики (манифест с хешами).
+
+Ключ отчета - sha256 от имени файла отчета, статистики, по которой он строится, и настроек вывода.
+Если ключ совпадает с записанным в манифесте и файл отчета не изменялся - отчет не перестраивается.
+Если отчет с таким ключом уже строился раньше - он копируется из каталога кеша.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+
+def file_digest(filename):
+    """Вычисляет sha256 содержимого файла
+
+    Args:
+        filename (str): Имя файла
+
+    Returns:
+        str or None: Хеш (hex), None - если файла нет
+    """
+    if not os.path.isfile(filename):
+        return None
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Класс для представления манифеста и каталога кеша отчетов.
+
+    Attributes:
+        cache_dir (str): Каталог кеша (в нем же файл манифеста)
+        manifest (dict): {имя отчета: {'key': ключ статистики и настроек, 'digest': sha256 файла отчета}}
+        log (list[tuple]): Журнал текущего запуска (имя отчета, 'skipped' / 'restored' / 'built')
+    """
+    def __init__(self, cache_dir='report_cache'):
+        """Инициализирует экземпляр ReportCache, читая манифест (если он есть)
+
+        Args:
+            cache_dir (str): Каталог кеша
+
+        Returns:
+            Экземпляр класса ReportCache
+        """
+        self.cache_dir = cache_dir
+        self.log = []
+        self._manifest_file = os.path.join(cache_dir, 'manifest.json')
+        self.manifest = {}
+        if os.path.isfile(self._manifest_file):
+            with open(self._manifest_file, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    @staticmethod
+    def key(artifact, *parts):
+        """Вычисляет ключ отчета
+
+        Args:
+            artifact (str): Имя файла отчета
+            parts: Статистика и настройки вывода (словари, списки, строки, числа)
+
+        Returns:
+            str: Ключ (sha256, hex)
+        """
+        raw = json.dumps([artifact, *parts], ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _cached_file(self, artifact, key):
+        """Внутренний метод класса. Путь к копии отчета в каталоге кеша
+
+        Args:
+            artifact (str): Имя файла отчета
+            key (str): Ключ отчета
+
+        Returns:
+            str: Путь
+        """
+        return os.path.join(self.cache_dir, key + os.path.splitext(artifact)[1])
+
+    def fetch(self, artifact, key):
+        """Проверяет, можно ли не строить отчет: файл отчета актуален или есть в кеше (тогда он копируется)
+
+        Args:
+            artifact (str): Имя файла отчета
+            key (str): Ключ отчета
+
+        Returns:
+            bool: True - отчет на месте, строить не нужно
+        """
+        entry = self.manifest.get(artifact)
+        if entry is not None and entry['key'] == key and entry['digest'] == file_digest(artifact):
+            self.log.append((artifact, 'skipped'))
+            return True
+        cached = self._cached_file(artifact, key)
+        if os.path.isfile(cached):
+            shutil.copyfile(cached, artifact)
+            self._remember(artifact, key)
+            self.log.append((artifact, 'restored'))
+            return True
+        return False
+
+    def store(self, artifact, key):
+        """Сохраняет построенный отчет в кеш и записывает его в манифест
+
+        Args:
+            artifact (str): Имя файла отчета
+            key (str): Ключ отчета
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        shutil.copyfile(artifact, self._cached_file(artifact, key))
+        self._remember(artifact, key)
+        self.log.append((artifact, 'built'))
+
+    def _remember(self, artifact, key):
+        """Внутренний метод класса. Записывает отчет в манифест и сохраняет манифест
+
+        Args:
+            artifact (str): Имя файла отчета
+            key (str): Ключ отчета
+        """
+        self.manifest[artifact] = {'key': key, 'digest': file_digest(artifact)}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,178 @@
+"""Группировка с ограничением памяти для группировок с очень большим числом ключей.
+
+Суммы и количества по группам (название вакансии x город, работодатель - миллионы ключей) накапливаются
+в словаре, пока оценка занимаемой им памяти не превысит бюджет. Тогда словарь сбрасывается на диск:
+группы делятся по хешу ключа на partitions частей, каждая часть дописывается блоком pickle в свой файл,
+и накопление продолжается с пустого словаря. В конце части сливаются по одной - в памяти одновременно
+только группы одной части (примерно 1/partitions всех групп). Если сбросов не было, результат берется
+прямо из словаря - это и есть обычный расчет в памяти; со сбросами группы и количества те же
+(суммы частей складываются в другом порядке - возможны расхождения в последних знаках float).
+Хеш ключа (hash) одинаков только внутри одного процесса - сброшенные части читает тот же экземпляр.
+"""
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+
+class SpillingAggregate:
+    """Класс для представления группировки сумм и количеств со сбросом на диск.
+
+    Attributes:
+        memory_budget (int): Бюджет памяти словаря групп, байт (оценка)
+        partitions (int): Количество частей при сбросе на диск
+        groups (dict): Накапливаемые в памяти группы {ключ: [сумма, количество]}
+        memory (int): Оценка памяти, занимаемой groups, байт
+        spills (int): Количество сбросов на диск
+    """
+    # entry_overhead (int): Оценка памяти одной группы без ключа (ячейка словаря, список, сумма, количество), байт
+    entry_overhead = 200
+
+    def __init__(self, memory_budget=256 << 20, partitions=16, directory=None):
+        """Инициализирует пустой экземпляр SpillingAggregate
+
+        Args:
+            memory_budget (int): Бюджет памяти словаря групп, байт
+            partitions (int): Количество частей при сбросе на диск
+            directory (str or None): Каталог для временных файлов (None - системный)
+
+        Returns:
+            Экземпляр класса SpillingAggregate
+        """
+        self.memory_budget = memory_budget
+        self.partitions = partitions
+        self.groups = {}
+        self.memory = 0
+        self.spills = 0
+        self._parent = directory
+        self._directory = None
+
+    @staticmethod
+    def key_size(key):
+        """Оценивает память, занимаемую ключом группы
+
+        Args:
+            key (tuple or str): Ключ
+
+        Returns:
+            int: Байт
+        """
+        if isinstance(key, tuple):
+            return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key)
+        return sys.getsizeof(key)
+
+    def add(self, key, value, count=1):
+        """Прибавляет значение к группе (при превышении бюджета памяти группы сбрасываются на диск)
+
+        Args:
+            key (tuple or str): Ключ группы
+            value (float): Значение (например, сумма зарплат)
+            count (int): Количество (вакансий)
+        """
+        entry = self.groups.get(key)
+        if entry is not None:
+            entry[0] += value
+            entry[1] += count
+            return
+        self.groups[key] = [value, count]
+        self.memory += SpillingAggregate.key_size(key) + SpillingAggregate.entry_overhead
+        if self.memory > self.memory_budget:
+            self.spill()
+
+    def _path(self, part):
+        """Внутренний метод класса. Имя файла части
+
+        Args:
+            part (int): Номер части
+
+        Returns:
+            str: Путь к файлу
+        """
+        return os.path.join(self._directory, f'part-{part:04d}.pickle')
+
+    def spill(self):
+        """Сбрасывает накопленные группы на диск (по частям хеша ключа) и очищает словарь"""
+        if not self.groups:
+            return
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='spill_', dir=self._parent)
+        buckets = [[] for _ in range(self.partitions)]
+        for key, (value, count) in self.groups.items():
+            buckets[hash(key) % self.partitions].append((key, value, count))
+        for part, bucket in enumerate(buckets):
+            if bucket:
+                with open(self._path(part), 'ab') as f:
+                    pickle.dump(bucket, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.groups = {}
+        self.memory = 0
+        self.spills += 1
+
+    def _read_part(self, part):
+        """Внутренний метод класса. Сливает все сброшенные блоки части в словарь
+
+        Args:
+            part (int): Номер части
+
+        Returns:
+            dict: Группы части {ключ: [сумма, количество]}
+        """
+        groups = {}
+        path = self._path(part)
+        if not os.path.isfile(path):
+            return groups
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    bucket = pickle.load(f)
+                except EOFError:
+                    break
+                for key, value, count in bucket:
+                    entry = groups.get(key)
+                    if entry is None:
+                        groups[key] = [value, count]
+                    else:
+                        entry[0] += value
+                        entry[1] += count
+        return groups
+
+    def items(self):
+        """Итоговые группы. Если были сбросы, остаток словаря тоже сбрасывается, и части сливаются по одной
+
+        Returns:
+            generator: (ключ, сумма, количество) - группы одной части подряд
+
+        >>> keys = [('Программист', 'Москва'), ('Аналитик', 'Казань'), ('Программист', 'Пермь')] * 100
+        >>> in_memory, spilled = SpillingAggregate(), SpillingAggregate(memory_budget=1000, partitions=4)
+        >>> for i, key in enumerate(keys):
+        ...     in_memory.add(key, i)
+        ...     spilled.add(key, i)
+        >>> spilled.spills > 0, sorted(spilled.items()) == sorted(in_memory.items())
+        (True, True)
+        >>> spilled.close()
+        """
+        if not self.spills:
+            for key, (value, count) in self.groups.items():
+                yield key, value, count
+            return
+        self.spill()
+        for part in range(self.partitions):
+            for key, (value, count) in self._read_part(part).items():
+                yield key, value, count
+
+    def close(self):
+        """Удаляет временные файлы"""
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,195 @@
+"""Простые диаграммы в виде встроенного SVG (для html-отчета без matplotlib и внешних программ).
+
+Каждая функция возвращает строку <svg>...</svg>, которую можно вставить прямо в html-документ.
+Набор диаграмм повторяет graph.png: сгруппированные столбцы, линии, горизонтальные столбцы, круговая.
+"""
+import math
+from html import escape
+
+# COLORS (list): Цвета рядов и секторов (как tab-палитра matplotlib)
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22',
+          '#17becf', '#aec7e8']
+WIDTH, HEIGHT = 560, 340
+
+
+def _nice_max(value):
+    """Округляет максимум оси вверх до 'красивого' числа (1, 2, 2.5, 5 * 10^n)
+
+    Args:
+        value (float): Максимальное значение данных
+
+    Returns:
+        float: Максимум оси
+    """
+    if value <= 0:
+        return 1
+    power = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 2.5, 5, 10):
+        if value <= step * power:
+            return step * power
+    return 10 * power
+
+
+def _frame(title, body, legend=()):
+    """Оборачивает содержимое диаграммы в svg с заголовком и легендой
+
+    Args:
+        title (str): Заголовок
+        body (list[str]): Элементы svg
+        legend (list[tuple]): Пары (подпись, цвет)
+
+    Returns:
+        str: Документ svg
+    """
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" font-family="sans-serif" '
+             f'font-size="10"><text x="{WIDTH / 2}" y="16" text-anchor="middle" font-size="13">{escape(title)}</text>']
+    parts.extend(body)
+    for i, (label, color) in enumerate(legend):
+        parts.append(f'<rect x="70" y="{28 + i * 14}" width="10" height="10" fill="{color}"/>'
+                     f'<text x="84" y="{37 + i * 14}">{escape(str(label))}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _value_axis(top, left, right, y0, y1):
+    """Горизонтальные линии сетки и подписи вертикальной оси
+
+    Args:
+        top (float): Максимум оси
+        left, right (float): Границы области построения по x
+        y0, y1 (float): Координаты y нуля и максимума
+
+    Returns:
+        list[str]: Элементы svg
+    """
+    body = []
+    for i in range(6):
+        y = y0 - (y0 - y1) * i / 5
+        body.append(f'<line x1="{left}" y1="{y:.1f}" x2="{right}" y2="{y:.1f}" stroke="#ddd"/>'
+                    f'<text x="{left - 4}" y="{y + 3:.1f}" text-anchor="end">{top * i / 5:g}</text>')
+    return body
+
+
+def _category_labels(labels, x_of, y):
+    """Подписи оси категорий (повернутые, не более 24 подписей)
+
+    Args:
+        labels (list): Подписи категорий
+        x_of (function): Функция номер категории -> координата x центра
+        y (float): Координата y оси
+
+    Returns:
+        list[str]: Элементы svg
+    """
+    step = max(1, len(labels) // 24)
+    return [f'<text transform="translate({x_of(i):.1f},{y + 6}) rotate(-90)" text-anchor="end">{escape(str(label))}</text>'
+            for i, label in enumerate(labels) if i % step == 0]
+
+
+def bar_chart(title, labels, series):
+    """Сгруппированная столбчатая диаграмма
+
+    Args:
+        title (str): Заголовок
+        labels (list): Подписи категорий (годы)
+        series (list[tuple]): Ряды (подпись, list значений по категориям)
+
+    Returns:
+        str: Документ svg
+    """
+    left, right, y0, y1 = 60, WIDTH - 10, HEIGHT - 60, 30
+    top = _nice_max(max([max(values, default=0) for _, values in series], default=0))
+    slot = (right - left) / max(len(labels), 1)
+    width = slot * 0.8 / max(len(series), 1)
+    body = _value_axis(top, left, right, y0, y1)
+    for j, (_, values) in enumerate(series):
+        for i, value in enumerate(values):
+            h = (y0 - y1) * value / top
+            body.append(f'<rect x="{left + slot * i + slot * 0.1 + width * j:.1f}" y="{y0 - h:.1f}" '
+                        f'width="{width:.1f}" height="{h:.1f}" fill="{COLORS[j % len(COLORS)]}"/>')
+    body.extend(_category_labels(labels, lambda i: left + slot * (i + 0.5) + 3, y0))
+    return _frame(title, body, [(name, COLORS[j % len(COLORS)]) for j, (name, _) in enumerate(series)])
+
+
+def line_chart(title, labels, series):
+    """Линейная диаграмма (для длинных рядов - по кварталам и месяцам)
+
+    Args:
+        title (str): Заголовок
+        labels (list): Подписи точек
+        series (list[tuple]): Ряды (подпись, list значений)
+
+    Returns:
+        str: Документ svg
+    """
+    left, right, y0, y1 = 60, WIDTH - 10, HEIGHT - 60, 30
+    top = _nice_max(max([max(values, default=0) for _, values in series], default=0))
+    step = (right - left) / max(len(labels) - 1, 1)
+    body = _value_axis(top, left, right, y0, y1)
+    for j, (_, values) in enumerate(series):
+        points = ' '.join(f'{left + step * i:.1f},{y0 - (y0 - y1) * v / top:.1f}' for i, v in enumerate(values))
+        body.append(f'<polyline points="{points}" fill="none" stroke="{COLORS[j % len(COLORS)]}" stroke-width="1.5"/>')
+    body.extend(_category_labels(labels, lambda i: left + step * i + 3, y0))
+    return _frame(title, body, [(name, COLORS[j % len(COLORS)]) for j, (name, _) in enumerate(series)])
+
+
+def hbar_chart(title, labels, values):
+    """Горизонтальная столбчатая диаграмма (первая категория сверху)
+
+    Args:
+        title (str): Заголовок
+        labels (list): Подписи категорий (города)
+        values (list): Значения
+
+    Returns:
+        str: Документ svg
+    """
+    left, right, top_y, bottom_y = 130, WIDTH - 20, 30, HEIGHT - 10
+    top = _nice_max(max(values, default=0))
+    slot = (bottom_y - top_y) / max(len(labels), 1)
+    body = []
+    for i in range(6):
+        x = left + (right - left) * i / 5
+        body.append(f'<line x1="{x:.1f}" y1="{top_y}" x2="{x:.1f}" y2="{bottom_y}" stroke="#ddd"/>'
+                    f'<text x="{x:.1f}" y="{bottom_y + 8}" text-anchor="middle" font-size="8">{top * i / 5:g}</text>')
+    for i, (label, value) in enumerate(zip(labels, values)):
+        y = top_y + slot * i
+        body.append(f'<rect x="{left}" y="{y + slot * 0.1:.1f}" width="{(right - left) * value / top:.1f}" '
+                    f'height="{slot * 0.8:.1f}" fill="{COLORS[0]}"/>'
+                    f'<text x="{left - 4}" y="{y + slot * 0.6:.1f}" text-anchor="end">{escape(str(label))}</text>')
+    return _frame(title, body)
+
+
+def pie_chart(title, labels, values):
+    """Круговая диаграмма. Секторы с нулевой долей не рисуются, единственный сектор со всей долей - круг
+       (дуга от точки до той же точки в svg не видна)
+
+    Args:
+        title (str): Заголовок
+        labels (list): Подписи секторов
+        values (list): Доли (сумма - 1)
+
+    Returns:
+        str: Документ svg
+    """
+    cx, cy, r = WIDTH / 2, HEIGHT / 2 + 10, 120
+    total = sum(values) or 1
+    body, angle = [], 0.0
+    for i, (label, value) in enumerate(zip(labels, values)):
+        if value <= 0:
+            continue
+        sweep = 2 * math.pi * value / total
+        color = COLORS[(i + 1) % len(COLORS)]
+        middle = angle + sweep / 2
+        if 2 * math.pi - sweep < 0.001:  # концы дуги совпали бы при выводе координат с точностью 0.1
+            body.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+        else:
+            x0, y0 = cx + r * math.cos(angle), cy - r * math.sin(angle)
+            x1, y1 = cx + r * math.cos(angle + sweep), cy - r * math.sin(angle + sweep)
+            large = 1 if sweep > math.pi else 0
+            body.append(f'<path d="M{cx},{cy} L{x0:.1f},{y0:.1f} A{r},{r} 0 {large} 0 {x1:.1f},{y1:.1f} Z" '
+                        f'fill="{color}"/>')
+        body.append(f'<text x="{cx + (r + 12) * math.cos(middle):.1f}" y="{cy - (r + 12) * math.sin(middle):.1f}" '
+                    f'text-anchor="{"start" if math.cos(middle) >= 0 else "end"}">{escape(str(label))}</text>')
+        angle += sweep
+    return _frame(title, body)
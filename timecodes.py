@@ -0,0 +1,83 @@
+"""Быстрое декодирование даты публикации вакансии в целочисленные номера месяца и квартала.
+
+published_at имеет фиксированный формат '2003-10-07T00:00:00+0400', поэтому номер месяца
+(год * 12 + месяц - 1) берется по первым 7 символам из заранее построенной таблицы - без разбора
+строки через datetime для каждой вакансии. Номер квартала - номер месяца // 3, год - номер месяца // 12.
+"""
+
+# _MONTH_IDS (dict): Таблица {'ГГГГ-ММ': номер месяца} для 1970-2099 годов
+_MONTH_IDS = {f'{year:04d}-{month:02d}': year * 12 + month - 1 for year in range(1970, 2100) for month in range(1, 13)}
+
+
+def month_id(published_at):
+    """Вычисляет номер месяца публикации
+
+    Args:
+        published_at (str): Дата публикации вакансии в формате ISO ('2003-10-07T00:00:00+0400')
+
+    Returns:
+        int: Номер месяца (год * 12 + месяц - 1)
+
+    >>> month_id('2003-10-07T00:00:00+0400'), month_label(month_id('2003-10-07T00:00:00+0400'))
+    (24045, '2003-10')
+    """
+    mid = _MONTH_IDS.get(published_at[0:7])
+    if mid is None:
+        mid = int(published_at[0:4]) * 12 + int(published_at[5:7]) - 1
+    return mid
+
+
+def month_year(mid):
+    """Год по номеру месяца
+
+    Args:
+        mid (int): Номер месяца
+
+    Returns:
+        int: Год
+    """
+    return mid // 12
+
+
+def month_quarter(mid):
+    """Номер квартала по номеру месяца
+
+    Args:
+        mid (int): Номер месяца
+
+    Returns:
+        int: Номер квартала (год * 4 + квартал - 1)
+    """
+    return mid // 3
+
+
+def month_label(mid):
+    """Подпись месяца для таблиц и графиков
+
+    Args:
+        mid (int): Номер месяца
+
+    Returns:
+        str: Подпись вида '2003-10'
+    """
+    return f'{mid // 12}-{mid % 12 + 1:02d}'
+
+
+def quarter_label(qid):
+    """Подпись квартала для таблиц и графиков
+
+    Args:
+        qid (int): Номер квартала
+
+    Returns:
+        str: Подпись вида '2003-Q4'
+
+    >>> quarter_label(month_quarter(month_id('2003-10-07T00:00:00+0400')))
+    '2003-Q4'
+    """
+    return f'{qid // 4}-Q{qid % 4 + 1}'
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,121 @@
+"""Нормализация названий вакансий для поиска профессии.
+
+Название приводится к единому виду: совместимая нормализация Unicode (NFKC), нижний регистр (casefold),
+'ё' -> 'е', знаки препинания заменяются пробелами (кроме '+' и '#' - C++, C#), слова уровня
+(Senior, Junior, старший и т.п.) удаляются. Нормализация одной строки дорогая, но одинаковых названий
+в выгрузках hh.ru очень много - поэтому результаты запоминаются в ограниченном LRU-кеше по исходному
+названию, а доля попаданий в кеш доступна для контроля (TitleNormalizer.hit_rate).
+"""
+import re
+import unicodedata
+from collections import OrderedDict
+
+# GRADE_WORDS (frozenset): Слова уровня должности, не влияющие на профессию
+GRADE_WORDS = frozenset(['senior', 'junior', 'middle', 'lead', 'intern', 'trainee', 'sr', 'jr', 'principal',
+                         'старший', 'младший', 'ведущий', 'главный', 'стажер', 'начинающий', 'помощник'])
+_SEPARATORS = re.compile(r'[^\w+#]+|_')
+
+
+def normalize_title(title):
+    """Приводит название вакансии (или профессии) к нормализованному виду
+
+    Args:
+        title (str): Название
+
+    Returns:
+        str: Нормализованное название (слова через один пробел)
+
+    >>> normalize_title('Senior Python-разработчик (Django)')
+    'python разработчик django'
+    >>> normalize_title('Ведущий программист C++ / C#')
+    'программист c++ c#'
+    >>> normalize_title('ＰＹＴＨＯＮ Developer')
+    'python developer'
+    """
+    words = _SEPARATORS.sub(' ', unicodedata.normalize('NFKC', title).casefold().replace('ё', 'е')).split()
+    return ' '.join(word for word in words if word not in GRADE_WORDS)
+
+
+class TitleNormalizer:
+    """Класс для представления нормализатора названий с ограниченным LRU-кешем.
+       При передаче в другой процесс (pickle) содержимое кеша не передается - только счетчики
+
+    Attributes:
+        maxsize (int): Максимальное количество запоминаемых названий
+        hits (int): Количество названий, найденных в кеше
+        misses (int): Количество нормализованных (не найденных в кеше) названий
+    """
+    def __init__(self, maxsize=65536):
+        """Инициализирует экземпляр TitleNormalizer с пустым кешем
+
+        Args:
+            maxsize (int): Максимальное количество запоминаемых названий
+
+        Returns:
+            Экземпляр класса TitleNormalizer
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, title):
+        """Возвращает нормализованное название (из кеша, если оно уже встречалось)
+
+        Args:
+            title (str): Исходное название
+
+        Returns:
+            str: Нормализованное название
+
+        >>> normalizer = TitleNormalizer(maxsize=2)
+        >>> [normalizer(t) for t in ['Python Dev', 'Python Dev', 'Java', 'Go', 'Python Dev']]
+        ['python dev', 'python dev', 'java', 'go', 'python dev']
+        >>> normalizer.hits, normalizer.misses
+        (1, 4)
+        """
+        cache = self._cache
+        value = cache.get(title)
+        if value is not None:
+            cache.move_to_end(title)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = cache[title] = normalize_title(title)
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self):
+        """Доля обращений, обслуженных кешем
+
+        Returns:
+            float: Доля попаданий (0 - если обращений не было)
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def merge(self, other):
+        """Добавляет счетчики другого нормализатора (например, из другого процесса)
+
+        Args:
+            other (TitleNormalizer): Нормализатор
+
+        Returns:
+            TitleNormalizer: Текущий нормализатор (self)
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        return self
+
+    def __getstate__(self):
+        """Состояние для pickle - без содержимого кеша"""
+        state = dict(vars(self))
+        state['_cache'] = OrderedDict()
+        return state
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()